@@ -0,0 +1,64 @@
+"""Benchmark local hourly/daily averages across many sensors."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from payloads import measure, report
+
+from sprinkl_async import averages
+from sprinkl_async.averages import LocalAverages
+from sprinkl_async.readingstore import DAY, HOUR, RAW_CAPACITY, ReadingStore
+
+SENSORS = 300
+START = 1560470400.0
+STEP = 1800.0
+
+
+def _store() -> ReadingStore:
+    store = ReadingStore()
+    for ident in range(SENSORS):
+        sensor = store.sensor(str(ident))
+        for index in range(RAW_CAPACITY):
+            sensor.add(
+                START + index * STEP,
+                {
+                    "moisture_1": 40 + index % 13,
+                    "moisture_3": 30 + index % 11,
+                    "moisture_5": 20 + index % 7,
+                    "temp": 60.0 + index % 24,
+                },
+            )
+    return store
+
+
+def main() -> None:
+    """Run benchmark."""
+    local = LocalAverages(_store())
+    ids = [str(ident) for ident in range(SENSORS)]
+    numpy = averages.numpy
+
+    for name, module in (("numpy", numpy), ("pure python", None)):
+        averages.numpy = module
+        for bucket, label in ((DAY, "day"), (HOUR, "hour")):
+            seconds, peak = measure(lambda: local.compute(ids, bucket), 3)
+            report(
+                "{0} averages_{1} x{2} sensors".format(name, label, SENSORS),
+                seconds,
+                peak,
+            )
+    averages.numpy = numpy
+
+
+if __name__ == "__main__":
+    main()
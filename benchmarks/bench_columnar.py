@@ -0,0 +1,47 @@
+"""Benchmark columnar storage of sensor readings."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from payloads import decode, measure, readings, report
+
+from sprinkl_async.columnar import ColumnarListObject
+from sprinkl_async.dataobject import ListObject
+
+
+def main() -> None:
+    """Run benchmark."""
+    payload = readings(10000)
+
+    seconds, peak = measure(lambda: ListObject(decode(payload)["data"]))
+    report("ListObject x10000", seconds, peak)
+
+    seconds, peak = measure(lambda: ColumnarListObject(decode(payload)["data"]))
+    report("ColumnarListObject x10000", seconds, peak)
+
+    rows = ListObject(decode(payload)["data"])
+    table = ColumnarListObject(decode(payload)["data"])
+
+    seconds, peak = measure(lambda: sum(row.moisture_t for row in rows) / len(rows))
+    report("mean moisture_t ListObject", seconds, peak)
+
+    seconds, peak = measure(lambda: sum(table.column("moisture_t")) / len(table))
+    report("mean moisture_t column", seconds, peak)
+
+    seconds, peak = measure(lambda: table.column("moisture_t").mean())
+    report("mean moisture_t column (numpy)", seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark eager vs lazy DictObject/ListObject construction."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import timeit
+
+from payloads import controllers, decode, history_page, measure, report
+
+from sprinkl_async.dataobject import DictObject, ListObject
+
+
+def main() -> None:
+    """Run benchmark."""
+    for name, payload in (
+        ("controllers x500", controllers(500)),
+        ("history page x10000", history_page(10000)),
+    ):
+        data = decode(payload)["data"]
+        for mode, lazy in (("eager", False), ("lazy", True)):
+            seconds, peak = measure(lambda: ListObject(data, lazy=lazy))
+            report("{0} {1} construct".format(name, mode), seconds, peak)
+
+            def first_item():
+                return ListObject(data, lazy=lazy)[0].id
+
+            seconds, peak = measure(first_item)
+            report("{0} {1} construct+item".format(name, mode), seconds, peak)
+
+            def walk():
+                return [item.id for item in ListObject(data, lazy=lazy)]
+
+            seconds, peak = measure(walk)
+            report("{0} {1} construct+walk".format(name, mode), seconds, peak)
+
+    for mode, lazy in (("eager", False), ("lazy", True)):
+        obj = DictObject(decode(history_page(1))["data"][0], lazy=lazy)
+        seconds = min(timeit.repeat(lambda: obj.type, number=100000, repeat=5))
+        report("attribute access x100000 {0}".format(mode), seconds, 0)
+
+
+if __name__ == "__main__":
+    main()
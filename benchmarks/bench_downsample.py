@@ -0,0 +1,93 @@
+"""Benchmark downsampling a long readings history for plotting."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from payloads import measure, report
+
+from sprinkl_async.downsample import downsample, downsample_page
+from sprinkl_async.pageobject import PageObject
+from sprinkl_async.readingstore import epoch_seconds
+from sprinkl_async.timeseries import format_timestamp
+
+# 90 days of readings every 30 minutes, newest first
+PAGES = 44
+SIZE = 100
+FIELDS = ("moisture_t", "moisture_m", "moisture_b", "temp")
+WIDTH = 6 * 3600
+
+_END = datetime(2019, 9, 1, tzinfo=timezone.utc)
+
+
+def _page(page: int) -> str:
+    data = []
+    for index in range((page - 1) * SIZE, page * SIZE):
+        data.append(
+            {
+                "created_at": format_timestamp(_END - timedelta(minutes=30 * index)),
+                "moisture_t": 40 + index % 13,
+                "moisture_m": 30 + index % 11,
+                "moisture_b": 20 + index % 7,
+                "temp": 60.0 + (index % 240) / 10,
+            }
+        )
+    return json.dumps({"data": data, "meta": {"count": PAGES, "page": page}})
+
+
+_TEXT = {page: _page(page) for page in range(1, PAGES + 1)}
+
+
+async def _request(method, uri, params):
+    return json.loads(_TEXT[params["page"]])
+
+
+async def _collect(first) -> int:
+    # what dashboard code did before: every page, then reduce per field
+    records = []
+    async for _, page in first.raw_pages():
+        records.extend(page)
+    points = 0
+    for field in FIELDS:
+        series = [
+            (epoch_seconds(record["created_at"]), record[field]) for record in records
+        ]
+        points += len(list(downsample(series, WIDTH)))
+    return points
+
+
+async def _stream(first) -> int:
+    result = await downsample_page(first, FIELDS, WIDTH)
+    return sum(len(points) for points in result.values())
+
+
+def main() -> None:
+    """Run benchmark."""
+    loop = asyncio.get_event_loop()
+
+    for name, walk in (("collect then lttb", _collect), ("downsample_page", _stream)):
+
+        def run(walk=walk):
+            first = PageObject(json.loads(_TEXT[1]), _request, "get", "readings")
+            return loop.run_until_complete(walk(first))
+
+        seconds, peak = measure(run, 3)
+        report("{0} x{1} readings".format(name, PAGES * SIZE), seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark to_dict()/to_list() against a json round trip."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from payloads import controllers, decode, history_page, measure, report
+
+from sprinkl_async.dataobject import ListObject, set_default
+
+
+def main() -> None:
+    """Run benchmark."""
+    for name, payload in (
+        ("controllers x200", controllers(200)),
+        ("history page x10000", history_page(10000)),
+    ):
+        data = decode(payload)["data"]
+        for mode, lazy in (("eager", False), ("lazy", True)):
+            obj = ListObject(data, lazy=lazy)
+
+            def round_trip():
+                return json.loads(json.dumps(obj, default=set_default))
+
+            seconds, peak = measure(round_trip, number=3)
+            report("{0} {1} json round trip".format(name, mode), seconds, peak)
+
+            seconds, peak = measure(obj.to_list, number=3)
+            report("{0} {1} to_list".format(name, mode), seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
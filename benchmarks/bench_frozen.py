@@ -0,0 +1,47 @@
+"""Benchmark memory of successive controller snapshots."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from payloads import controller, decode, measure, report
+
+from sprinkl_async.dataobject import DictObject
+from sprinkl_async.frozen import Interner
+
+
+def polls(count: int) -> list:
+    """Return count decoded polls of one controller, one zone changing each."""
+    result = []
+    for poll in range(count):
+        data = decode(controller(0))
+        data["zones"][poll % 16]["enabled"] = poll % 2 == 0
+        data["last_checkin_at"] = "2019-06-01T00:{0:02d}:00.000Z".format(poll % 60)
+        result.append(data)
+    return result
+
+
+def main() -> None:
+    """Run benchmark."""
+    for count in (10, 100):
+        data = polls(count)
+
+        seconds, peak = measure(lambda: [DictObject(item) for item in data], 3)
+        report("DictObject snapshots x{0}".format(count), seconds, peak)
+
+        seconds, peak = measure(lambda: Interner().freeze(data), 3)
+        report("frozen snapshots x{0}".format(count), seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark compressed storage of a year of sensor readings."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from payloads import measure, report
+
+from sprinkl_async.gorilla import CompressedSeries
+from sprinkl_async.timeseries import format_timestamp
+
+READINGS = 48 * 365
+START = datetime(2019, 1, 1, tzinfo=timezone.utc)
+
+
+def _records() -> list:
+    rand = random.Random(3)
+    records = []
+    moisture = [40, 60, 80]
+    temp = 60.0
+    for index in range(READINGS):
+        # readings every 30 minutes a few seconds off, slowly drifting values
+        time = START + timedelta(seconds=1800 * index + rand.uniform(-5, 5))
+        moisture = [
+            max(0, min(100, value + rand.choice((-1, 0, 0, 0, 1))))
+            for value in moisture
+        ]
+        temp = round(temp + rand.uniform(-0.5, 0.5), 1)
+        records.append(
+            {
+                "created_at": format_timestamp(time),
+                "moisture_t": moisture[0],
+                "moisture_m": moisture[1],
+                "moisture_b": moisture[2],
+                "temp": temp,
+            }
+        )
+    return records
+
+
+def main() -> None:
+    """Run benchmark."""
+    records = _records()
+    text = json.dumps(records)
+    print("json                    {0:10.1f} KiB".format(len(text) / 1024))
+    # one float64 time and four float32 columns, as in ReadingStore
+    print("arrays                  {0:10.1f} KiB".format(READINGS * 24 / 1024))
+
+    series = CompressedSeries()
+    seconds, peak = measure(lambda: CompressedSeries().add_records(records), 1)
+    series.add_records(records)
+    print("compressed              {0:10.1f} KiB".format(series.nbytes / 1024))
+    report("append x{0} readings".format(READINGS), seconds, peak)
+
+    end = series.last_time
+    seconds, peak = measure(lambda: series.window(end - 7 * 86400), 5)
+    report("window last 7 days", seconds, peak)
+    seconds, peak = measure(series.window, 1)
+    report("window full year", seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark memory of decoded payloads with interned strings."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import timeit
+
+from payloads import controllers, report, retained
+
+from sprinkl_async.dataobject import DictObject
+from sprinkl_async.interning import loads
+
+
+def main() -> None:
+    """Run benchmark."""
+    text = json.dumps(controllers(5000))
+
+    for name, decode in (("json.loads", json.loads), ("interning.loads", loads)):
+        seconds = min(timeit.repeat(lambda: decode(text), number=1, repeat=3))
+        report(
+            "{0} x5000 retained".format(name), seconds, retained(lambda: decode(text))
+        )
+
+        seconds = min(
+            timeit.repeat(
+                lambda: [DictObject(item) for item in decode(text)["data"]],
+                number=1,
+                repeat=3,
+            )
+        )
+        report(
+            "{0} DictObject x5000".format(name),
+            seconds,
+            retained(lambda: [DictObject(item) for item in decode(text)["data"]]),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark cached and incremental json serialization."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import timeit
+
+from payloads import controllers, decode, report
+
+from sprinkl_async.dataobject import ListObject, set_default
+
+
+def main() -> None:
+    """Run benchmark."""
+    data = decode(controllers(200))["data"]
+
+    for mode, lazy in (("eager", False), ("lazy", True)):
+        obj = ListObject(data, lazy=lazy)
+
+        def dumps():
+            return json.dumps(obj, sort_keys=True, indent=4, default=set_default)
+
+        seconds = min(timeit.repeat(dumps, number=1, repeat=3))
+        report("json.dumps {0}".format(mode), seconds, 0)
+
+        def cold():
+            return ListObject(data, lazy=lazy).json
+
+        seconds = min(timeit.repeat(cold, number=1, repeat=3))
+        report("construct+json {0}".format(mode), seconds, 0)
+
+        obj.json
+        seconds = min(timeit.repeat(lambda: obj.json, number=1, repeat=3))
+        report("cached json {0}".format(mode), seconds, 0)
+
+        def one_zone():
+            zone = obj[0].zones[0]
+            zone["enabled"] = not zone.enabled
+            return obj.json
+
+        seconds = min(timeit.repeat(one_zone, number=1, repeat=3))
+        report("json after one zone change {0}".format(mode), seconds, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark typed models against the dynamic objects."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import timeit
+
+from payloads import controllers, decode, measure, report
+
+from sprinkl_async.controller import Controller
+from sprinkl_async.dataobject import DictObject
+from sprinkl_async.models import ControllerModel
+
+
+async def _request(*args, **kwargs):
+    return {}
+
+
+def main() -> None:
+    """Run benchmark."""
+    payload = controllers(500)
+
+    seconds, peak = measure(lambda: decode(payload)["data"], 3)
+    report("json decode only x500", seconds, peak)
+
+    seconds, peak = measure(
+        lambda: [Controller(_request, item) for item in decode(payload)["data"]], 3
+    )
+    report("construct Controller x500", seconds, peak)
+
+    seconds, peak = measure(
+        lambda: [DictObject(item) for item in decode(payload)["data"]], 3
+    )
+    report("construct DictObject x500", seconds, peak)
+
+    seconds, peak = measure(
+        lambda: [ControllerModel.from_json(item) for item in decode(payload)["data"]], 3
+    )
+    report("construct ControllerModel x500", seconds, peak)
+
+    data = decode(payload)["data"][0]
+    controller = Controller(_request, decode(payload)["data"][0])
+    zone = controller._zones.get("z_1")  # pylint: disable=protected-access
+    model = ControllerModel.from_json(data)
+    zone_model = model.zones[0]
+    for name, func in (
+        ("Zone.number", lambda: zone.number),
+        ("Zone.name", lambda: zone.name),
+        ("Controller.name", lambda: controller.name),
+        ("ZoneModel.number", lambda: zone_model.number),
+        ("ZoneModel.name", lambda: zone_model.name),
+        ("ControllerModel.name", lambda: model.name),
+    ):
+        seconds = min(timeit.repeat(func, number=100000, repeat=5))
+        report("access {0} x100000".format(name), seconds, 0)
+
+
+if __name__ == "__main__":
+    main()
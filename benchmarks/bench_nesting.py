@@ -0,0 +1,87 @@
+"""Benchmark DictObject conversion on wide, deep and mixed payloads."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import timeit
+
+from payloads import controllers
+
+from sprinkl_async.dataobject import DictObject
+
+
+def wide(count: int) -> dict:
+    """Return one dict with count small dicts."""
+    return {"item_{0}".format(i): {"id": i, "enabled": True} for i in range(count)}
+
+
+def deep(depth: int) -> dict:
+    """Return dicts and lists nested depth levels."""
+    data = leaf = {}  # type: dict
+    for level in range(depth):
+        leaf["level"] = level
+        leaf["child"] = [{}]
+        leaf = leaf["child"][0]
+    return data
+
+
+def nodes(data) -> int:
+    """Return number of dicts and lists in data."""
+    count = 0
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            count += 1
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            count += 1
+            stack.extend(value)
+    return count
+
+
+def report(name: str, seconds: float, count: int) -> None:
+    """Print a benchmark result line with the cost per node."""
+    print(
+        "{0:<32} {1:>10.2f} ms {2:>10.3f} us/node".format(
+            name, seconds * 1000, seconds * 1e6 / count
+        )
+    )
+
+
+def main() -> None:
+    """Run benchmark."""
+    payloads = (
+        ("wide", wide(20000)),
+        ("deep", deep(400)),
+        ("mixed", json.loads(json.dumps(controllers(100)))),
+    )
+    for name, data in payloads:
+        count = nodes(data)
+        print("{0}: {1} nodes".format(name, count))
+
+        for label, func in (
+            ("construct eager", lambda: DictObject(data)),
+            ("construct lazy", lambda: DictObject(data, lazy=True)),
+            ("json eager", lambda: DictObject(data).json),
+            ("json lazy", lambda: DictObject(data, lazy=True).json),
+            ("to_dict eager", lambda: DictObject(data).to_dict()),
+        ):
+            seconds = min(timeit.repeat(func, number=1, repeat=5))
+            report("  " + label, seconds, count)
+
+
+if __name__ == "__main__":
+    main()
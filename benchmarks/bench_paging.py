@@ -0,0 +1,73 @@
+"""Benchmark walking paged history with simulated request latency."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+from payloads import decode, history_page, report
+
+from sprinkl_async.pageobject import PageObject
+
+PAGES = 50
+LATENCY = 0.02
+
+
+async def _request(method, uri, params):
+    await asyncio.sleep(LATENCY)
+    return decode(history_page(100, params["page"], PAGES))
+
+
+async def _next_loop(page) -> int:
+    count = 0
+    while page is not None:
+        count += len(page.data)
+        page = await page.next()
+    return count
+
+
+async def _pages(page, read_ahead: int) -> int:
+    count = 0
+    async for item in page.pages(read_ahead):
+        count += len(item.data)
+    return count
+
+
+async def _fetch_all(page, workers: int, ordered: bool) -> int:
+    count = 0
+    async for item in page.fetch_all(workers=workers, ordered=ordered):
+        count += len(item.data)
+    return count
+
+
+def main() -> None:
+    """Run benchmark."""
+    loop = asyncio.get_event_loop()
+    first = PageObject(decode(history_page(100, 1, PAGES)), _request, "get", "uri")
+
+    for name, coro in (
+        ("next() loop", lambda: _next_loop(first)),
+        ("pages(read_ahead=1)", lambda: _pages(first, 1)),
+        ("fetch_all(workers=8)", lambda: _fetch_all(first, 8, True)),
+        ("fetch_all(workers=8, unordered)", lambda: _fetch_all(first, 8, False)),
+    ):
+        start = time.perf_counter()
+        count = loop.run_until_complete(coro())
+        assert count == PAGES * 100
+        report("{0} x{1} pages".format(name, PAGES), time.perf_counter() - start, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark queries over history with and without indexes."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from payloads import decode, history_page, measure, report
+
+from sprinkl_async.dataobject import ListObject
+from sprinkl_async.query import Table
+
+
+def main() -> None:
+    """Run benchmark."""
+    payload = history_page(20000)
+    rows = ListObject(decode(payload)["data"], lazy=True)
+    start, end = "2019-06-05T00:00:00", "2019-06-05T06:00:00"
+
+    def loop():
+        return [row for row in rows if row.zone == 3 and start <= row.created_at < end]
+
+    seconds, peak = measure(loop)
+    report("ListObject loop", seconds, peak)
+
+    table = Table(rows)
+    seconds, peak = measure(
+        lambda: table.where(zone=3).between("created_at", start, end).to_list()
+    )
+    report("Table scan", seconds, peak)
+
+    seconds, peak = measure(lambda: table.create_index("zone"), 1)
+    report("create hash index zone", seconds, peak)
+    seconds, peak = measure(lambda: table.create_index("created_at", True), 1)
+    report("create sorted index created_at", seconds, peak)
+
+    seconds, peak = measure(
+        lambda: table.where(zone=3).between("created_at", start, end).to_list()
+    )
+    report("Table indexed", seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
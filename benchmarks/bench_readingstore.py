@@ -0,0 +1,92 @@
+"""Benchmark local window queries of the reading store."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import timeit
+
+from payloads import report, retained
+
+from sprinkl_async.readingstore import RAW_CAPACITY, ReadingStore
+
+SENSORS = 100
+START = 1560470400.0
+STEP = 1800.0
+QUERIES = 1000
+
+
+def _records() -> list:
+    return [
+        {
+            "time": START + index * STEP,
+            "moisture_1": 40 + index % 13,
+            "moisture_3": 30 + index % 11,
+            "moisture_5": 20 + index % 7,
+            "temp": 60.0 + index % 24,
+        }
+        for index in range(RAW_CAPACITY)
+    ]
+
+
+def _fill_lists() -> dict:
+    return {str(ident): _records() for ident in range(SENSORS)}
+
+
+def _fill_store() -> ReadingStore:
+    store = ReadingStore()
+    for ident in range(SENSORS):
+        for record in _records():
+            record = dict(record)
+            store.add(str(ident), record.pop("time"), **record)
+    return store
+
+
+def main() -> None:
+    """Run benchmark."""
+    rng = random.Random(1)
+    windows = []
+    for _ in range(QUERIES):
+        start = START + rng.randrange(RAW_CAPACITY) * STEP
+        windows.append((str(rng.randrange(SENSORS)), start, start + 86400))
+
+    lists = _fill_lists()
+    store = _fill_store()
+
+    def scan():
+        for ident, start, end in windows:
+            [r for r in lists[ident] if start <= r["time"] < end]
+
+    def raw():
+        for ident, start, end in windows:
+            store.window(ident, start, end)
+
+    def hourly():
+        for ident, start, end in windows:
+            store.hourly(ident, start, end)
+
+    for name, func in (
+        ("list scan, 1 day window", scan),
+        ("store.window, 1 day window", raw),
+        ("store.hourly, 1 day window", hourly),
+    ):
+        seconds = min(timeit.repeat(func, number=1, repeat=5)) / QUERIES
+        report(name + " (per query)", seconds, 0)
+
+    report("lists of dicts x{0} sensors".format(SENSORS), 0, retained(_fill_lists))
+    report("ReadingStore x{0} sensors".format(SENSORS), 0, retained(_fill_store))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark resampling many sensor series onto a shared grid."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+from payloads import measure, report
+
+from sprinkl_async import resample
+
+SENSORS = 100
+READINGS = 48 * 30
+STEP = 900
+
+
+def _series() -> dict:
+    rand = random.Random(7)
+    series = {}
+    for ident in range(SENSORS):
+        # readings every 30 minutes, each sensor with its own phase
+        offset = rand.randrange(1800)
+        times = [offset + 1800 * index for index in range(READINGS)]
+        values = [float(rand.randrange(30, 90)) for _ in times]
+        series[str(ident)] = (times, values)
+    return series
+
+
+def main() -> None:
+    """Run benchmark."""
+    series = _series()
+    numpy = resample.numpy
+    for name, module in (("numpy", numpy), ("pure python", None)):
+        resample.numpy = module
+        for method in resample.METHODS:
+            seconds, peak = measure(
+                lambda: resample.resample(series, STEP, method=method, max_gap=3600),
+                3,
+            )
+            report("{0} {1} x{2} sensors".format(name, method, SENSORS), seconds, peak)
+    resample.numpy = numpy
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark peak memory of walking a long paged history."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+from payloads import history_page, measure, report
+
+from sprinkl_async.pageobject import PageObject
+
+PAGES = 200
+SIZE = 100
+
+_TEXT = {
+    page: json.dumps(history_page(SIZE, page, PAGES)) for page in range(1, PAGES + 1)
+}
+
+
+async def _request(method, uri, params):
+    return json.loads(_TEXT[params["page"]])
+
+
+async def _collect(first) -> int:
+    # what export code did before: gather every page, then process
+    records = []
+    page = first
+    while page is not None:
+        records.extend(item.to_dict() for item in page.data)
+        page = await page.next()
+    return len(records)
+
+
+async def _items(first) -> int:
+    count = 0
+    async for item in first:
+        count += item["zone"] is not None
+    return count
+
+
+async def _stream(first) -> int:
+    count = 0
+    async for record in first.stream():
+        count += record["zone"] is not None
+    return count
+
+
+def main() -> None:
+    """Run benchmark."""
+    loop = asyncio.get_event_loop()
+
+    for name, walk in (
+        ("collect all pages", _collect),
+        ("items()", _items),
+        ("stream()", _stream),
+    ):
+
+        def run(walk=walk):
+            first = PageObject(json.loads(_TEXT[1]), _request, "get", "uri")
+            return loop.run_until_complete(walk(first))
+
+        seconds, peak = measure(run, 3)
+        report("{0} x{1} pages".format(name, PAGES), seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark evaluating zone limits against sensors across a fleet."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from payloads import controller, measure, report
+
+from sprinkl_async import thresholds
+from sprinkl_async.moisturesensors import MoistureSensors
+from sprinkl_async.thresholds import ThresholdEngine
+from sprinkl_async.zones import Zones
+
+CONTROLLERS = 250
+
+
+def _fleet() -> list:
+    fleet = []
+    for ident in range(CONTROLLERS):
+        data = controller(ident)
+        fleet.append(
+            (
+                Zones(None, data["zones"]),
+                MoistureSensors(None, data["moisture_sensors"]),
+            )
+        )
+    return fleet
+
+
+def _nested_loops(fleet) -> int:
+    # what callers did before: join zones to sensors on every poll
+    reached = 0
+    for zones, sensors in fleet:
+        for zone in zones:
+            limits = zone.get("moisture_sensor")
+            for sensor in sensors:
+                if sensor.id == limits.get("moisture_sensor_id"):
+                    reached += sensor.moisture_1 >= limits.get("limit_moisture_t")
+                    reached += sensor.moisture_3 >= limits.get("limit_moisture_m")
+                    reached += sensor.moisture_5 >= limits.get("limit_moisture_b")
+                    reached += sensor.temp <= limits.get("limit_temp")
+    return reached
+
+
+def main() -> None:
+    """Run benchmark."""
+    fleet = _fleet()
+    zones = sum(len(zones) for zones, _ in fleet)
+
+    seconds, peak = measure(lambda: _nested_loops(fleet), 5)
+    report("nested loops x{0} zones".format(zones), seconds, peak)
+
+    numpy = thresholds.numpy
+    for name, module in (("numpy", numpy), ("pure python", None)):
+        thresholds.numpy = module
+        engine = ThresholdEngine()
+        for zones_, sensors in fleet:
+            engine.add(zones_, sensors)
+        engine.evaluate()
+        seconds, peak = measure(engine.evaluate, 5)
+        report("engine {0} x{1} zones".format(name, zones), seconds, peak)
+    thresholds.numpy = numpy
+
+
+if __name__ == "__main__":
+    main()
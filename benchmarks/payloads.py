@@ -0,0 +1,246 @@
+"""Synthetic Sprinkl payloads for benchmarks."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+# allow running the benchmarks from a checkout without installing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sensor(ident: int) -> dict:
+    """Return a moisture sensor document."""
+    return {
+        "battery": 100,
+        "enabled": True,
+        "id": "m_{0}".format(ident),
+        "last_reading_at": "2019-06-14T03:07:51.837Z",
+        "mac": "20:10:00:00:00:00:00:{0:02x}".format(ident % 256),
+        "moisture_b": 96,
+        "moisture_m": 97,
+        "moisture_t": 46,
+        "moistures_b": [96 + (i % 2) for i in range(48)],
+        "moistures_m": [97] * 48,
+        "moistures_t": [53 - i // 7 for i in range(48)],
+        "name": "Sensor {0}".format(ident),
+        "rssi": -79,
+        "temp": 81.0,
+        "temps": [68.0 + i / 2 for i in range(48)],
+    }
+
+
+def zone(number: int) -> dict:
+    """Return a zone document."""
+    return {
+        "enabled": True,
+        "exposure": "full_sun",
+        "head_dripline_ft": 0,
+        "head_num": 4,
+        "head_type": "spray",
+        "id": "z_{0}".format(number),
+        "moisture_sensor": {
+            "limit_moisture_b": 95,
+            "limit_moisture_m": 95,
+            "limit_moisture_t": 65,
+            "limit_temp": 35,
+            "moisture_sensor_id": "m_{0}".format(number % 4),
+        },
+        "name": "Zone {0}".format(number),
+        "number": number,
+        "slope": "flat",
+        "soil_type": "None",
+        "type": "flowerbed",
+    }
+
+
+def controller(ident: int, zones: int = 16, sensors: int = 4) -> dict:
+    """Return a controller document."""
+    return {
+        "alert": "None",
+        "connected": True,
+        "conservation": {
+            "rain_chance": 70.0,
+            "rain_inches_24hr": 0.3,
+            "rain_inches_48hr": 0.6,
+            "rain_inches_4day": 1.5,
+            "rain_inches_7day": 2.0,
+            "seasonal_adjustments": [
+                20,
+                30,
+                40,
+                80,
+                100,
+                100,
+                100,
+                100,
+                100,
+                80,
+                40,
+                20,
+            ],
+            "temp_above": 35.0,
+        },
+        "created_at": "2018-09-29T23:34:52.153Z",
+        "enabled": True,
+        "id": str(ident),
+        "last_checkin_at": "2019-06-14T03:13:28.811Z",
+        "last_ran_at": "2019-06-13T08:40:01.000Z",
+        "location": {
+            "city": "Palo Alto",
+            "country": "United States",
+            "latitude": 10.41754879871175,
+            "longitude": -100.12193391663871,
+            "postal_code": "94200",
+            "state": "California",
+            "street_1": "None",
+            "street_2": "None",
+            "timezone": "America/Los_Angeles",
+        },
+        "moisture_sensors": [sensor(i) for i in range(sensors)],
+        "name": "Site {0}".format(ident),
+        "next_scheduled_at": "2019-06-14T08:00:52.000Z",
+        "schedules": [
+            {
+                "created_at": "2018-09-29T23:51:11.500Z",
+                "days": ["S", "T", "Th", "Su"],
+                "enabled": True,
+                "frequency": "odd_days",
+                "id": "s_{0}".format(ident),
+                "name": "2 days",
+                "next_run_at": "None",
+                "run_time": "None",
+                "scheduled_days": [],
+                "seasonally_adjust": False,
+                "start_time": "2018-09-30T14:00:15.000Z",
+                "type": "standard",
+                "updated_at": "2018-12-20T05:22:25.858Z",
+                "zones": [
+                    {"id": "z_{0}".format(i), "number": i, "run_time": 4}
+                    for i in range(1, zones + 1)
+                ],
+            }
+        ],
+        "updated_at": "2019-06-14T03:16:14.255Z",
+        "weather": {
+            "accumulations": {
+                "total_2day": 0.0,
+                "total_4day": 0.0,
+                "total_7day": 0.0,
+                "total_today": 0.0,
+            },
+            "conditions": {
+                "pop": 0.0,
+                "raining": False,
+                "temp": 75.0,
+                "temp_high": 79.0,
+                "temp_low": 56.0,
+                "type": "clear_day",
+                "wind": 0.0,
+            },
+            "station": "None",
+        },
+        "zones": [zone(i) for i in range(1, zones + 1)],
+    }
+
+
+def controllers(count: int) -> dict:
+    """Return a /controllers response with count controllers."""
+    return {
+        "data": [controller(i) for i in range(count)],
+        "meta": {"count": 1, "page": 1},
+    }
+
+
+def history_page(count: int, page: int = 1, pages: int = 1) -> dict:
+    """Return a history page with count events."""
+    events = ("ZONE_STARTED", "ZONE_COMPLETED", "SCHEDULE_STARTED", "ONLINE")
+    return {
+        "data": [
+            {
+                "id": "h_{0}_{1}".format(page, i),
+                "type": events[i % len(events)],
+                "zone": 1 + i % 16,
+                "created_at": "2019-06-{0:02d}T{1:02d}:{2:02d}:00.000Z".format(
+                    1 + i // 1440 % 28, i // 60 % 24, i % 60
+                ),
+                "data": {"duration": 300, "source": "schedule"},
+            }
+            for i in range(count)
+        ],
+        "meta": {"count": pages, "page": page},
+    }
+
+
+def readings(count: int, page: int = 1, pages: int = 1) -> dict:
+    """Return a sensor readings page with count readings, one per minute."""
+    return {
+        "data": [
+            {
+                "id": "r_{0}_{1}".format(page, i),
+                "battery": 98,
+                "moisture_b": 20 + i % 7,
+                "moisture_m": 30 + i % 11,
+                "moisture_t": 40 + i % 13,
+                "rssi": -60 - i % 5,
+                "temp": 60.0 + (i % 240) / 10,
+                "created_at": "2019-06-{0:02d}T{1:02d}:{2:02d}:00.000Z".format(
+                    1 + i // 1440 % 28, i // 60 % 24, i % 60
+                ),
+            }
+            for i in range(count)
+        ],
+        "meta": {"count": pages, "page": page},
+    }
+
+
+def decode(payload: dict):
+    """Return a freshly decoded copy of payload, as returned by aiohttp."""
+    return json.loads(json.dumps(payload))
+
+
+def measure(func, number: int = 5):
+    """Return (best seconds per call, peak bytes) for func()."""
+    seconds = min(timeit.repeat(func, number=1, repeat=number))
+
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+
+    return seconds, peak
+
+
+def retained(func) -> int:
+    """Return bytes still allocated by the result of func()."""
+    tracemalloc.start()
+    result = func()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+
+    return current
+
+
+def report(name: str, seconds: float, peak: int) -> None:
+    """Print a benchmark result line."""
+    print(
+        "{0:<40} {1:>10.2f} ms {2:>10.1f} KiB".format(name, seconds * 1000, peak / 1024)
+    )
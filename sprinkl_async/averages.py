@@ -0,0 +1,289 @@
+"""Compute hourly and daily sensor averages locally, for many sensors at once."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .pageobject import PageObject
+from .readingstore import DAY, HOUR, ReadingStore, epoch_seconds
+from .timeseries import FIELDS, READING_INTERVAL, format_timestamp
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+_LOGGER = logging.getLogger(__name__)
+
+# series field and the field name used by the averages endpoints
+_RECORD_FIELDS = (
+    ("moisture_1", "moisture_t"),
+    ("moisture_3", "moisture_m"),
+    ("moisture_5", "moisture_b"),
+    ("temp", "temp"),
+)
+
+
+def _numpy_batch(windows: List[Dict[str, Any]], bucket: int, offset: float) -> list:
+    lengths = [len(window["timestamp"]) for window in windows]
+    results = [
+        {field: [] for field in ("timestamp",) + FIELDS} for _ in windows
+    ]  # type: List[Dict[str, list]]
+    if not sum(lengths):
+        return results
+
+    times = numpy.concatenate(
+        [numpy.asarray(window["timestamp"], dtype="float64") for window in windows]
+    )
+    owners = numpy.repeat(numpy.arange(len(windows)), lengths)
+    buckets = numpy.floor((times + offset) / bucket).astype("int64")
+    first = buckets.min()
+    span = int(buckets.max() - first) + 1
+
+    # one key per (sensor, bucket), so all sensors are reduced in one pass
+    keys, inverse = numpy.unique(owners * span + (buckets - first), return_inverse=True)
+    starts = ((keys % span) + first) * bucket - offset
+    bounds = numpy.searchsorted(keys // span, numpy.arange(len(windows) + 1))
+
+    means = {}
+    for field in FIELDS:
+        values = numpy.concatenate(
+            [numpy.asarray(window[field], dtype="float64") for window in windows]
+        )
+        valid = ~numpy.isnan(values)
+        sums = numpy.bincount(inverse[valid], values[valid], minlength=len(keys))
+        counts = numpy.bincount(inverse[valid], minlength=len(keys))
+        means[field] = numpy.divide(
+            sums, counts, out=numpy.full(len(keys), numpy.nan), where=counts > 0
+        )
+
+    for index, result in enumerate(results):
+        low, high = bounds[index], bounds[index + 1]
+        result["timestamp"] = starts[low:high].tolist()
+        for field in FIELDS:
+            result[field] = means[field][low:high].tolist()
+    return results
+
+
+def _python_batch(windows: List[Dict[str, Any]], bucket: int, offset: float) -> list:
+    results = []
+    for window in windows:
+        totals = {}  # type: Dict[float, List[float]]
+        columns = [window[field] for field in FIELDS]
+        for row, time in enumerate(window["timestamp"]):
+            start = math.floor((time + offset) / bucket) * bucket - offset
+            total = totals.get(start)
+            if total is None:
+                total = totals[start] = [0.0] * (2 * len(FIELDS))
+            for index, column in enumerate(columns):
+                value = column[row]
+                if value == value:
+                    total[2 * index] += value
+                    total[2 * index + 1] += 1
+
+        result = {"timestamp": sorted(totals)}  # type: Dict[str, list]
+        for index, field in enumerate(FIELDS):
+            result[field] = [
+                (
+                    totals[start][2 * index] / totals[start][2 * index + 1]
+                    if totals[start][2 * index + 1]
+                    else math.nan
+                )
+                for start in result["timestamp"]
+            ]
+        results.append(result)
+    return results
+
+
+def batch_averages(
+    windows: List[Dict[str, Any]], bucket: int, offset: float = 0.0
+) -> List[Dict[str, list]]:
+    """Return the average of each field per bucket for many reading windows.
+
+    Windows are columns as returned by ReadingStore.window(). Buckets are
+    bucket seconds long and aligned to UTC shifted by offset seconds. NaN
+    values are skipped. NumPy is used when available.
+    """
+    if numpy is not None:
+        return _numpy_batch(windows, bucket, offset)
+    return _python_batch(windows, bucket, offset)
+
+
+class LocalAverages:
+    """Hourly and daily averages of sensors, computed from a ReadingStore.
+
+    Averages are computed locally for sensors whose stored readings cover
+    the requested window, in one batch for all of them. The others are
+    requested from the server averages endpoints.
+    """
+
+    def __init__(
+        self, store: ReadingStore, utc_offset: Optional[timedelta] = None
+    ) -> None:
+        """Initialize, utc_offset aligns days to the controller's timezone."""
+        self._store = store
+        self._offset = utc_offset.total_seconds() if utc_offset else 0.0
+
+    def align(
+        self, bucket: int, start=None, end=None
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Return start and end widened to whole buckets, as epoch seconds.
+
+        Averages of a bucket cut by the window would be partial, while the
+        server always averages whole buckets.
+        """
+        start, end = epoch_seconds(start), epoch_seconds(end)
+        if start is not None:
+            start -= (start + self._offset) % bucket
+        if end is not None:
+            rest = (end + self._offset) % bucket
+            if rest:
+                end += bucket - rest
+        return start, end
+
+    def covers(self, sensor_id: str, start=None, end=None) -> bool:
+        """Return true if stored readings of the sensor span start to end.
+
+        An open window, start or end None, asks for the full history, which
+        the store never covers.
+        """
+        coverage = self._store.coverage(sensor_id)
+        if coverage is None or start is None or end is None:
+            return False
+        first, last = coverage
+        if first.timestamp() > epoch_seconds(start):
+            return False
+        if (last + READING_INTERVAL).timestamp() < epoch_seconds(end):
+            return False
+        return True
+
+    def compute(
+        self, sensor_ids: Iterable[str], bucket: int, start=None, end=None
+    ) -> Dict[str, List[dict]]:
+        """Return averages per bucket of the stored readings of sensors.
+
+        Records have the shape and order of the averages endpoints, newest
+        first, with created_at at the start of the bucket and the average
+        of each reading field. Buckets overlapping start or end are
+        averaged in full.
+        """
+        sensor_ids = list(sensor_ids)
+        start, end = self.align(bucket, start, end)
+        windows = [self._store.window(ident, start, end) for ident in sensor_ids]
+        averages = {}
+        stamps = {}  # type: Dict[float, str]
+        names = [name for _, name in _RECORD_FIELDS]
+        for ident, result in zip(
+            sensor_ids, batch_averages(windows, bucket, self._offset)
+        ):
+            # buckets are shared by all sensors, format each start once
+            created = []
+            for time in result["timestamp"]:
+                stamp = stamps.get(time)
+                if stamp is None:
+                    stamp = stamps[time] = format_timestamp(
+                        datetime.fromtimestamp(time, timezone.utc)
+                    )
+                created.append(stamp)
+
+            columns = [
+                [None if value != value else value for value in result[field]]
+                for field, _ in _RECORD_FIELDS
+            ]
+            records = [
+                dict(zip(names, values), created_at=stamp)
+                for stamp, *values in zip(created, *columns)
+            ]
+            records.reverse()
+            averages[ident] = records
+        return averages
+
+    async def averages(
+        self, sensors: Iterable[Any], bucket: int, start=None, end=None, columnar=False
+    ) -> Dict[str, PageObject]:
+        """Return averages of sensors, locally where covered, else from the server.
+
+        With both start and end, server averages are read page by page and
+        cut to the buckets overlapping the window, as local ones are, and
+        every sensor gets a single page. Otherwise the first server page is
+        returned as is.
+        """
+        start, end = self.align(bucket, start, end)
+        local = []  # type: List[str]
+        remote = []  # type: List[Any]
+        for sensor in sensors:
+            if self.covers(sensor.id, start, end):
+                local.append(sensor.id)
+            else:
+                remote.append(sensor)
+
+        pages = {
+            ident: PageObject.single(records, columnar)
+            for ident, records in self.compute(local, bucket, start, end).items()
+        }  # type: Dict[str, PageObject]
+
+        if remote:
+            _LOGGER.debug("Requesting averages of %d uncovered sensor(s)", len(remote))
+            fetch = [
+                self._remote(sensor, bucket, start, end, columnar) for sensor in remote
+            ]
+            for sensor, page in zip(remote, await asyncio.gather(*fetch)):
+                pages[sensor.id] = page
+        return pages
+
+    @staticmethod
+    async def _remote(sensor, bucket: int, start, end, columnar: bool) -> PageObject:
+        """Return server averages of the buckets overlapping start to end."""
+        if bucket == DAY:
+            page = await sensor.averages_day(columnar=columnar)
+        else:
+            page = await sensor.averages_hour(columnar=columnar)
+        if start is None or end is None:
+            return page
+
+        low, high = epoch_seconds(start), epoch_seconds(end)
+        records = []  # type: List[dict]
+        pages = page.raw_pages(read_ahead=0)
+        try:
+            async for _, data in pages:
+                older = False
+                for record in data:
+                    time = epoch_seconds(record["created_at"])
+                    if time + bucket <= low:
+                        older = True
+                    elif time < high:
+                        records.append(record)
+                # records are newest first, later pages are older still
+                if older:
+                    break
+        finally:
+            await pages.aclose()
+        return PageObject.single(records, columnar)
+
+    async def averages_day(
+        self, sensors: Iterable[Any], start=None, end=None, columnar: bool = False
+    ) -> Dict[str, PageObject]:
+        """Return daily averages of sensors, keyed by sensor id."""
+        return await self.averages(sensors, DAY, start, end, columnar)
+
+    async def averages_hour(
+        self, sensors: Iterable[Any], start=None, end=None, columnar: bool = False
+    ) -> Dict[str, PageObject]:
+        """Return hourly averages of sensors, keyed by sensor id."""
+        return await self.averages(sensors, HOUR, start, end, columnar)
@@ -39,6 +39,7 @@ from .errors import (
     RequestTimeout,
     TokenExpired,
 )
+from .interning import loads
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,12 +53,20 @@ class Client:
         timeout: Optional[int] = DEFAULT_TIMEOUT,
         ssl: Optional[bool] = True,
         proxy: Optional[str] = None,
+        intern_strings: Optional[bool] = False,
     ) -> None:
-        """Initialize."""
+        """Initialize.
+
+        With intern_strings=True responses are decoded with keys and
+        enum-like values (e.g. "ZONE_STARTED") interned, which saves memory
+        when many controllers or events are held at the cost of slower
+        decoding.
+        """
         self._websession = websession
         self._timeout = timeout
         self._ssl = ssl
         self._proxy = proxy
+        self._intern_strings = intern_strings
         self._auth = None  # type: Union[AuthToken, None]
 
     async def _request(
@@ -99,6 +108,10 @@ class Client:
                         ) as response:
                             await _throw_api_exception(response)
                             response.raise_for_status()
+                            if self._intern_strings:
+                                return await response.json(
+                                    content_type=None, loads=loads
+                                )
                             return await response.json(content_type=None)
                 except TokenExpired as err:
                     if not self._auth or not reauth_token:
@@ -208,6 +221,29 @@ class Client:
         """Get controller by index."""
         return self._controllers[idx]
 
+    async def refresh_sensors(
+        self, limit: int = 8, force: bool = False
+    ) -> Dict[str, List[str]]:
+        """Refresh moisture sensors of all controllers concurrently.
+
+        At most limit requests run at a time across all controllers. Returns
+        the ids of the sensors with new readings, keyed by controller id.
+        """
+        semaphore = asyncio.Semaphore(limit)
+        controllers = list(self._controllers.values())
+        sensors = [await controller.moisture_sensors() for controller in controllers]
+        changed = await asyncio.gather(
+            *(
+                moisture_sensors.refresh_all(force=force, semaphore=semaphore)
+                for moisture_sensors in sensors
+            )
+        )
+        return {
+            controller.id: ids
+            for controller, ids in zip(controllers, changed)
+            if ids
+        }
+
 
 def _create_auth_info(auth: dict) -> AuthToken:
     return AuthToken(
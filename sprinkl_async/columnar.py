@@ -0,0 +1,235 @@
+"""Columnar storage for lists of same-shaped records."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from array import array
+from typing import Any, Dict, List
+
+from .dataobject import DictObject, ListObject
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+_MISSING = object()
+
+# array typecodes used for numeric columns, object columns are plain lists
+_BOOL = "b"
+_INT = "q"
+_FLOAT = "d"
+_NUMPY_TYPES = {_BOOL: "bool", _INT: "int64", _FLOAT: "float64"}
+
+
+def _typecode(values: list):
+    """Return the array typecode that can hold all values, or None."""
+    typecode = None
+    for value in values:
+        if value is True or value is False:
+            kind = _BOOL
+        elif isinstance(value, int) and not isinstance(value, bool):
+            kind = _INT
+        elif isinstance(value, float):
+            kind = _FLOAT
+        else:
+            return None
+
+        if typecode is None or typecode == kind:
+            typecode = kind
+        elif {typecode, kind} == {_INT, _FLOAT}:
+            typecode = _FLOAT
+        else:
+            return None
+    return typecode
+
+
+def _column(values: list):
+    typecode = _typecode(values)
+    if typecode is None:
+        return values
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return values
+
+
+class ColumnarRow:
+    """View of one record of a ColumnarListObject."""
+
+    __slots__ = ("_table", "_index")
+
+    # pylint: disable=protected-access
+    def __init__(self, table: "ColumnarListObject", index: int) -> None:
+        """Initialize."""
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name):
+        """Allow property name access to data."""
+        if name not in ("_table", "_index"):
+            value = self._table._value(name, self._index)
+            if value is not _MISSING:
+                return value
+
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'".format(type(self).__name__, name)
+        )
+
+    def __iter__(self):
+        """Iterator."""
+        for name in self._table.columns:
+            if self._table._value(name, self._index) is not _MISSING:
+                yield name
+
+    def __getitem__(self, key):
+        """Return value of field."""
+        value = self._table._value(key, self._index)
+        if value is _MISSING:
+            raise KeyError
+        return value
+
+    def __len__(self):
+        """Return number of fields."""
+        return len(list(iter(self)))
+
+    def get(self, key):
+        """Return value of field or None."""
+        value = self._table._value(key, self._index)
+        return None if value is _MISSING else value
+
+    def __str__(self):
+        """Return string (json) representing the object."""
+        return self.json
+
+    def to_dict(self) -> dict:
+        """Return the record as a plain dict."""
+        return self._table._record(self._index)
+
+    @property
+    def json(self) -> str:
+        """Return a well-formated json string."""
+        return json.dumps(self.to_dict(), sort_keys=True, indent=4)
+
+
+class ColumnarListObject:
+    """Represent a list of records stored as one column per field.
+
+    Numeric and boolean fields are stored in contiguous arrays; column()
+    returns them as NumPy arrays when NumPy is installed. Rows are views
+    that support the same property access as DictObject.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, data: list) -> None:
+        """Initialize."""
+        names = {}  # type: Dict[Any, None]
+        for record in data:
+            if not isinstance(record, dict):
+                raise TypeError("ColumnarListObject takes a list of dict")
+            for name in record:
+                names[name] = None
+
+        self._length = len(data)
+        self._columns = {
+            name: _column([record.get(name, _MISSING) for record in data])
+            for name in names
+        }  # type: Dict[Any, Any]
+
+    def _value(self, name, index: int) -> Any:
+        column = self._columns.get(name)
+        if column is None:
+            return _MISSING
+
+        value = column[index]
+        if isinstance(column, array):
+            return bool(value) if column.typecode == _BOOL else value
+        if isinstance(value, dict):
+            return DictObject(value, lazy=True)
+        if isinstance(value, list):
+            return ListObject(value, lazy=True)
+        return value
+
+    def _record(self, index: int) -> dict:
+        record = {}
+        for name, column in self._columns.items():
+            value = column[index]
+            if value is _MISSING:
+                continue
+            if isinstance(column, array) and column.typecode == _BOOL:
+                value = bool(value)
+            record[name] = value
+        return record
+
+    def __iter__(self):
+        """Iterator."""
+        for index in range(self._length):
+            yield ColumnarRow(self, index)
+
+    def __getitem__(self, idx):
+        """Return row."""
+        if idx < 0 or idx >= self._length:
+            raise KeyError
+        return ColumnarRow(self, idx)
+
+    def __len__(self):
+        """Return number of rows."""
+        return self._length
+
+    def get(self, idx):
+        """Return row based on index."""
+        if idx < 0:
+            idx += self._length
+        if idx < 0 or idx >= self._length:
+            raise IndexError
+        return ColumnarRow(self, idx)
+
+    def __str__(self):
+        """Return string (json) representing the object."""
+        return self.json
+
+    @property
+    def columns(self) -> List[Any]:
+        """Return field names."""
+        return list(self._columns)
+
+    def column(self, name):
+        """Return all values of a field.
+
+        Numeric and boolean columns are returned as a NumPy array sharing the
+        column memory when NumPy is installed, otherwise as array.array.
+        Other columns are returned as a list with None for missing values.
+        """
+        column = self._columns[name]
+        if isinstance(column, array):
+            if numpy is not None:
+                return numpy.frombuffer(column, dtype=_NUMPY_TYPES[column.typecode])
+            return column
+        return [None if value is _MISSING else value for value in column]
+
+    def to_list(self) -> list:
+        """Return the records as a list of plain dicts."""
+        return [self._record(index) for index in range(self._length)]
+
+    @property
+    def data(self):
+        """Return list of rows."""
+        return list(self)
+
+    @property
+    def json(self) -> str:
+        """Return a well-formated json string."""
+        return json.dumps(self.to_list(), sort_keys=True, indent=4)
@@ -18,6 +18,7 @@ import logging
 from typing import Awaitable, Callable
 
 from .dataobject import DictObject
+from .frozen import FrozenDictObject, freeze
 from .moisturesensors import MoistureSensors
 from .pageobject import PageObject
 from .schedules import Schedules
@@ -41,14 +42,14 @@ class Controller:
         self._moisture_sensors = MoistureSensors(
             self._request_controller, controller_data["moisture_sensors"]
         )
-        self._weather = DictObject(controller_data["weather"])
+        self._weather = DictObject(controller_data["weather"], lazy=True)
         self._schedules = Schedules(
             self._request_controller,
             controller_data["schedules"],
             controller_data["conservation"]["seasonal_adjustments"],
         )
-        self._location = DictObject(controller_data["location"])
-        self._conservation = DictObject(controller_data["conservation"])
+        self._location = DictObject(controller_data["location"], lazy=True)
+        self._conservation = DictObject(controller_data["conservation"], lazy=True)
         self._zones = Zones(self._request_controller, controller_data["zones"])
         self._controller = controller_data
         self._webhooks = None
@@ -78,6 +79,15 @@ class Controller:
             reauth_token=True,
         )
 
+    @property
+    def data(self) -> dict:
+        """Return the controller document."""
+        return self._controller
+
+    def snapshot(self) -> FrozenDictObject:
+        """Return an immutable snapshot sharing unchanged parts with earlier ones."""
+        return freeze(self._controller)
+
     @property
     def enabled(self) -> bool:
         """Return if the controller is enabled."""
@@ -119,10 +129,12 @@ class Controller:
         """Return the zones."""
         return self._zones
 
-    async def history(self) -> PageObject:
+    async def history(self, columnar: bool = False) -> PageObject:
         """Return history of events."""
         data = await self._request_controller("get", "history")
-        return PageObject(data, self._request, "get", "history")
+        return PageObject(
+            data, self._request_controller, "get", "history", columnar=columnar
+        )
 
     async def stop(self) -> None:
         """Stop/halt the controller."""
@@ -15,8 +15,21 @@
 # limitations under the License.
 
 import json
+import weakref
+from json.encoder import encode_basestring_ascii
+from operator import add
+from types import MappingProxyType
 from typing import Any, Dict, List
 
+_INDENT = "\n    "
+
+# json fragments are cached down to this depth below the rendered object,
+# deeper levels are written in one pass so deep documents stay quadratic
+# (the size of their indented json) instead of cubic
+_CACHE_DEPTH = 16
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
 
 # pylint: disable=inconsistent-return-statements
 # List/Dict object contians only know types
@@ -24,113 +37,660 @@ def set_default(obj):
     """Make ListObject/DictObject into list/dict for serialization."""
     if isinstance(obj, ListObject):
         # pylint: disable=W0212
-        return obj._data
+        return obj._raw if obj._raw is not None else obj._data
 
     if isinstance(obj, DictObject):
         # pylint: disable=W0212
-        return obj._data
+        return obj._store()
+
+
+_ENCODER = json.JSONEncoder(sort_keys=True, indent=4, default=set_default)
+
+
+def _wrap(value, lazy: bool):
+    if isinstance(value, dict):
+        return DictObject(value, lazy=lazy)
+    if isinstance(value, list):
+        return ListObject(value, lazy=lazy)
+    return value
+
+
+def _link(child, parent_ref) -> None:
+    """Record that a cached fragment of the parent depends on child."""
+    current = child._parent
+    if current is None:
+        child._parent = parent_ref
+    elif isinstance(current, list):
+        if not any(ref is parent_ref for ref in current):
+            current.append(parent_ref)
+    elif current is not parent_ref:
+        child._parent = [current, parent_ref]
+
+
+def _invalidate(obj) -> None:
+    """Drop cached json of obj and every object whose json includes it."""
+    stack = [obj]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        node._json = None
+        parents = node._parent
+        if parents is None:
+            continue
+        for ref in parents if isinstance(parents, list) else (parents,):
+            parent = ref()
+            if parent is not None:
+                stack.append(parent)
+
+
+def _encode(value, parent_ref) -> str:
+    """Return json of value rendered at indent level 0.
+
+    Callers indent multi-line json, e.g. of a tuple, to the depth of value.
+    """
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (DictObject, ListObject)):
+        _link(value, parent_ref)
+        return value._fragment()  # pylint: disable=W0212
+    if isinstance(value, int):
+        return int.__repr__(value)
+    return _ENCODER.encode(value)
+
+
+def _encode_key(key) -> str:
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    return encode_basestring_ascii(_encode(key, None))
+
+
+_SCALAR_ENCODERS = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    bool: {True: "true", False: "false"}.__getitem__,
+    type(None): lambda value: "null",
+}  # type: Dict[type, Any]
+
+
+def _to_plain(obj) -> Any:
+    """Return plain dict/list data of obj, walking with an explicit stack."""
+    if obj._raw is not None:
+        return obj._raw
+
+    wrappers = (DictObject, ListObject)
+    root = _shallow_copy(obj)
+    stack = [root]
+    while stack:
+        target = stack.pop()
+        items = target.items() if isinstance(target, dict) else enumerate(target)
+        for key, value in items:
+            if isinstance(value, wrappers):
+                if value._raw is not None:
+                    target[key] = value._raw
+                else:
+                    target[key] = _shallow_copy(value)
+                    stack.append(target[key])
+    return root
+
+
+def _shallow_copy(obj) -> Any:
+    if isinstance(obj, DictObject):
+        return dict(obj._store())
+    return list(obj._data)
+
+
+def _unwrap(value):
+    if isinstance(value, (DictObject, ListObject)):
+        return _to_plain(value)
+    return value
+
+
+def _build(root, data) -> None:
+    """Fill an eager DictObject/ListObject with wrapped copies of data.
+
+    Walks with an explicit stack, so deep documents don't hit the recursion
+    limit and there is no call per nested object.
+    """
+    new = object.__new__
+    setattr_ = object.__setattr__
+    reserved = _reserved(DictObject)
+    stack = [(root, data)]
+    while stack:
+        target, source = stack.pop()
+        if isinstance(source, dict):
+            values = dict(source)  # type: Any
+            items = values.items()
+        else:
+            values = list(source)
+            items = enumerate(values)
+
+        for key, value in items:
+            if value.__class__ in _SCALARS:
+                continue
+            if isinstance(value, dict):
+                child = new(DictObject)  # type: Any
+            elif isinstance(value, list):
+                child = new(ListObject)
+            else:
+                continue
+            # slots, set directly rather than through DictObject.__setattr__
+            for name in ("_raw", "_data", "_json", "_parent"):
+                setattr_(child, name, None)
+            values[key] = child
+            stack.append((child, value))
+
+        if target.__class__ is ListObject:
+            target._data = values
+        elif target.__class__ is DictObject and reserved.isdisjoint(values):
+            setattr_(target, "__dict__", values)
+        else:
+            target._assign(values)
+
+
+def _render(root) -> str:
+    """Return json of root, rendering uncached children before parents."""
+    stack = [(root, 0, None)]  # type: List[Any]
+    while stack:
+        node, depth, entries = stack.pop()
+        if entries is None:
+            if node._json is not None:
+                continue
+            if depth >= _CACHE_DEPTH:
+                node._json = _dump(node)
+                continue
+            entries = node._entries()
+
+        text = _join(node, *entries)
+        if text.__class__ is str:
+            node._json = text
+            continue
+
+        stack.append((node, depth, entries))
+        stack.extend((child, depth + 1, None) for child in text)
+    return root._json
+
+
+def _join(node, keys, values) -> Any:
+    """Return json of node from its entries.
+
+    Returns the list of children that are not rendered yet instead, if any.
+    """
+    if not values:
+        return "[]" if keys is None else "{}"
+
+    ref = weakref.ref(node)
+    parts = []
+    pending = None
+    for value in values:
+        encode = _SCALAR_ENCODERS.get(value.__class__)
+        if encode is not None:
+            parts.append(encode(value))
+        elif isinstance(value, (DictObject, ListObject)):
+            _link(value, ref)
+            text = value._json
+            if text is None:
+                if pending is None:
+                    pending = []
+                pending.append(value)
+            elif pending is None:
+                parts.append(text.replace("\n", _INDENT))
+        else:
+            parts.append(_encode(value, ref).replace("\n", _INDENT))
+
+    if pending is not None:
+        return pending
+    if keys is None:
+        return "[" + _INDENT + ("," + _INDENT).join(parts) + "\n]"
+    return "{" + _INDENT + ("," + _INDENT).join(map(add, keys, parts)) + "\n}"
+
+
+def _dump(root) -> str:
+    """Return json of root written in one pass, without caching children."""
+    parts = []  # type: List[str]
+    stack = [(root, "\n")]  # type: List[Any]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+
+        node, newline = item
+        if node._json is not None:
+            parts.append(node._json.replace("\n", newline))
+            continue
+
+        keys, values = node._entries()
+        opening, closing = ("[", "]") if keys is None else ("{", "}")
+        if not values:
+            parts.append(opening + closing)
+            continue
+
+        ref = weakref.ref(node)
+        inner = newline + "    "
+        tokens = [opening]  # type: List[Any]
+        for pos, value in enumerate(values):
+            prefix = "," + inner if pos else inner
+            tokens.append(prefix if keys is None else prefix + keys[pos])
+            if isinstance(value, (DictObject, ListObject)):
+                _link(value, ref)
+                tokens.append((value, inner))
+            else:
+                tokens.append(_encode(value, ref).replace("\n", inner))
+        tokens.append(newline + closing)
+        stack.extend(reversed(tokens))
+    return "".join(parts)
 
 
 class ListObject:
-    """Represent a list with property access to sub-dict/list objects."""
+    """Represent a list with property access to sub-dict/list objects.
+
+    With lazy=True the decoded list is referenced rather than copied and
+    sub-dict/list objects are only wrapped (and cached) when accessed.
+
+    The json of the list is cached and reuses the cached json of wrapped
+    children; it is invalidated when the list or a child is mutated through
+    item assignment or append.
+    """
+
+    __slots__ = ("__weakref__", "_raw", "_data", "_wrapped", "_json", "_parent")
 
-    # pylint: disable=unused-variable
-    def __init__(self, data: list):
+    def __init__(self, data: list, lazy: bool = False):
         """Initialize."""
-        self._data = []  # type: List[Any]
-        for pos, item in enumerate(data):
-            if isinstance(item, dict):
-                self._data.append(DictObject(item))
-            elif isinstance(item, list):
-                self._data.append(ListObject(item))
-            else:
-                self._data.append(item)
+        self._json = None  # type: Any
+        self._parent = None  # type: Any
+        if lazy:
+            self._raw = data  # type: Any
+            self._data = None  # type: Any
+            self._wrapped = {}  # type: Dict[int, Any]
+            return
+
+        self._raw = None
+        self._data = []
+        _build(self, data)
+
+    def _child(self, idx):
+        value = self._raw[idx]
+        if isinstance(value, (dict, list)):
+            wrapped = self._wrapped.get(idx)
+            if wrapped is None:
+                wrapped = _wrap(value, True)
+                if self._json is not None or self._parent is not None:
+                    _link(wrapped, weakref.ref(self))
+                self._wrapped[idx] = wrapped
+            return wrapped
+        return value
 
     def __iter__(self):
         """Iterator."""
-        for item in self._data:
-            yield item
+        if self._raw is None:
+            for item in self._data:
+                yield item
+        else:
+            for idx in range(len(self._raw)):
+                yield self._child(idx)
 
     def __getitem__(self, idx):
         """Iterator."""
-        if idx < 0 or idx >= len(self._data):
+        if idx < 0 or idx >= len(self):
+            raise KeyError
+
+        if self._raw is None:
+            return self._data[idx]
+        return self._child(idx)
+
+    def __setitem__(self, idx, value):
+        """Set item and invalidate cached json."""
+        if idx < 0 or idx >= len(self):
             raise KeyError
 
-        return self._data[idx]
+        if self._raw is None:
+            self._data[idx] = _wrap(value, False)
+        else:
+            self._raw[idx] = _unwrap(value)
+            self._wrapped.pop(idx, None)
+        _invalidate(self)
 
     def __len__(self):
         """Return number of items."""
-        return len(self._data)
+        if self._raw is None:
+            return len(self._data)
+        return len(self._raw)
+
+    def append(self, value) -> None:
+        """Append item and invalidate cached json."""
+        if self._raw is None:
+            self._data.append(_wrap(value, False))
+        else:
+            self._raw.append(_unwrap(value))
+        _invalidate(self)
 
     def get(self, idx):
         """Return item based on index."""
-        return self._data[idx]
+        if self._raw is None:
+            return self._data[idx]
+        return self._child(idx)
 
     def __str__(self):
         """Return string (json) representing the object."""
         return self.json
 
+    def _fragment(self) -> str:
+        if self._json is not None:
+            return self._json
+        return _render(self)
+
+    def _entries(self):
+        return None, list(self._data if self._raw is None else self)
+
+    def to_list(self) -> list:
+        """Return the items as a plain list.
+
+        A lazy list returns the decoded list it wraps, without copying.
+        """
+        return _to_plain(self)
+
+    @property
+    def lazy(self) -> bool:
+        """Return true if children are wrapped on access."""
+        return self._raw is not None
+
     @property
-    def data(self):
-        """Return data object."""
-        return self._data
+    def data(self) -> tuple:
+        """Return the items, read-only so cached json stays valid."""
+        if self._raw is None:
+            return tuple(self._data)
+        return tuple(self)
 
     @property
     def json(self) -> str:
         """Return a well-formated json string."""
-        return json.dumps(self._data, sort_keys=True, indent=4, default=set_default)
+        return self._fragment()
 
 
 class DictObject:
-    """Represent a dict with property access to sub-dict/list objects."""
+    """Represent a dict with property access to sub-dict/list objects.
+
+    With lazy=True the decoded dict is referenced rather than copied and
+    sub-dict/list objects are only wrapped (and cached) when accessed.
+
+    The instance __dict__ holds the data itself, so key access by attribute
+    is a plain attribute lookup. Keys that collide with class attributes,
+    e.g. "get" or "update", are only reachable by item access, as before;
+    data holding such a key is kept in _data instead, with attribute access
+    to the other keys through __getattr__.
+
+    Setting or deleting an attribute that is not a slot or property sets
+    or deletes the data key, as item access does. Other private names are
+    kept apart from the data, subclasses should still declare __slots__
+    for their own attributes as that is faster.
 
-    def __init__(self, data: dict):
+    The json of the dict is cached and reuses the cached json of wrapped
+    children; it is invalidated when the dict or a child is mutated through
+    item or attribute assignment, deletion or update().
+    """
+
+    __slots__ = (
+        "__dict__",
+        "__weakref__",
+        "_raw",
+        "_data",
+        "_attrs",
+        "_json",
+        "_parent",
+    )
+
+    def __init__(self, data: dict, lazy: bool = False):
         """Initialize."""
-        self._data = {}  # type: Dict[Any, Any]
-        for key in data:
-            if isinstance(data[key], dict):
-                self._data[key] = DictObject(data[key])
-            elif isinstance(data[key], list):
-                self._data[key] = ListObject(data[key])
-            else:
-                self._data[key] = data[key]
+        # _data is only used for keys that would shadow methods if stored in
+        # __dict__: it then holds all data when eager, instead of __dict__,
+        # and the cached children of those keys when lazy
+        self._data = None  # type: Any
+        self._json = None  # type: Any
+        self._parent = None  # type: Any
+        if lazy:
+            self._raw = data  # type: Any
+            return
+
+        self._raw = None
+        _build(self, data)
+
+    def _assign(self, values: dict) -> None:
+        """Store the wrapped values of an eager dict."""
+        if _reserved(type(self)).isdisjoint(values):
+            self.__dict__ = values
+        else:
+            self._data = values
+
+    def _child(self, key):
+        cache = self.__dict__
+        if key in cache:
+            return cache[key]
+
+        value = self._raw[key]
+        if key in _reserved(type(self)):
+            if self._data is None:
+                self._data = {}
+            cache = self._data
+            if key in cache:
+                return cache[key]
+
+        if isinstance(value, (dict, list)):
+            value = _wrap(value, True)
+            if self._json is not None or self._parent is not None:
+                _link(value, weakref.ref(self))
+        cache[key] = value
+        return value
+
+    def __setattr__(self, name, value):
+        """Set a slot or property, or else the data key, like item access."""
+        if name in _OWN_SLOTS or name in _settable(type(self)):
+            object.__setattr__(self, name, value)
+        elif name.startswith("_"):
+            # attribute of a subclass without __slots__
+            try:
+                attrs = self._attrs
+            except AttributeError:
+                attrs = self._attrs = {}
+            attrs[name] = value
+        else:
+            self[name] = value
+
+    def __delattr__(self, name):
+        """Delete a data key, like item access."""
+        if name in _OWN_SLOTS or name in _settable(type(self)):
+            object.__delattr__(self, name)
+            return
+        if name.startswith("_"):
+            try:
+                del self._attrs[name]
+            except (AttributeError, KeyError):
+                raise AttributeError(name) from None
+            return
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
 
     def __getattr__(self, name):
         """Allow property name access to data."""
-        if name in self._data:
+        # only called when name isn't a class attribute or data key in __dict__
+        if name in _OWN_SLOTS:
+            raise AttributeError(name)
+        if name.startswith("_"):
+            try:
+                return self._attrs[name]
+            except (AttributeError, KeyError):
+                pass
+
+        raw = self._raw
+        if raw is not None:
+            if name in raw:
+                return self._child(name)
+        elif self._data is not None and name in self._data:
             return self._data[name]
 
-        return object.__getattribute__(self, name)
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'".format(type(self).__name__, name)
+        )
 
     def __iter__(self):
         """Iterator."""
-        for item in self._data:
+        for item in self._store():
             yield item
 
     def __getitem__(self, key):
         """Iterator."""
-        if key in self._data:
-            return self._data[key]
+        if self._raw is None:
+            store = self._store()
+            if key in store:
+                return store[key]
+        elif key in self._raw:
+            return self._child(key)
         raise KeyError
 
+    def __setitem__(self, key, value):
+        """Set key and invalidate cached json."""
+        self._set(key, value)
+        _invalidate(self)
+
+    def __delitem__(self, key):
+        """Delete key and invalidate cached json."""
+        if key not in self._store():
+            raise KeyError
+
+        if self._raw is not None:
+            del self._raw[key]
+        self.__dict__.pop(key, None)
+        if self._data is not None:
+            self._data.pop(key, None)
+        _invalidate(self)
+
     def __len__(self):
         """Return number of items."""
-        return len(self._data)
+        return len(self._store())
+
+    def _set(self, key, value) -> None:
+        if self._raw is not None:
+            self._raw[key] = _unwrap(value)
+            self.__dict__.pop(key, None)
+            if self._data is not None:
+                self._data.pop(key, None)
+            return
+
+        value = _wrap(value, False)
+        if self._data is None and key in _reserved(type(self)):
+            # move all data out of __dict__, where the key would shadow a method
+            self._data = self.__dict__
+            self.__dict__ = {}
+        self._store()[key] = value
+
+    def _store(self) -> dict:
+        if self._raw is not None:
+            return self._raw
+        if self._data is not None:
+            return self._data
+        return self.__dict__
 
     def get(self, key):
         """Return key."""
-        return self._data.get(key)
+        if self._raw is None:
+            return self._store().get(key)
+        if key in self._raw:
+            return self._child(key)
+        return None
+
+    def update(self, data: dict) -> None:
+        """Update keys from data, e.g. a refreshed document."""
+        for key in data:
+            self._set(key, data[key])
+        _invalidate(self)
 
     def __str__(self):
         """Return string (json) representing the object."""
         return self.json
 
+    def _fragment(self) -> str:
+        if self._json is not None:
+            return self._json
+        return _render(self)
+
+    def _entries(self):
+        store = self._store()
+        keys = sorted(store)
+        if self._raw is None:
+            values = [store[key] for key in keys]
+        else:
+            values = [self._child(key) for key in keys]
+        return [_encode_key(key) + ": " for key in keys], values
+
+    def to_dict(self) -> dict:
+        """Return the data as a plain dict.
+
+        A lazy dict returns the decoded dict it wraps, without copying.
+        """
+        return _to_plain(self)
+
     @property
-    def data(self):
-        """Return data object."""
-        return self._data
+    def lazy(self) -> bool:
+        """Return true if children are wrapped on access."""
+        return self._raw is not None
+
+    @property
+    def data(self) -> MappingProxyType:
+        """Return the items, read-only so cached json stays valid."""
+        if self._raw is None:
+            return MappingProxyType(self._store())
+        return MappingProxyType({key: self._child(key) for key in self._raw})
 
     @property
     def json(self) -> str:
         """Return a well-formated json string."""
-        return json.dumps(self._data, sort_keys=True, indent=4, default=set_default)
+        return self._fragment()
+
+
+_OWN_SLOTS = frozenset(DictObject.__slots__)
+_RESERVED = {}  # type: Dict[type, frozenset]
+_SETTABLE = {}  # type: Dict[type, frozenset]
+
+
+def _reserved(cls) -> frozenset:
+    """Return attribute names of cls that data keys in __dict__ would shadow.
+
+    Data descriptors (properties, slots) take precedence over the instance
+    __dict__, so only methods and plain class attributes need protecting.
+    """
+    names = _RESERVED.get(cls)
+    if names is None:
+        names = frozenset(
+            name
+            for klass in cls.__mro__
+            for name, attr in vars(klass).items()
+            if not hasattr(type(attr), "__set__")
+            and not hasattr(type(attr), "__delete__")
+        )
+        _RESERVED[cls] = names
+    return names
+
+
+def _settable(cls) -> frozenset:
+    """Return names of slots and properties of cls, set on the object itself."""
+    names = _SETTABLE.get(cls)
+    if names is None:
+        names = frozenset(
+            name
+            for klass in cls.__mro__
+            for name, attr in vars(klass).items()
+            if hasattr(type(attr), "__set__")
+        )
+        _SETTABLE[cls] = names
+    return names
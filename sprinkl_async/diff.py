@@ -0,0 +1,247 @@
+"""Structural diff of controller snapshots with change subscriptions."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_CHANGED = "changed"
+
+_KIND_DICT = b"\x01"
+_KIND_LIST = b"\x02"
+_KIND_KEYED_LIST = b"\x03"
+_KIND_VALUE = b"\x00"
+
+# 128 bit digests, equal digests are taken as equal subtrees
+_DIGEST_SIZE = 16
+
+
+class ChangeEvent(NamedTuple):
+    """A single change between two snapshots."""
+
+    kind: str
+    path: Tuple[Any, ...]
+    old: Any
+    new: Any
+
+
+class _Node:
+    """Hashed mirror of a snapshot value."""
+
+    __slots__ = ("digest", "kind", "value", "children")
+
+    def __init__(
+        self, digest: bytes, kind: bytes, value: Any, children: Optional[dict]
+    ):
+        self.digest = digest
+        self.kind = kind
+        self.value = value
+        self.children = children
+
+
+def _keyed_by_id(items: list) -> bool:
+    if not items:
+        return False
+
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict) or "id" not in item:
+            return False
+        ident = item["id"]
+        if not isinstance(ident, (str, int)) or ident in seen:
+            return False
+        seen.add(ident)
+    return True
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _leaf(value: Any) -> bytes:
+    """Return digest of a scalar, by type and repr, so nan equals nan."""
+    return blake2b(
+        _KIND_VALUE + type(value).__name__.encode() + b":" + repr(value).encode(),
+        digest_size=_DIGEST_SIZE,
+    ).digest()
+
+
+def _digest(kind: bytes, children: Dict[Any, _Node], ordered: bool) -> bytes:
+    parts = [_leaf(key) + node.digest for key, node in children.items()]
+    if not ordered:
+        parts.sort()
+    return blake2b(kind + b"".join(parts), digest_size=_DIGEST_SIZE).digest()
+
+
+def _build(value: Any) -> _Node:
+    if isinstance(value, dict):
+        children = {key: _build(item) for key, item in value.items()}
+        return _Node(_digest(_KIND_DICT, children, False), _KIND_DICT, value, children)
+
+    if isinstance(value, list):
+        if _keyed_by_id(value):
+            children = {item["id"]: _build(item) for item in value}
+            kind = _KIND_KEYED_LIST
+            digest = _digest(kind, children, False)
+        else:
+            children = {pos: _build(item) for pos, item in enumerate(value)}
+            kind = _KIND_LIST
+            digest = _digest(kind, children, True)
+        return _Node(digest, kind, value, children)
+
+    return _Node(_leaf(value), _KIND_VALUE, value, None)
+
+
+def _diff(old: _Node, new: _Node, path: tuple, events: List[ChangeEvent]) -> None:
+    if old.digest == new.digest:
+        return
+
+    if old.children is None or new.children is None or old.kind != new.kind:
+        events.append(ChangeEvent(CHANGE_CHANGED, path, old.value, new.value))
+        return
+
+    for key, node in old.children.items():
+        if key not in new.children:
+            events.append(ChangeEvent(CHANGE_REMOVED, path + (key,), node.value, None))
+
+    for key, node in new.children.items():
+        if key in old.children:
+            _diff(old.children[key], node, path + (key,), events)
+        else:
+            events.append(ChangeEvent(CHANGE_ADDED, path + (key,), None, node.value))
+
+
+def diff(old: Any, new: Any) -> List[ChangeEvent]:
+    """Return the changes between two decoded JSON documents."""
+    events = []  # type: List[ChangeEvent]
+    _diff(_build(old), _build(new), (), events)
+    return events
+
+
+class Subscription:
+    """Async iterator of change events delivered by a ChangeFeed."""
+
+    def __init__(self, feed: "ChangeFeed", prefix: tuple, maxsize: int) -> None:
+        """Initialize."""
+        self._feed = feed
+        self._prefix = prefix
+        self._queue = asyncio.Queue(maxsize=maxsize)  # type: asyncio.Queue
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        """Return number of events dropped because the queue was full."""
+        return self._dropped
+
+    def matches(self, event: ChangeEvent) -> bool:
+        """Return true if the event is below the subscribed path prefix."""
+        return event.path[: len(self._prefix)] == self._prefix
+
+    def put(self, event: ChangeEvent) -> None:
+        """Queue an event, dropping the oldest one if the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self._dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self) -> ChangeEvent:
+        """Wait for and return the next event."""
+        return await self._queue.get()
+
+    def get_nowait(self) -> ChangeEvent:
+        """Return the next event or raise asyncio.QueueEmpty."""
+        return self._queue.get_nowait()
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self._feed.unsubscribe(self)
+
+    def __aiter__(self):
+        """Return async iterator."""
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        """Return next event."""
+        return await self._queue.get()
+
+    def __enter__(self):
+        """Enter context."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit context and unsubscribe."""
+        self.close()
+
+
+class ChangeFeed:
+    """Diff successive controller snapshots and publish the changes."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._nodes = {}  # type: Dict[Any, _Node]
+        self._subscriptions = []  # type: List[Subscription]
+
+    def subscribe(self, prefix: Iterable[Any] = (), maxsize: int = 0) -> Subscription:
+        """Subscribe to changes below a path prefix, e.g. ("1", "zones")."""
+        subscription = Subscription(self, tuple(prefix), maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription."""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def update(self, controllers: Iterable[Any]) -> List[ChangeEvent]:
+        """Diff a new poll of controllers (objects or dicts) and publish changes.
+
+        Paths start with the controller id. Lists of objects carrying an id
+        (zones, schedules, sensors) are keyed by that id instead of position.
+        """
+        nodes = {}
+        for controller in controllers:
+            data = controller if isinstance(controller, dict) else controller.data
+            nodes[data["id"]] = _build(data)
+
+        events = []  # type: List[ChangeEvent]
+        for ident, node in self._nodes.items():
+            if ident not in nodes:
+                events.append(ChangeEvent(CHANGE_REMOVED, (ident,), node.value, None))
+
+        for ident, node in nodes.items():
+            if ident in self._nodes:
+                _diff(self._nodes[ident], node, (ident,), events)
+            else:
+                events.append(ChangeEvent(CHANGE_ADDED, (ident,), None, node.value))
+
+        self._nodes = nodes
+        self._publish(events)
+        return events
+
+    def _publish(self, events: List[ChangeEvent]) -> None:
+        for event in events:
+            for subscription in self._subscriptions:
+                if subscription.matches(event):
+                    subscription.put(event)
+
+        _LOGGER.debug(
+            "Published %d change(s) to %d subscriber(s)",
+            len(events),
+            len(self._subscriptions),
+        )
@@ -0,0 +1,210 @@
+"""Downsample long sensor series for plotting, in a single streaming pass."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .pageobject import PageObject
+from .readingstore import epoch_seconds
+
+Point = Tuple[float, float]
+
+
+def _bucket(time: float, width: float) -> int:
+    return math.floor(time / width)
+
+
+class LTTB:
+    """Largest-Triangle-Three-Buckets over points split into time buckets.
+
+    Points are added in time order, either direction, and one point per
+    bucket of width seconds is emitted as soon as the following bucket is
+    complete, the one forming the largest triangle with the previously
+    emitted point and the average of the following bucket. The first and
+    last points are always kept. Only two buckets are held in memory.
+    """
+
+    def __init__(self, width: float) -> None:
+        """Initialize."""
+        self.width = width
+        self._anchor = None  # type: Optional[Point]
+        self._current = []  # type: List[Point]
+        self._next = []  # type: List[Point]
+        self._next_bucket = None  # type: Optional[int]
+
+    def _select(self, points: List[Point], after: Point) -> Point:
+        assert self._anchor is not None
+        anchor_time, anchor_value = self._anchor
+        after_time, after_value = after
+        best, largest = points[0], -1.0
+        for point in points:
+            area = abs(
+                (anchor_time - after_time) * (point[1] - anchor_value)
+                - (anchor_time - point[0]) * (after_value - anchor_value)
+            )
+            if area > largest:
+                best, largest = point, area
+        self._anchor = best
+        return best
+
+    @staticmethod
+    def _average(points: List[Point]) -> Point:
+        count = len(points)
+        return (
+            sum(point[0] for point in points) / count,
+            sum(point[1] for point in points) / count,
+        )
+
+    def add(self, time: float, value: float) -> List[Point]:
+        """Add a point, return the points emitted by it."""
+        point = (time, value)
+        if self._anchor is None:
+            self._anchor = point
+            return [point]
+
+        bucket = _bucket(time, self.width)
+        if self._next_bucket is None or bucket == self._next_bucket:
+            self._next_bucket = bucket
+            self._next.append(point)
+            return []
+
+        emitted = []
+        if self._current:
+            emitted.append(self._select(self._current, self._average(self._next)))
+        self._current, self._next = self._next, [point]
+        self._next_bucket = bucket
+        return emitted
+
+    def flush(self) -> List[Point]:
+        """Return the remaining points, ending with the last point added."""
+        if self._next:
+            last = self._next.pop()
+        elif self._current:
+            last = self._current.pop()
+        else:
+            return []
+
+        emitted = []
+        if self._current:
+            after = self._average(self._next) if self._next else last
+            emitted.append(self._select(self._current, after))
+        if self._next:
+            emitted.append(self._select(self._next, last))
+        emitted.append(last)
+        self._current, self._next = [], []
+        self._next_bucket = None
+        return emitted
+
+
+class MinMax:
+    """Minimum and maximum point of each time bucket of width seconds.
+
+    Both extremes are emitted in the order they were added, once a point
+    of another bucket arrives, so spikes survive any reduction.
+    """
+
+    def __init__(self, width: float) -> None:
+        """Initialize."""
+        self.width = width
+        self._bucket = None  # type: Optional[int]
+        self._low = None  # type: Optional[Tuple[float, int, Point]]
+        self._high = None  # type: Optional[Tuple[float, int, Point]]
+        self._count = 0
+
+    def _emit(self) -> List[Point]:
+        low, high = self._low, self._high
+        if low is None or high is None:
+            return []
+        self._low = self._high = None
+        if low[1] == high[1]:
+            return [low[2]]
+        first, second = (low, high) if low[1] < high[1] else (high, low)
+        return [first[2], second[2]]
+
+    def add(self, time: float, value: float) -> List[Point]:
+        """Add a point, return the points emitted by it."""
+        bucket = _bucket(time, self.width)
+        emitted = [] if bucket == self._bucket else self._emit()
+        self._bucket = bucket
+
+        self._count += 1
+        entry = (value, self._count, (time, value))
+        if self._low is None or value < self._low[0]:
+            self._low = entry
+        if self._high is None or value > self._high[0]:
+            self._high = entry
+        return emitted
+
+    def flush(self) -> List[Point]:
+        """Return the points of the last bucket."""
+        self._bucket = None
+        return self._emit()
+
+
+METHODS = {"lttb": LTTB, "minmax": MinMax}
+
+
+def _sampler(method: str, width: float):
+    factory = METHODS.get(method)
+    if factory is None:
+        raise ValueError(
+            "Unknown method {0}, use one of {1}".format(method, tuple(METHODS))
+        )
+    return factory(width)
+
+
+def downsample(
+    points: Iterable[Point], width: float, method: str = "lttb"
+) -> Iterator[Point]:
+    """Yield points reduced to about one (lttb) or two (minmax) per bucket.
+
+    Points are (time, value) in time order, buckets width seconds long.
+    Points with a None or NaN value are skipped.
+    """
+    sampler = _sampler(method, width)
+    for time, value in points:
+        if value is None or value != value:
+            continue
+        yield from sampler.add(time, value)
+    yield from sampler.flush()
+
+
+async def downsample_page(
+    page: PageObject,
+    fields: Sequence[str],
+    width: float,
+    method: str = "lttb",
+    time_field: str = "created_at",
+    read_ahead: int = 1,
+) -> Dict[str, List[Point]]:
+    """Downsample fields of all pages, e.g. of MoistureSensor.readings().
+
+    Records are streamed page by page, only the reduced points of each
+    field are kept. Times are returned as epoch seconds, in the order of
+    the pages, which is newest first for the readings endpoint.
+    """
+    samplers = {field: _sampler(method, width) for field in fields}
+    result = {field: [] for field in fields}  # type: Dict[str, List[Point]]
+    async for record in page.stream(read_ahead):
+        time = epoch_seconds(record[time_field])
+        for field, sampler in samplers.items():
+            value = record.get(field)
+            if value is None or value != value:
+                continue
+            result[field].extend(sampler.add(time, value))
+    for field, sampler in samplers.items():
+        result[field].extend(sampler.flush())
+    return result
@@ -0,0 +1,324 @@
+"""Stream paged history and readings to NDJSON, CSV or Parquet files."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import csv
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from .errors import SprinklError
+from .pageobject import PageObject
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.ipc  # type: ignore
+    import pyarrow.parquet  # type: ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def flatten(record: dict, prefix: str = "") -> Dict[str, Any]:
+    """Return record with nested dicts as dotted keys and lists as json."""
+    result = {}  # type: Dict[str, Any]
+    for key, value in record.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            result.update(flatten(value, name + "."))
+        elif isinstance(value, list):
+            result[name] = json.dumps(value, sort_keys=True)
+        else:
+            result[name] = value
+    return result
+
+
+def _fields(records: list) -> List[str]:
+    fields = set()  # type: Set[str]
+    for record in records:
+        fields.update(flatten(record))
+    return sorted(fields)
+
+
+class Exporter(abc.ABC):
+    """Base for writers of exported records, one page at a time.
+
+    Progress is kept next to the output in "<path>.progress", so an
+    interrupted export can resume after the last completed page.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        self.path = path
+        self._progress_path = path + ".progress"
+
+    def _load_progress(self) -> Optional[dict]:
+        try:
+            with open(self._progress_path) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def _save_progress(self, progress: dict) -> None:
+        temp = self._progress_path + ".tmp"
+        with open(temp, "w") as handle:
+            json.dump(progress, handle, sort_keys=True)
+        os.replace(temp, self._progress_path)
+
+    def open(self, resume: bool = False) -> int:
+        """Open the output and return the last page already exported."""
+        progress = self._load_progress() if resume else None
+        if progress is None:
+            self._create()
+            return 0
+        self._resume(progress)
+        return progress["page"]
+
+    @abc.abstractmethod
+    def _create(self) -> None:
+        """Create the output."""
+
+    @abc.abstractmethod
+    def _resume(self, progress: dict) -> None:
+        """Reopen the output after the page of progress."""
+
+    @abc.abstractmethod
+    def write_page(self, page: int, records: list) -> None:
+        """Write the records of a page."""
+
+    def finish(self) -> None:
+        """Write anything pending after the last page."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Release the output file."""
+
+
+class _TextExporter(Exporter):
+    """Line based exporter, progress is saved after every page."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        super().__init__(path)
+        self._handle = None  # type: Any
+
+    def _create(self) -> None:
+        self._handle = open(self.path, "w", newline="")
+
+    def _resume(self, progress: dict) -> None:
+        # drop a page that was partially written when the export stopped
+        self._handle = open(self.path, "r+", newline="")
+        self._handle.seek(progress["size"])
+        self._handle.truncate()
+
+    @abc.abstractmethod
+    def _write(self, records: list) -> None:
+        """Write records to the open file."""
+
+    def write_page(self, page: int, records: list) -> None:
+        """Write the records of a page and save progress."""
+        self._write(records)
+        self._handle.flush()
+        self._save_progress({"page": page, "size": self._handle.tell()})
+
+    def close(self) -> None:
+        """Release the output file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class NdjsonExporter(_TextExporter):
+    """Write one json document per record and line."""
+
+    def _write(self, records: list) -> None:
+        self._handle.writelines(
+            json.dumps(record, sort_keys=True) + "\n" for record in records
+        )
+
+
+class CsvExporter(_TextExporter):
+    """Write flattened records as CSV.
+
+    Columns are the given fields, or the fields of the first page that has
+    records; fields not in the header are left out.
+    """
+
+    def __init__(self, path: str, fields: Optional[List[str]] = None) -> None:
+        """Initialize."""
+        super().__init__(path)
+        self._fields = fields
+        self._writer = None  # type: Any
+
+    def _resume(self, progress: dict) -> None:
+        super()._resume(progress)
+        self._fields = progress.get("fields")
+        if self._fields is not None:
+            self._writer = self._dict_writer(self._fields)
+
+    def _dict_writer(self, fields: List[str]) -> csv.DictWriter:
+        return csv.DictWriter(self._handle, fields, extrasaction="ignore")
+
+    def _write(self, records: list) -> None:
+        if self._writer is None:
+            if not records and self._fields is None:
+                return
+            if self._fields is None:
+                self._fields = _fields(records)
+            self._writer = self._dict_writer(self._fields)
+            self._writer.writeheader()
+        self._writer.writerows(flatten(record) for record in records)
+
+    def _save_progress(self, progress: dict) -> None:
+        progress["fields"] = self._fields if self._writer is not None else None
+        super()._save_progress(progress)
+
+
+def _widen(schema: Any) -> Any:
+    """Return an inferred schema that later pages can still be written with."""
+    fields = []
+    for field in schema:
+        if pyarrow.types.is_integer(field.type):
+            # a reading like temp may be whole on one page only
+            field = field.with_type(pyarrow.float64())
+        elif pyarrow.types.is_null(field.type):
+            field = field.with_type(pyarrow.string())
+        fields.append(field)
+    return pyarrow.schema(fields)
+
+
+class ParquetExporter(Exporter):
+    """Write flattened records as a directory of Parquet files.
+
+    Each page is a row group and every pages_per_file pages go to a new
+    part file. Progress is saved when a part file is complete, a resumed
+    export rewrites the pages of an incomplete part file. Requires pyarrow.
+
+    The columns are those of schema, a pyarrow schema or a dict of field
+    name and pyarrow type. Without it they are inferred from the first
+    page that has records, with integers written as float64 and columns
+    without any value as strings; fields not in the schema are left out.
+    """
+
+    def __init__(self, path: str, pages_per_file: int = 10, schema: Any = None) -> None:
+        """Initialize."""
+        if pyarrow is None:
+            raise SprinklError("pyarrow is required for Parquet export")
+        super().__init__(path)
+        if isinstance(schema, dict):
+            schema = pyarrow.schema(list(schema.items()))
+        self._pages_per_file = pages_per_file
+        self._schema = schema  # type: Any
+        self._writer = None  # type: Any
+        self._files = 0
+        self._pages = 0
+        self._page = 0
+
+    def _create(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self._remove_parts(0)
+
+    def _resume(self, progress: dict) -> None:
+        self._files = progress["files"]
+        self._page = progress["page"]
+        if progress.get("schema") is not None:
+            self._schema = pyarrow.ipc.read_schema(
+                pyarrow.py_buffer(bytes.fromhex(progress["schema"]))
+            )
+        self._remove_parts(self._files)
+
+    def _part(self, number: int) -> str:
+        return os.path.join(self.path, "part-{0:05d}.parquet".format(number))
+
+    def _remove_parts(self, first: int) -> None:
+        for name in os.listdir(self.path):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                if int(name[5:-8]) >= first:
+                    os.remove(os.path.join(self.path, name))
+
+    def write_page(self, page: int, records: list) -> None:
+        """Write the records of a page as a row group."""
+        self._page = page
+        if records:
+            rows = [flatten(record) for record in records]
+            if self._schema is None:
+                columns = {
+                    field: [row.get(field) for row in rows]
+                    for field in _fields(records)
+                }
+                self._schema = _widen(pyarrow.Table.from_pydict(columns).schema)
+            table = pyarrow.Table.from_pydict(
+                {name: [row.get(name) for row in rows] for name in self._schema.names},
+                schema=self._schema,
+            )
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(
+                    self._part(self._files), self._schema
+                )
+            self._writer.write_table(table)
+
+        self._pages += 1
+        if self._pages >= self._pages_per_file:
+            self._roll()
+
+    def _roll(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._files += 1
+        self._pages = 0
+
+        schema = None
+        if self._schema is not None:
+            schema = self._schema.serialize().to_pybytes().hex()
+        self._save_progress(
+            {"page": self._page, "files": self._files, "schema": schema}
+        )
+
+    def finish(self) -> None:
+        """Complete the current part file."""
+        self._roll()
+
+    def close(self) -> None:
+        """Release the current part file, it is rewritten on resume."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+async def export(
+    page: PageObject, exporter: Exporter, resume: bool = False, read_ahead: int = 1
+) -> int:
+    """Write the records of page and all following pages, return the count.
+
+    Pages are written as they arrive and dropped afterwards. With resume,
+    pages completed by an earlier export are skipped; this assumes page
+    boundaries did not move in between, e.g. an exported range of readings.
+    """
+    done = exporter.open(resume)
+    count = 0
+    try:
+        async for number, records in page.raw_pages(read_ahead, start=done + 1):
+            exporter.write_page(number, records)
+            count += len(records)
+        exporter.finish()
+    finally:
+        exporter.close()
+
+    _LOGGER.debug("Exported %d record(s) to %s", count, exporter.path)
+    return count
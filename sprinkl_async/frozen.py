@@ -0,0 +1,287 @@
+"""Immutable, hash-consed variants of DictObject and ListObject."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataobject import DictObject, ListObject
+
+
+def _same(left, right) -> bool:
+    """Return true if two frozen children or scalars are identical json."""
+    return left is right or (type(left) is type(right) and left == right)
+
+
+class _Ref(weakref.ref):
+    """Weak reference remembering the bucket it is stored in."""
+
+    __slots__ = ("digest",)
+
+    digest: int
+
+
+def _value_hash(value) -> int:
+    if isinstance(value, (FrozenDictObject, FrozenListObject)):
+        return value._hash  # pylint: disable=protected-access
+    # include the type so 1, 1.0 and True do not collide
+    return hash((type(value).__name__, value))
+
+
+class Interner:
+    """Table of frozen objects so identical subtrees are stored once.
+
+    Entries are weak, an object is dropped from the table when no snapshot
+    references it anymore.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._buckets = {}  # type: Dict[int, List[_Ref]]
+        self._callback = self._remove
+
+    def __len__(self):
+        """Return number of live interned objects."""
+        return sum(
+            1 for refs in self._buckets.values() for ref in refs if ref() is not None
+        )
+
+    def freeze(self, data) -> Any:
+        """Return data (dict, list, DictObject, ListObject) as frozen objects.
+
+        Frozen objects, also inside data, are returned as they are.
+        """
+        if isinstance(data, (FrozenDictObject, FrozenListObject)):
+            return data
+        if isinstance(data, DictObject):
+            data = data.to_dict()
+        elif isinstance(data, ListObject):
+            data = data.to_list()
+
+        if isinstance(data, dict):
+            items = {key: self.freeze(value) for key, value in data.items()}
+            return self._intern(FrozenDictObject, items)
+        if isinstance(data, list):
+            return self._intern(FrozenListObject, tuple(self.freeze(v) for v in data))
+        return data
+
+    # pylint: disable=protected-access
+    def _intern(self, cls, items) -> Any:
+        if cls is FrozenDictObject:
+            digest = hash(
+                (cls, frozenset((key, _value_hash(v)) for key, v in items.items()))
+            )
+        else:
+            digest = hash((cls, tuple(_value_hash(value) for value in items)))
+
+        refs = self._buckets.setdefault(digest, [])
+        for ref in refs:
+            candidate = ref()
+            if candidate is not None and candidate._same_items(items):
+                return candidate
+
+        obj = object.__new__(cls)
+        obj._items = items
+        obj._hash = digest
+        obj._json = None
+        ref = _Ref(obj, self._callback)
+        ref.digest = digest
+        refs.append(ref)
+        return obj
+
+    def _remove(self, ref: _Ref) -> None:
+        refs = self._buckets.get(ref.digest)
+        if refs is None:
+            return
+        refs[:] = [item for item in refs if item is not ref]
+        if not refs:
+            del self._buckets[ref.digest]
+
+
+_INTERNER = Interner()
+
+
+def freeze(data, interner: Optional[Interner] = None) -> Any:
+    """Return a frozen copy of data, sharing identical subtrees.
+
+    Without an interner the module wide one is used, so successive snapshots
+    of the same controller share everything that did not change.
+    """
+    return (interner or _INTERNER).freeze(data)
+
+
+class FrozenDictObject:
+    """Immutable dict with property access, usable as a dict key.
+
+    Equal objects created by the same Interner are the same object, so
+    equality of interned snapshots is an identity check.
+    """
+
+    __slots__ = ("__weakref__", "_items", "_hash", "_json")
+
+    _items: Dict[str, Any]
+    _hash: int
+    _json: Optional[str]
+
+    def __new__(cls, data: dict):
+        """Return the interned object for data."""
+        return _INTERNER.freeze(dict(data))
+
+    def _same_items(self, items: dict) -> bool:
+        if len(items) != len(self._items):
+            return False
+        for key, value in items.items():
+            if key not in self._items or not _same(self._items[key], value):
+                return False
+        return True
+
+    def __getattr__(self, name):
+        """Allow property name access to data."""
+        if name != "_items" and name in self._items:
+            return self._items[name]
+
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'".format(type(self).__name__, name)
+        )
+
+    def __iter__(self):
+        """Iterator."""
+        return iter(self._items)
+
+    def __getitem__(self, key):
+        """Return value of key."""
+        return self._items[key]
+
+    def __contains__(self, key):
+        """Return true if key is present."""
+        return key in self._items
+
+    def __len__(self):
+        """Return number of items."""
+        return len(self._items)
+
+    def __hash__(self):
+        """Return the precomputed structural hash."""
+        return self._hash
+
+    def __eq__(self, other):
+        """Return true if both objects hold the same data."""
+        if self is other:
+            return True
+        if not isinstance(other, FrozenDictObject):
+            return NotImplemented
+        return self._hash == other._hash and self._same_items(other._items)
+
+    def __repr__(self):
+        """Return repr of object."""
+        return "FrozenDictObject({0!r})".format(self.to_dict())
+
+    def __str__(self):
+        """Return string (json) representing the object."""
+        return self.json
+
+    def get(self, key):
+        """Return key."""
+        return self._items.get(key)
+
+    def items(self):
+        """Return (key, value) pairs."""
+        return self._items.items()
+
+    def to_dict(self) -> dict:
+        """Return the data as a plain dict."""
+        return {key: _thaw(value) for key, value in self._items.items()}
+
+    @property
+    def json(self) -> str:
+        """Return a well-formated json string."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), sort_keys=True, indent=4)
+        return self._json
+
+
+class FrozenListObject:
+    """Immutable list of frozen objects and scalars, usable as a dict key."""
+
+    __slots__ = ("__weakref__", "_items", "_hash", "_json")
+
+    _items: Tuple[Any, ...]
+    _hash: int
+    _json: Optional[str]
+
+    def __new__(cls, data: list):
+        """Return the interned object for data."""
+        return _INTERNER.freeze(list(data))
+
+    def _same_items(self, items: tuple) -> bool:
+        return len(items) == len(self._items) and all(
+            _same(left, right) for left, right in zip(self._items, items)
+        )
+
+    def __iter__(self):
+        """Iterator."""
+        return iter(self._items)
+
+    def __getitem__(self, idx):
+        """Return item."""
+        return self._items[idx]
+
+    def __len__(self):
+        """Return number of items."""
+        return len(self._items)
+
+    def __hash__(self):
+        """Return the precomputed structural hash."""
+        return self._hash
+
+    def __eq__(self, other):
+        """Return true if both objects hold the same data."""
+        if self is other:
+            return True
+        if not isinstance(other, FrozenListObject):
+            return NotImplemented
+        return self._hash == other._hash and self._same_items(other._items)
+
+    def __repr__(self):
+        """Return repr of object."""
+        return "FrozenListObject({0!r})".format(self.to_list())
+
+    def __str__(self):
+        """Return string (json) representing the object."""
+        return self.json
+
+    def get(self, idx):
+        """Return item based on index."""
+        return self._items[idx]
+
+    def to_list(self) -> list:
+        """Return the items as a plain list."""
+        return [_thaw(value) for value in self._items]
+
+    @property
+    def json(self) -> str:
+        """Return a well-formated json string."""
+        if self._json is None:
+            self._json = json.dumps(self.to_list(), sort_keys=True, indent=4)
+        return self._json
+
+
+def _thaw(value) -> Any:
+    if isinstance(value, FrozenDictObject):
+        return value.to_dict()
+    if isinstance(value, FrozenListObject):
+        return value.to_list()
+    return value
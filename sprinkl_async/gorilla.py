@@ -0,0 +1,494 @@
+"""Compressed sensor reading series, delta-of-delta times and XOR values."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .errors import SprinklError
+from .pageobject import PageObject
+from .readingstore import RECORD_FIELDS, epoch_seconds
+from .timeseries import FIELDS
+
+# rows per block, a window query decodes whole blocks
+BLOCK_SIZE = 256
+
+_MAGIC = b"SPKG\x01"
+_BLOCK = struct.Struct("<HqqI")
+_DOUBLE = struct.Struct(">d")
+_WORD = struct.Struct(">Q")
+
+# delta-of-delta of millisecond times: (prefix, prefix bits, value bits),
+# sized for readings every few minutes with jitter of up to seconds
+_DOD_RANGES = ((0b10, 2, 12), (0b110, 3, 20), (0b1110, 4, 32), (0b1111, 4, 64))
+_DOD_BITS = tuple(bits for _, _, bits in _DOD_RANGES)
+
+_NAN = float("nan")
+
+
+def _bits(value: float) -> int:
+    return _WORD.unpack(_DOUBLE.pack(value))[0]
+
+
+def _float(bits: int) -> float:
+    return _DOUBLE.unpack(_WORD.pack(bits))[0]
+
+
+class _BitWriter:
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._acc = 0
+        self._count = 0
+
+    def write(self, value: int, bits: int) -> None:
+        self._acc = (self._acc << bits) | value
+        self._count += bits
+        if self._count >= 64:
+            whole = self._count & ~7
+            rest = self._count - whole
+            self._buffer += (self._acc >> rest).to_bytes(whole >> 3, "big")
+            self._acc &= (1 << rest) - 1
+            self._count = rest
+
+    def getvalue(self) -> bytes:
+        pad = -self._count % 8
+        tail = (self._acc << pad).to_bytes((self._count + pad) >> 3, "big")
+        return bytes(self._buffer) + tail
+
+
+class _BitReader:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._count = 0
+
+    def read(self, bits: int) -> int:
+        while self._count < bits:
+            chunk = self._data[self._pos : self._pos + 8]
+            if not chunk:
+                raise SprinklError("Compressed block is truncated")
+            self._pos += len(chunk)
+            self._acc = (self._acc << (8 * len(chunk))) | int.from_bytes(chunk, "big")
+            self._count += 8 * len(chunk)
+        self._count -= bits
+        value = self._acc >> self._count
+        self._acc &= (1 << self._count) - 1
+        return value
+
+
+class _Encoder:
+    """Open block, rows are encoded as they are appended."""
+
+    def __init__(self, width: int) -> None:
+        self.count = 0
+        self.first = 0
+        self.last = 0
+        self._writer = _BitWriter()
+        self._delta = 0
+        self._values = [0] * width
+        self._windows = [(65, 0)] * width
+
+    def add(self, time: int, values: Sequence[float]) -> None:
+        writer = self._writer
+        if not self.count:
+            self.first = time
+            writer.write(time & 0xFFFFFFFFFFFFFFFF, 64)
+            for index, value in enumerate(values):
+                self._values[index] = _bits(value)
+                writer.write(self._values[index], 64)
+        else:
+            delta = time - self.last
+            self._write_dod(delta - self._delta)
+            self._delta = delta
+            for index, value in enumerate(values):
+                self._write_value(index, _bits(value))
+        self.last = time
+        self.count += 1
+
+    def _write_dod(self, dod: int) -> None:
+        if not dod:
+            self._writer.write(0, 1)
+            return
+        for prefix, prefix_bits, bits in _DOD_RANGES:
+            if -(1 << (bits - 1)) <= dod < (1 << (bits - 1)):
+                break
+        self._writer.write(prefix, prefix_bits)
+        self._writer.write(dod & ((1 << bits) - 1), bits)
+
+    def _write_value(self, index: int, bits: int) -> None:
+        writer = self._writer
+        xor = bits ^ self._values[index]
+        self._values[index] = bits
+        if not xor:
+            writer.write(0, 1)
+            return
+
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        old_leading, old_trailing = self._windows[index]
+        if leading >= old_leading and trailing >= old_trailing:
+            # meaningful bits fit in the window of the previous value
+            writer.write(0b10, 2)
+            writer.write(xor >> old_trailing, 64 - old_leading - old_trailing)
+            return
+
+        length = 64 - leading - trailing
+        self._windows[index] = (leading, trailing)
+        writer.write(0b11, 2)
+        writer.write(leading, 5)
+        writer.write(length & 63, 6)
+        writer.write(xor >> trailing, length)
+
+    def getvalue(self) -> bytes:
+        return self._writer.getvalue()
+
+
+def _decode(
+    payload: bytes, count: int, width: int
+) -> Tuple[List[int], List[List[float]]]:
+    """Return times and value columns of a block."""
+    reader = _BitReader(payload)
+    read = reader.read
+    time = read(64)
+    if time >= 1 << 63:
+        time -= 1 << 64
+    times = [time]
+    previous = [read(64) for _ in range(width)]
+    columns = [[_float(bits)] for bits in previous]
+    windows = [(0, 0)] * width
+
+    delta = 0
+    for _ in range(count - 1):
+        if read(1):
+            for bits in _DOD_BITS[:-1]:
+                if not read(1):
+                    break
+            else:
+                bits = _DOD_BITS[-1]
+            dod = read(bits)
+            if dod >= 1 << (bits - 1):
+                dod -= 1 << bits
+            delta += dod
+        time += delta
+        times.append(time)
+
+        for index in range(width):
+            if read(1):
+                if read(1):
+                    leading = read(5)
+                    length = read(6) or 64
+                    windows[index] = (leading, 64 - leading - length)
+                leading, trailing = windows[index]
+                previous[index] ^= read(64 - leading - trailing) << trailing
+            columns[index].append(_float(previous[index]))
+    return times, columns
+
+
+class BlockInfo(NamedTuple):
+    """Rows, first and last time (ms) and location of a sealed block."""
+
+    rows: int
+    first: int
+    last: int
+    offset: int
+    size: int
+
+
+class CompressedSeries:
+    """Append-only compressed readings of one sensor.
+
+    Times are kept as epoch milliseconds, delta-of-delta encoded, and each
+    field as float64 XOR encoded against its previous value, as in
+    Facebook's Gorilla. Steady readings every 30 minutes take about one
+    bit per field. Rows are grouped in blocks of block_size, each with its
+    first and last time, so a window query decodes only the blocks it
+    overlaps.
+    """
+
+    def __init__(
+        self, fields: Sequence[str] = FIELDS, block_size: int = BLOCK_SIZE
+    ) -> None:
+        """Initialize."""
+        self.fields = tuple(fields)
+        self.block_size = block_size
+        self._blocks = []  # type: List[BlockInfo]
+        self._payloads = []  # type: List[bytes]
+        self._active = _Encoder(len(self.fields))
+
+    def __len__(self):
+        """Return number of rows."""
+        return sum(block.rows for block in self._blocks) + self._active.count
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """Return time of the newest row as epoch seconds."""
+        if self._active.count:
+            return self._active.last / 1000
+        if self._blocks:
+            return self._blocks[-1].last / 1000
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Return size of the encoded rows."""
+        return sum(block.size for block in self._blocks) + len(self._active.getvalue())
+
+    def append(self, time, values: Dict[str, float]) -> bool:
+        """Add a reading, returns False if it is not newer than the last one.
+
+        time is a datetime, API timestamp or epoch seconds, fields without
+        a value are stored as NaN.
+        """
+        millis = int(round(epoch_seconds(time) * 1000))
+        last = self.last_time
+        if last is not None and millis <= round(last * 1000):
+            return False
+        self._active.add(
+            millis, [float(values.get(field, _NAN)) for field in self.fields]
+        )
+        if self._active.count >= self.block_size:
+            self._seal()
+        return True
+
+    def add_records(
+        self, records: Iterable[dict], time_field: str = "created_at"
+    ) -> int:
+        """Add records of the readings endpoint, return number added."""
+        rows = []
+        for record in records:
+            values = {
+                RECORD_FIELDS[key]: value
+                for key, value in record.items()
+                if key in RECORD_FIELDS and value is not None
+            }
+            rows.append((epoch_seconds(record[time_field]), values))
+        rows.sort(key=lambda row: row[0])
+        return sum(self.append(time, values) for time, values in rows)
+
+    async def add_pages(self, page: PageObject, time_field: str = "created_at") -> int:
+        """Add readings of all pages, e.g. of MoistureSensor.readings().
+
+        Pages are newest first, they are read until one holds a reading
+        that is already stored, so only new readings are fetched.
+        """
+        last = self.last_time
+        records = []  # type: List[dict]
+        pages = page.raw_pages(read_ahead=1 if last is None else 0)
+        try:
+            async for _, data in pages:
+                records.extend(data)
+                if last is not None and any(
+                    epoch_seconds(record[time_field]) <= last for record in data
+                ):
+                    break
+        finally:
+            await pages.aclose()
+        return self.add_records(records, time_field)
+
+    def _seal(self) -> None:
+        active = self._active
+        payload = active.getvalue()
+        self._store(
+            BlockInfo(active.count, active.first, active.last, 0, len(payload)), payload
+        )
+        self._active = _Encoder(len(self.fields))
+
+    def _store(self, block: BlockInfo, payload: bytes) -> None:
+        self._blocks.append(block._replace(offset=len(self._payloads)))
+        self._payloads.append(payload)
+
+    def _load(self, block: BlockInfo) -> bytes:
+        return self._payloads[block.offset]
+
+    def window(self, start=None, end=None) -> Dict[str, array]:
+        """Return columns of the rows with start <= time < end.
+
+        The times are returned as epoch seconds in the "timestamp" column.
+        """
+        start, end = epoch_seconds(start), epoch_seconds(end)
+        low = None if start is None else int(round(start * 1000))
+        high = None if end is None else int(round(end * 1000))
+
+        blocks = [(block, None) for block in self._blocks]  # type: list
+        if self._active.count:
+            active = self._active
+            blocks.append(
+                (BlockInfo(active.count, active.first, active.last, 0, 0), active)
+            )
+
+        columns = {"timestamp": array("d")}
+        for field in self.fields:
+            columns[field] = array("d")
+        for block, active in blocks:
+            if (low is not None and block.last < low) or (
+                high is not None and block.first >= high
+            ):
+                continue
+            payload = self._load(block) if active is None else active.getvalue()
+            times, values = _decode(payload, block.rows, len(self.fields))
+            rows = [
+                row
+                for row, time in enumerate(times)
+                if (low is None or time >= low) and (high is None or time < high)
+            ]
+            columns["timestamp"].extend(times[row] / 1000 for row in rows)
+            for field, column in zip(self.fields, values):
+                columns[field].extend(column[row] for row in rows)
+        return columns
+
+    def _header(self) -> bytes:
+        names = b"".join(
+            bytes((len(name),)) + name for name in (f.encode() for f in self.fields)
+        )
+        return _MAGIC + bytes((len(self.fields),)) + names
+
+    def to_bytes(self) -> bytes:
+        """Return the series in the format of SeriesFile."""
+        parts = [self._header()]
+        for block in self._blocks:
+            parts.append(_BLOCK.pack(block.rows, block.first, block.last, block.size))
+            parts.append(self._load(block))
+        if self._active.count:
+            active = self._active
+            payload = active.getvalue()
+            parts.append(
+                _BLOCK.pack(active.count, active.first, active.last, len(payload))
+            )
+            parts.append(payload)
+        return b"".join(parts)
+
+    def _restore(self, count: int, payload: bytes) -> None:
+        """Make a partial block the active block again."""
+        times, columns = _decode(payload, count, len(self.fields))
+        for row, time in enumerate(times):
+            self._active.add(time, [column[row] for column in columns])
+
+    @staticmethod
+    def from_bytes(data: bytes, block_size: int = BLOCK_SIZE) -> "CompressedSeries":
+        """Return an in-memory series read from to_bytes() or a SeriesFile."""
+        fields, offset = _parse_header(data)
+        series = CompressedSeries(fields, block_size)
+        while offset < len(data):
+            count, first, last, size = _BLOCK.unpack_from(data, offset)
+            offset += _BLOCK.size
+            payload = data[offset : offset + size]
+            offset += size
+            if count < block_size and offset >= len(data):
+                series._restore(count, payload)
+            else:
+                series._store(BlockInfo(count, first, last, 0, size), payload)
+        return series
+
+
+def _parse_header(data: bytes) -> Tuple[Tuple[str, ...], int]:
+    if not data.startswith(_MAGIC):
+        raise SprinklError("Not a compressed readings series")
+    offset = len(_MAGIC)
+    fields = []
+    for _ in range(data[offset]):
+        length = data[offset + 1]
+        fields.append(data[offset + 2 : offset + 2 + length].decode())
+        offset += 1 + length
+    return tuple(fields), offset + 1
+
+
+class SeriesFile(CompressedSeries):
+    """Compressed series persisted to a file as it grows.
+
+    Sealed blocks are appended to the file and read back by window()
+    only when a query overlaps them, so memory holds the block index and
+    the open block. flush() writes the open block too; it is replaced
+    by the next flush or when it is sealed. Reopening the file continues
+    the series.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str] = FIELDS,
+        block_size: int = BLOCK_SIZE,
+    ) -> None:
+        """Open or create the file at path."""
+        super().__init__(fields, block_size)
+        self.path = path
+        if not os.path.exists(path):
+            self._handle = open(path, "w+b")
+            self._handle.write(self._header())
+            self._end = self._handle.tell()
+            return
+
+        self._handle = open(path, "r+b")
+        fields, offset = _parse_header(self._handle.read(4096))
+        if fields != self.fields:
+            self._handle.close()
+            raise SprinklError(
+                "{0} stores fields {1}, not {2}".format(path, fields, self.fields)
+            )
+        self._end = offset
+        self._scan()
+
+    def _scan(self) -> None:
+        handle = self._handle
+        length = handle.seek(0, os.SEEK_END)
+        valid = self._end
+        while self._end + _BLOCK.size <= length:
+            handle.seek(self._end)
+            count, first, last, size = _BLOCK.unpack(handle.read(_BLOCK.size))
+            offset = self._end + _BLOCK.size
+            if not 0 < count <= self.block_size or offset + size > length:
+                break
+            if count < self.block_size and offset + size == length:
+                # a flushed open block, kept until the next flush or seal
+                # overwrites it in place
+                self._restore(count, handle.read(size))
+                valid = length
+                break
+            self._blocks.append(BlockInfo(count, first, last, offset, size))
+            self._end = valid = offset + size
+        if valid < length:
+            # a short or corrupt tail of an interrupted write
+            handle.truncate(valid)
+
+    def _write(self, count: int, first: int, last: int, payload: bytes) -> int:
+        handle = self._handle
+        handle.seek(self._end)
+        handle.write(_BLOCK.pack(count, first, last, len(payload)))
+        handle.write(payload)
+        handle.truncate()
+        return self._end + _BLOCK.size
+
+    def _store(self, block: BlockInfo, payload: bytes) -> None:
+        offset = self._write(block.rows, block.first, block.last, payload)
+        self._blocks.append(block._replace(offset=offset))
+        self._end = offset + len(payload)
+
+    def _load(self, block: BlockInfo) -> bytes:
+        self._handle.seek(block.offset)
+        return self._handle.read(block.size)
+
+    def flush(self) -> None:
+        """Write the open block and flush the file."""
+        active = self._active
+        if active.count:
+            self._write(active.count, active.first, active.last, active.getvalue())
+        self._handle.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self.flush()
+        self._handle.close()
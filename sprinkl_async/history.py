@@ -0,0 +1,161 @@
+"""Incremental sync of controller history."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import json
+import logging
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .dataobject import ListObject
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Checkpoint(NamedTuple):
+    """Newest history event already seen for a controller."""
+
+    id: Any
+    timestamp: Optional[str]
+
+
+class CheckpointStore(abc.ABC):
+    """Base for stores of the sync checkpoint of each controller."""
+
+    @abc.abstractmethod
+    async def load(self, controller_id: str) -> Optional[Checkpoint]:
+        """Return the checkpoint of a controller, or None."""
+
+    @abc.abstractmethod
+    async def save(self, controller_id: str, checkpoint: Checkpoint) -> None:
+        """Store the checkpoint of a controller."""
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """Keep checkpoints in memory, for tests and short-lived processes."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._checkpoints = {}  # type: Dict[str, Checkpoint]
+
+    async def load(self, controller_id: str) -> Optional[Checkpoint]:
+        """Return the checkpoint of a controller, or None."""
+        return self._checkpoints.get(controller_id)
+
+    async def save(self, controller_id: str, checkpoint: Checkpoint) -> None:
+        """Store the checkpoint of a controller."""
+        self._checkpoints[controller_id] = checkpoint
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Keep checkpoints of all controllers in one json file."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        self._path = path
+
+    def _read(self) -> dict:
+        try:
+            with open(self._path) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+
+    async def load(self, controller_id: str) -> Optional[Checkpoint]:
+        """Return the checkpoint of a controller, or None."""
+        data = self._read().get(controller_id)
+        if data is None:
+            return None
+        return Checkpoint(data["id"], data["timestamp"])
+
+    async def save(self, controller_id: str, checkpoint: Checkpoint) -> None:
+        """Store the checkpoint of a controller, replacing the file atomically."""
+        data = self._read()
+        data[controller_id] = checkpoint._asdict()
+
+        temp = self._path + ".tmp"
+        with open(temp, "w") as handle:
+            json.dump(data, handle, sort_keys=True, indent=4)
+        os.replace(temp, self._path)
+
+
+class HistorySync:
+    """Return only the history events that were not seen by earlier syncs.
+
+    History is returned newest first, so paging stops at the first event
+    that is at or before the checkpoint and a sync with nothing new costs
+    a single page. Event fields holding the id and timestamp are
+    configurable.
+    """
+
+    def __init__(
+        self,
+        store: Optional[CheckpointStore] = None,
+        id_field: str = "id",
+        time_field: str = "created_at",
+    ) -> None:
+        """Initialize."""
+        self._store = store if store is not None else MemoryCheckpointStore()
+        self._id_field = id_field
+        self._time_field = time_field
+
+    def _seen(self, event: dict, checkpoint: Optional[Checkpoint]) -> bool:
+        if checkpoint is None:
+            return False
+        if event.get(self._id_field) == checkpoint.id:
+            return True
+
+        # the checkpoint event may be gone, stop at anything older than it
+        timestamp = event.get(self._time_field)
+        return (
+            checkpoint.timestamp is not None
+            and timestamp is not None
+            and timestamp < checkpoint.timestamp
+        )
+
+    async def sync(self, controller) -> ListObject:
+        """Return new history events of a controller, newest first."""
+        checkpoint = await self._store.load(controller.id)
+
+        events = []  # type: List[dict]
+        pages = 0
+        page = await controller.history()
+        while page is not None:
+            pages += 1
+            done = False
+            for event in page.to_list():
+                if self._seen(event, checkpoint):
+                    done = True
+                    break
+                events.append(event)
+            if done:
+                break
+            page = await page.next()
+
+        if events:
+            newest = events[0]
+            await self._store.save(
+                controller.id,
+                Checkpoint(newest.get(self._id_field), newest.get(self._time_field)),
+            )
+
+        _LOGGER.debug(
+            "Synced %d new event(s) of controller %s from %d page(s)",
+            len(events),
+            controller.id,
+            pages,
+        )
+        return ListObject(events, lazy=True)
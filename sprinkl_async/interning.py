@@ -0,0 +1,79 @@
+"""Share repeated keys and enum-like strings of decoded payloads."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import sys
+from typing import Any
+
+# longest string value that is considered an enum, e.g. "ZONE_STARTED"
+MAX_VALUE_LENGTH = 32
+
+_intern = sys.intern
+
+
+def _value(value: str) -> str:
+    """Intern enum-like strings: letters and underscores only.
+
+    Ids, names, timestamps and macs contain digits, spaces or punctuation
+    and are left alone, so the intern table stays small.
+    """
+    if len(value) <= MAX_VALUE_LENGTH and value.replace("_", "").isalpha():
+        return _intern(value)
+    return value
+
+
+def _pairs(pairs) -> dict:
+    result = {}
+    for key, value in pairs:
+        cls = value.__class__
+        if cls is str:
+            value = _value(value)
+        elif cls is list and value and value[0].__class__ is str:
+            value = [_value(item) if item.__class__ is str else item for item in value]
+        result[_intern(key)] = value
+    return result
+
+
+def loads(text) -> Any:
+    """Decode json, interning keys and enum-like string values."""
+    return json.loads(text, object_pairs_hook=_pairs)
+
+
+def intern_strings(data) -> Any:
+    """Return decoded json with keys and enum-like string values interned.
+
+    Dicts are rebuilt with interned keys, lists are updated in place.
+    """
+    if isinstance(data, dict):
+        data = _pairs(data.items())
+    elif isinstance(data, str):
+        return _value(data)
+    elif not isinstance(data, list):
+        return data
+
+    stack = [data]
+    while stack:
+        target = stack.pop()
+        items = target.items() if isinstance(target, dict) else enumerate(target)
+        for key, value in items:
+            if isinstance(value, dict):
+                value = target[key] = _pairs(value.items())
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.append(value)
+            elif isinstance(target, list) and isinstance(value, str):
+                target[key] = _value(value)
+    return data
@@ -0,0 +1,328 @@
+"""Typed models for Sprinkl payloads."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _converter(annotation) -> Optional[Callable[[Any], Any]]:
+    """Return a function converting decoded json to annotation, if needed."""
+    if isinstance(annotation, type) and issubclass(annotation, Model):
+        return annotation.from_json
+
+    if getattr(annotation, "__origin__", None) in (list, List):
+        item = _converter(annotation.__args__[0])
+        if item is not None:
+            return lambda value: [item(entry) for entry in value]
+
+    return None
+
+
+class _ModelMeta(type):
+    """Create __slots__ and a from_json constructor from the annotations."""
+
+    def __new__(mcs, name, bases, namespace):
+        fields = tuple(namespace.get("__annotations__", {}))
+        namespace.setdefault("__slots__", fields)
+        cls = super().__new__(mcs, name, bases, namespace)
+
+        if fields:
+            cls._fields = fields
+            cls._known = frozenset(fields)
+            cls.from_json = classmethod(_make_from_json(cls, namespace))
+        return cls
+
+
+def _make_from_json(cls, namespace) -> Callable:
+    """Generate the source of from_json so each field is a plain slot store.
+
+    The slots are set through their descriptors, bypassing Model.__setattr__.
+    """
+    scope = {"new": object.__new__}  # type: Dict[str, Any]
+    lines = ["def from_json(cls, data):", "    self = new(cls)", "    get = data.get"]
+    for field in ("_missing", "_extra") + cls._fields:
+        scope["set_" + field] = getattr(cls, field).__set__
+    for field in cls._fields:
+        convert = _converter(namespace["__annotations__"][field])
+        if convert is None:
+            lines.append("    set_{0}(self, get({0!r}))".format(field))
+            continue
+
+        scope["convert_" + field] = convert
+        lines.append("    value = get({0!r})".format(field))
+        lines.append(
+            "    set_{0}(self, None if value is None else convert_{0}(value))".format(
+                field
+            )
+        )
+
+    # fields missing from the payload read as None, to_dict() leaves them out
+    lines.append("    missing = cls._known.difference(data)")
+    lines.append("    set__missing(self, missing or None)")
+    lines.append("    if cls._known.issuperset(data):")
+    lines.append("        set__extra(self, None)")
+    lines.append("    else:")
+    lines.append(
+        "        set__extra(self, {k: v for k, v in data.items() if k not in cls._known})"
+    )
+    lines.append("    return self")
+
+    # pylint: disable=exec-used
+    exec("\n".join(lines), scope)
+    return scope["from_json"]
+
+
+class Model(metaclass=_ModelMeta):
+    """Base for typed models with fields declared as annotations.
+
+    Subclasses get a from_json() constructor. Fields missing from the
+    payload are None and left out by to_dict(), fields not declared are kept
+    in the extra dict and are still readable as attributes.
+    """
+
+    __slots__ = ("_extra", "_missing")
+
+    _fields = ()  # type: tuple
+    _known = frozenset()  # type: frozenset
+
+    @classmethod
+    def from_json(cls, data: dict) -> Any:
+        """Return a model of decoded json, all of it in the extra fields.
+
+        Models declaring fields get a generated from_json() instead.
+        """
+        self = object.__new__(cls)
+        object.__setattr__(self, "_missing", None)
+        object.__setattr__(self, "_extra", dict(data) or None)
+        return self
+
+    def __setattr__(self, name, value):
+        """Set a field, a field missing from the payload is set from now on."""
+        missing = self._missing
+        if missing is not None and name in missing:
+            missing = missing.difference((name,))
+            object.__setattr__(self, "_missing", missing or None)
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        """Allow attribute access to unknown fields."""
+        if name != "_extra" and self._extra is not None and name in self._extra:
+            return self._extra[name]
+
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'".format(type(self).__name__, name)
+        )
+
+    def __eq__(self, other):
+        """Return true if both models hold the same data."""
+        if type(self) is not type(other):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        """Return repr of object."""
+        return "{0}({1})".format(
+            type(self).__name__,
+            ", ".join(
+                "{0}={1!r}".format(field, getattr(self, field))
+                for field in self._fields
+            ),
+        )
+
+    @property
+    def extra(self) -> dict:
+        """Return fields that are not part of the model."""
+        return self._extra if self._extra is not None else {}
+
+    def to_dict(self) -> dict:
+        """Return the model as decoded json, as it was passed to from_json()."""
+        data = {}
+        missing = self._missing or ()
+        for field in self._fields:
+            if field in missing:
+                continue
+            value = getattr(self, field)
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [
+                    item.to_dict() if isinstance(item, Model) else item
+                    for item in value
+                ]
+            data[field] = value
+        data.update(self.extra)
+        return data
+
+
+class LocationModel(Model):
+    """Controller location."""
+
+    city: str
+    country: str
+    latitude: float
+    longitude: float
+    postal_code: str
+    state: str
+    street_1: str
+    street_2: str
+    timezone: str
+
+
+class ConservationModel(Model):
+    """Controller conservation settings."""
+
+    rain_chance: float
+    rain_inches_24hr: float
+    rain_inches_48hr: float
+    rain_inches_4day: float
+    rain_inches_7day: float
+    seasonal_adjustments: List[int]
+    temp_above: float
+
+
+class WeatherAccumulationsModel(Model):
+    """Accumulated rain."""
+
+    total_2day: float
+    total_4day: float
+    total_7day: float
+    total_today: float
+
+
+class WeatherConditionsModel(Model):
+    """Current weather conditions."""
+
+    pop: float
+    raining: bool
+    temp: float
+    temp_high: float
+    temp_low: float
+    type: str
+    wind: float
+
+
+class WeatherModel(Model):
+    """Controller weather."""
+
+    accumulations: WeatherAccumulationsModel
+    conditions: WeatherConditionsModel
+    station: str
+
+
+class ZoneMoistureSensorModel(Model):
+    """Moisture sensor limits of a zone."""
+
+    limit_moisture_b: int
+    limit_moisture_m: int
+    limit_moisture_t: int
+    limit_temp: int
+    moisture_sensor_id: str
+
+
+class ZoneModel(Model):
+    """Zone."""
+
+    enabled: bool
+    exposure: str
+    head_dripline_ft: int
+    head_num: int
+    head_type: str
+    id: str
+    moisture_sensor: ZoneMoistureSensorModel
+    name: str
+    number: int
+    slope: str
+    soil_type: str
+    type: str
+
+
+class ScheduleZoneModel(Model):
+    """Zone run of a schedule."""
+
+    id: str
+    number: int
+    run_time: int
+
+
+class ScheduleModel(Model):
+    """Schedule."""
+
+    created_at: str
+    days: List[str]
+    enabled: bool
+    frequency: str
+    id: str
+    name: str
+    next_run_at: str
+    run_time: int
+    scheduled_days: List[str]
+    seasonally_adjust: bool
+    start_time: str
+    type: str
+    updated_at: str
+    zones: List[ScheduleZoneModel]
+
+
+class MoistureSensorModel(Model):
+    """Moisture sensor."""
+
+    battery: int
+    enabled: bool
+    id: str
+    last_reading_at: str
+    mac: str
+    moisture_b: int
+    moisture_m: int
+    moisture_t: int
+    moistures_b: List[int]
+    moistures_m: List[int]
+    moistures_t: List[int]
+    name: str
+    rssi: int
+    temp: float
+    temps: List[float]
+
+
+class ControllerModel(Model):
+    """Controller."""
+
+    alert: str
+    connected: bool
+    conservation: ConservationModel
+    created_at: str
+    enabled: bool
+    id: str
+    last_checkin_at: str
+    last_ran_at: str
+    location: LocationModel
+    moisture_sensors: List[MoistureSensorModel]
+    name: str
+    next_scheduled_at: str
+    schedules: List[ScheduleModel]
+    updated_at: str
+    weather: WeatherModel
+    zones: List[ZoneModel]
+
+
+class WebhookModel(Model):
+    """Webhook."""
+
+    created_at: str
+    device_id: str
+    events: List[str]
+    external_id: str
+    id: str
+    updated_at: str
+    url: str
@@ -14,32 +14,38 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
 
 from .pageobject import PageObject
+from .readingstore import ReadingStore
+from .timeseries import READING_INTERVAL, SensorSeries, parse_timestamp
+
+# api names of the moisture fields, converted so we are consistent
+_MOISTURE_FIELDS = (
+    ("moisture_t", "moisture_1"),
+    ("moisture_m", "moisture_3"),
+    ("moisture_b", "moisture_5"),
+)
 
 
 class MoistureSensor:
     """Class for a moisture sensor."""
 
-    def __init__(self, request: Callable[..., Awaitable[dict]], sensor: dict) -> None:
+    def __init__(
+        self,
+        request: Callable[..., Awaitable[dict]],
+        sensor: dict,
+        store: Optional[ReadingStore] = None,
+    ) -> None:
         """Initialize."""
         self._request = request
         self._data = sensor
-        # not useful data (no timestamps)
-        del self._data["temps"]
-        del self._data["moistures_t"]
-        del self._data["moistures_m"]
-        del self._data["moistures_b"]
-
-        # convert so we are consistent
-        self._data["moisture_1"] = self._data["moisture_t"]
-        self._data["moisture_3"] = self._data["moisture_m"]
-        self._data["moisture_5"] = self._data["moisture_b"]
-
-        del self._data["moisture_t"]
-        del self._data["moisture_m"]
-        del self._data["moisture_b"]
+        self._store = store
+        # reading arrays have no timestamps, keep them as a compact series
+        self._series = SensorSeries.from_sensor(self._data)
+        self._feed()
+        self._convert()
 
     def __getattr__(self, name):
         """Allow property access of data object."""
@@ -48,15 +54,33 @@ class MoistureSensor:
 
         return object.__getattribute__(self, name)
 
-    async def readings(self) -> PageObject:
+    def _convert(self) -> None:
+        for name, field in _MOISTURE_FIELDS:
+            if name in self._data:
+                self._data[field] = self._data.pop(name)
+
+    def _feed(self) -> None:
+        if self._store is not None and self._series is not None:
+            self._store.add_series(self._data["id"], self._series)
+
+    @property
+    def series(self) -> Optional[SensorSeries]:
+        """Return the recent readings of the sensor document, oldest first."""
+        return self._series
+
+    async def readings(self, columnar: bool = False) -> PageObject:
         """Return sensor readings."""
         data = await self._request("get", "sensors/{0}/readings".format(self.id))
 
         return PageObject(
-            data, self._request, "get", "sensors/{0}/readings".format(self.id)
+            data,
+            self._request,
+            "get",
+            "sensors/{0}/readings".format(self.id),
+            columnar=columnar,
         )
 
-    async def averages_day(self) -> PageObject:
+    async def averages_day(self, columnar: bool = False) -> PageObject:
         """Return average of day from sensor readings."""
         data = await self._request(
             "get", "sensors/{0}/readings/averages/day".format(self.id)
@@ -67,9 +91,10 @@ class MoistureSensor:
             self._request,
             "get",
             "sensors/{0}/readings/averages/day".format(self.id),
+            columnar=columnar,
         )
 
-    async def averages_hour(self) -> PageObject:
+    async def averages_hour(self, columnar: bool = False) -> PageObject:
         """Return average of hour from sensor readings."""
         data = await self._request(
             "get", "sensors/{0}/readings/averages/hour".format(self.id)
@@ -80,10 +105,32 @@ class MoistureSensor:
             self._request,
             "get",
             "sensors/{0}/readings/averages/hour".format(self.id),
+            columnar=columnar,
         )
 
-    async def refresh(self) -> None:
-        """Refresh sensor object from Sprinkl controller."""
+    def reading_due(self, now: Optional[datetime] = None) -> bool:
+        """Return true if a reading newer than last_reading_at may exist.
+
+        Naive datetimes are taken as UTC.
+        """
+        last = self._data.get("last_reading_at")
+        if not last:
+            return True
+        now = now or datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        return now >= parse_timestamp(last) + READING_INTERVAL
+
+    async def refresh(self) -> bool:
+        """Refresh sensor object, return true if last_reading_at advanced."""
+        previous = self._data.get("last_reading_at")
         data = await self._request("get", "sensors/{0}".format(self.id))
         for key in data["data"]:
             self._data[key] = data["data"][key]
+        self._series = SensorSeries.from_sensor(self._data)
+        self._convert()
+
+        changed = self._data.get("last_reading_at") != previous
+        if changed:
+            self._feed()
+        return changed
@@ -14,20 +14,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from .averages import LocalAverages
 from .moisturesensor import MoistureSensor
+from .pageobject import PageObject
+from .readingstore import ReadingStore
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class MoistureSensors:
     """Class for moisture sensors."""
 
-    def __init__(self, request: Callable[..., Awaitable[dict]], sensors: list) -> None:
+    def __init__(
+        self,
+        request: Callable[..., Awaitable[dict]],
+        sensors: list,
+        store: Optional[ReadingStore] = None,
+    ) -> None:
         """Intialize."""
         self._request = request
+        self._store = store if store is not None else ReadingStore()
         self._sensors: Dict[str, Any] = {}
         for sensor in sensors:
-            parsed_sensor = MoistureSensor(self._request, sensor)
+            parsed_sensor = MoistureSensor(self._request, sensor, self._store)
             self._sensors[parsed_sensor.id] = parsed_sensor
 
     def __iter__(self):
@@ -45,6 +59,11 @@ class MoistureSensors:
         """Return number of sensors."""
         return len(self._sensors)
 
+    @property
+    def store(self) -> ReadingStore:
+        """Return the store fed with the readings of all sensors."""
+        return self._store
+
     def get(self, key: str):
         """Return sensor by id."""
         return self._sensors.get(key)
@@ -56,3 +75,53 @@ class MoistureSensors:
             for key in self._sensors
             if include_disabled or self._sensors[key].enabled
         ]
+
+    async def refresh_all(
+        self,
+        limit: int = 4,
+        force: bool = False,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Refresh sensors concurrently, return ids of sensors with new readings.
+
+        At most limit requests run at a time, or as many as semaphore allows
+        when it is shared between several controllers. Unless force is set,
+        sensors are skipped while no new reading is due since last_reading_at.
+        A sensor whose refresh fails is logged and left out, the others are
+        still refreshed.
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(limit)
+        due = [sensor for sensor in self if force or sensor.reading_due(now)]
+
+        async def refresh(sensor) -> bool:
+            async with semaphore:
+                return await sensor.refresh()
+
+        results = await asyncio.gather(
+            *(refresh(sensor) for sensor in due), return_exceptions=True
+        )
+        changed = []
+        for sensor, result in zip(due, results):
+            if isinstance(result, BaseException):
+                _LOGGER.error("Failed to refresh sensor %s: %s", sensor.id, result)
+            elif result:
+                changed.append(sensor.id)
+        return changed
+
+    async def averages_day(
+        self, start=None, end=None, columnar: bool = False
+    ) -> Dict[str, PageObject]:
+        """Return daily averages of all sensors, local where the store covers them."""
+        return await LocalAverages(self._store).averages_day(
+            self, start, end, columnar
+        )
+
+    async def averages_hour(
+        self, start=None, end=None, columnar: bool = False
+    ) -> Dict[str, PageObject]:
+        """Return hourly averages of all sensors, local where the store covers them."""
+        return await LocalAverages(self._store).averages_hour(
+            self, start, end, columnar
+        )
@@ -14,9 +14,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Awaitable, Callable
+import asyncio
+import logging
+from collections import deque
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from .columnar import ColumnarListObject
 from .dataobject import DictObject, ListObject
+from .errors import RequestError, RequestTimeout
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class PageObject:
@@ -30,16 +47,36 @@ class PageObject:
         method: str,
         uri: str,
         page: int = 1,
+        lazy: bool = True,
+        columnar: bool = False,
     ) -> None:
         """Initialize."""
         self._meta = DictObject(paged_data["meta"])
-        self._data = ListObject(paged_data["data"])
+        if columnar:
+            self._data = ColumnarListObject(
+                paged_data["data"]
+            )  # type: Union[ListObject, ColumnarListObject]
+        else:
+            self._data = ListObject(paged_data["data"], lazy=lazy)
         self._page = page
+        self._lazy = lazy
+        self._columnar = columnar
 
         self._request = request
         self._method = method
         self._uri = uri
 
+    @classmethod
+    def single(cls, records: list, columnar: bool = False) -> "PageObject":
+        """Return a page holding records that has no following pages."""
+        return cls(
+            {"data": records, "meta": {"count": "1", "page": "1"}},
+            None,  # type: ignore
+            "get",
+            "",
+            columnar=columnar,
+        )
+
     @property
     def has_more(self) -> bool:
         """Return true if there is more pages."""
@@ -47,14 +84,187 @@ class PageObject:
             return True
         return False
 
+    async def _get(self, page: int) -> dict:
+        return await self._request(self._method, self._uri, params={"page": page})
+
+    async def _fetch(self, page: int) -> "PageObject":
+        return PageObject(
+            await self._get(page),
+            self._request,
+            self._method,
+            self._uri,
+            page=page,
+            lazy=self._lazy,
+            columnar=self._columnar,
+        )
+
     async def next(self):
         """Return the next page."""
         if not self.has_more:
             return None
+        return await self._fetch(self._page + 1)
+
+    async def pages(self, read_ahead: int = 1) -> AsyncGenerator["PageObject", None]:
+        """Yield this page and all following pages.
+
+        Up to read_ahead following pages are fetched while the caller works on
+        the current one, so at most read_ahead + 1 pages are held at a time.
+        """
+        last = int(self._meta.count)
+        number = self._page
+        pending = deque()  # type: Deque[asyncio.Future]
+        page = self  # type: Any
+        try:
+            while page is not None:
+                while len(pending) < read_ahead and number < last:
+                    number += 1
+                    pending.append(asyncio.ensure_future(self._fetch(number)))
+
+                yield page
+
+                if pending:
+                    page = await pending.popleft()
+                elif number < last:
+                    number += 1
+                    page = await self._fetch(number)
+                else:
+                    page = None
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def raw_pages(
+        self, read_ahead: int = 1, start: Optional[int] = None
+    ) -> AsyncGenerator[Tuple[int, list], None]:
+        """Yield (page number, decoded records) of this and following pages.
+
+        Following pages are not wrapped in PageObject/ListObject and each one
+        is dropped once the caller moves on, so memory stays bounded by
+        read_ahead + 1 pages however long the history is. With start, pages
+        before it are skipped without being requested.
+        """
+        last = int(self._meta.count)
+        current = self._page if start is None else max(start, self._page)
+        if current > max(last, self._page):
+            return
+
+        if current == self._page:
+            records = self.to_list()
+        else:
+            records = (await self._get(current))["data"]
+
+        requested = current
+        pending = deque()  # type: Deque[asyncio.Future]
+        try:
+            while True:
+                while len(pending) < read_ahead and requested < last:
+                    requested += 1
+                    pending.append(asyncio.ensure_future(self._get(requested)))
+
+                yield current, records
+
+                if pending:
+                    records = (await pending.popleft())["data"]
+                elif requested < last:
+                    requested += 1
+                    records = (await self._get(requested))["data"]
+                else:
+                    break
+                current += 1
+        finally:
+            for future in pending:
+                future.cancel()
 
-        page = self._page + 1
-        data = await self._request(self._method, self._uri, params={"page": page})
-        return PageObject(data, self._request, self._method, self._uri, page=page)
+    async def stream(self, read_ahead: int = 1) -> AsyncGenerator[dict, None]:
+        """Yield the decoded records of this page and all following pages."""
+        pages = self.raw_pages(read_ahead)
+        try:
+            async for _, records in pages:
+                for record in records:
+                    yield record
+        finally:
+            await pages.aclose()
+
+    async def _fetch_retry(
+        self, page: int, retries: int, retry_delay: float
+    ) -> "PageObject":
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch(page)
+            except (RequestError, RequestTimeout) as err:
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                _LOGGER.warning(
+                    "Fetching page %d failed (%s), retry %d of %d",
+                    page,
+                    err,
+                    attempt,
+                    retries,
+                )
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+
+    # pylint: disable=too-many-arguments
+    async def fetch_all(
+        self,
+        workers: int = 4,
+        ordered: bool = True,
+        retries: int = 2,
+        retry_delay: float = 0.5,
+    ) -> AsyncGenerator["PageObject", None]:
+        """Yield this page and all following pages, fetching them concurrently.
+
+        Up to workers pages are requested at the same time. Pages are yielded
+        in page order, or as soon as they arrive with ordered=False. A page
+        that fails with a request error or timeout is retried up to retries
+        times with exponential backoff before the error is raised.
+        """
+        yield self
+
+        numbers = iter(range(self._page + 1, int(self._meta.count) + 1))
+        running = []  # type: List[asyncio.Future]
+
+        def start() -> None:
+            number = next(numbers, None)
+            if number is not None:
+                running.append(
+                    asyncio.ensure_future(
+                        self._fetch_retry(number, retries, retry_delay)
+                    )
+                )
+
+        try:
+            for _ in range(max(workers, 1)):
+                start()
+
+            while running:
+                if ordered:
+                    future = running.pop(0)
+                    page = await future
+                else:
+                    done, _ = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    future = done.pop()
+                    running.remove(future)
+                    page = future.result()
+
+                start()
+                yield page
+        finally:
+            for future in running:
+                future.cancel()
+
+    async def items(self, read_ahead: int = 1) -> AsyncGenerator[Any, None]:
+        """Yield the items of this page and all following pages."""
+        async for page in self.pages(read_ahead):
+            for item in page._data:  # pylint: disable=protected-access
+                yield item
+
+    def __aiter__(self):
+        """Iterate over the items of all pages, prefetching one page ahead."""
+        return self.items()
 
     @property
     def meta(self):
@@ -64,7 +274,11 @@ class PageObject:
     @property
     def data(self):
         """Return data object."""
-        return ListObject(self._data)
+        return self._data
+
+    def to_list(self) -> list:
+        """Return the records of this page as plain dicts."""
+        return self._data.to_list()
 
     @property
     def json(self) -> str:
@@ -0,0 +1,353 @@
+"""Query records of ListObject and PageObject data."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .dataobject import DictObject, ListObject
+
+
+def _field(record: dict, name: str) -> Any:
+    """Return value of a field, dotted names reach into nested dicts."""
+    if name in record:
+        return record[name]
+
+    value = record  # type: Any
+    for part in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _timestamp(value) -> Any:
+    """Return datetime as a string comparable with the API timestamps."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.") + "{0:03d}Z".format(
+            value.microsecond // 1000
+        )
+    return value
+
+
+def _records(data) -> list:
+    if isinstance(data, list):
+        return data
+    if hasattr(data, "to_list"):
+        return data.to_list()
+    return [item.to_dict() if hasattr(item, "to_dict") else item for item in data]
+
+
+class HashIndex:
+    """Map each value of a field to the positions of the records holding it."""
+
+    def __init__(self, field: str) -> None:
+        """Initialize."""
+        self.field = field
+        self._positions = {}  # type: Dict[Any, List[int]]
+
+    def add(self, position: int, record: dict) -> None:
+        """Index a record."""
+        self._positions.setdefault(_field(record, self.field), []).append(position)
+
+    def equal(self, value) -> List[int]:
+        """Return positions of records where field equals value."""
+        return self._positions.get(value, [])
+
+
+class SortedIndex:
+    """Keep positions of records sorted by a field, for ranges and ordering."""
+
+    def __init__(self, field: str) -> None:
+        """Initialize."""
+        self.field = field
+        self._keys = []  # type: List[Any]
+        self._positions = []  # type: List[int]
+
+    def add(self, position: int, record: dict) -> None:
+        """Index a record, records without the field are left out."""
+        value = _field(record, self.field)
+        if value is None:
+            return
+
+        if not self._keys or self._keys[-1] <= value:
+            self._keys.append(value)
+            self._positions.append(position)
+            return
+
+        index = bisect_right(self._keys, value)
+        self._keys.insert(index, value)
+        self._positions.insert(index, position)
+
+    def equal(self, value) -> List[int]:
+        """Return positions of records where field equals value."""
+        return self.range(value, value, inclusive=True)
+
+    def range(self, start=None, end=None, inclusive: bool = False) -> List[int]:
+        """Return positions of records with start <= field < end, in order."""
+        low = 0 if start is None else bisect_left(self._keys, start)
+        if end is None:
+            high = len(self._keys)
+        elif inclusive:
+            high = bisect_right(self._keys, end, low)
+        else:
+            high = bisect_left(self._keys, end, low)
+        return self._positions[low:high]
+
+    def ordered(self) -> List[int]:
+        """Return positions of all indexed records, in field order."""
+        return self._positions
+
+
+class Table:
+    """Collection of records that can be queried and indexed.
+
+    Records are kept as decoded json; queries return DictObject/ListObject
+    wrappers like the rest of the library. Fields may be dotted names,
+    e.g. "data.duration", to reach into nested dicts.
+    """
+
+    def __init__(self, data: Iterable = ()) -> None:
+        """Initialize from a list, ListObject or ColumnarListObject."""
+        self._records = []  # type: List[dict]
+        self._indexes = {}  # type: Dict[str, Any]
+        self.extend(data)
+
+    @classmethod
+    async def from_pages(cls, page) -> "Table":
+        """Return a table of the records of page and all following pages."""
+        table = cls()
+        while page is not None:
+            table.extend(page.to_list())
+            page = await page.next()
+        return table
+
+    def __len__(self):
+        """Return number of records."""
+        return len(self._records)
+
+    def __iter__(self):
+        """Iterator."""
+        return iter(self.query())
+
+    def extend(self, data: Iterable) -> None:
+        """Add records and update the indexes."""
+        start = len(self._records)
+        self._records.extend(_records(data))
+        for index in self._indexes.values():
+            for position in range(start, len(self._records)):
+                index.add(position, self._records[position])
+
+    def create_index(self, field: str, ordered: bool = False) -> None:
+        """Index a field, ordered indexes also serve ranges and order_by."""
+        index = SortedIndex(field) if ordered else HashIndex(field)
+        for position, record in enumerate(self._records):
+            index.add(position, record)
+
+        current = self._indexes.get(field)
+        if ordered or not isinstance(current, SortedIndex):
+            self._indexes[field] = index
+
+    def query(self) -> "Query":
+        """Return a query over all records."""
+        return Query(self)
+
+    def where(self, *predicates: Callable[[dict], bool], **values) -> "Query":
+        """Return a query for records matching all conditions."""
+        return self.query().where(*predicates, **values)
+
+    def between(self, field: str, start=None, end=None) -> "Query":
+        """Return a query for records with start <= field < end."""
+        return self.query().between(field, start, end)
+
+
+class Query:
+    """Immutable description of a query over a Table.
+
+    Every method returns a new query, the records are only read when the
+    query is iterated or collected.
+    """
+
+    # pylint: disable=protected-access
+    def __init__(self, table: Table) -> None:
+        """Initialize."""
+        self._table = table
+        self._equals = []  # type: List[Tuple[str, Any]]
+        self._ranges = []  # type: List[Tuple[str, Any, Any]]
+        self._predicates = []  # type: List[Callable[[dict], bool]]
+        self._order = None  # type: Optional[Tuple[Tuple[str, ...], bool]]
+        self._fields = None  # type: Optional[Tuple[str, ...]]
+        self._limit = None  # type: Optional[int]
+
+    def _copy(self) -> "Query":
+        query = Query.__new__(Query)
+        query.__dict__.update(self.__dict__)
+        query._equals = list(self._equals)
+        query._ranges = list(self._ranges)
+        query._predicates = list(self._predicates)
+        return query
+
+    def where(self, *predicates: Callable[[dict], bool], **values) -> "Query":
+        """Filter on field equality (keywords) and on predicates of the record.
+
+        Dotted fields are passed as a dict, e.g. where(**{"data.source": "app"}).
+        """
+        query = self._copy()
+        query._equals.extend(values.items())
+        query._predicates.extend(predicates)
+        return query
+
+    def between(self, field: str, start=None, end=None) -> "Query":
+        """Filter on start <= field < end, either bound may be None.
+
+        Bounds may be datetime objects to filter timestamp fields.
+        """
+        query = self._copy()
+        query._ranges.append((field, _timestamp(start), _timestamp(end)))
+        return query
+
+    def order_by(self, *fields: str, reverse: bool = False) -> "Query":
+        """Sort by fields, records missing a field sort last."""
+        query = self._copy()
+        query._order = (fields, reverse)
+        return query
+
+    def select(self, *fields: str) -> "Query":
+        """Only return the given fields of each record."""
+        query = self._copy()
+        query._fields = fields
+        return query
+
+    def limit(self, count: int) -> "Query":
+        """Return at most count records."""
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def _candidates(self) -> Tuple[Optional[List[int]], bool]:
+        """Return positions narrowed down by an index and if they are ordered."""
+        indexes = self._table._indexes
+        best = None  # type: Optional[List[int]]
+        for field, value in self._equals:
+            if field in indexes:
+                positions = indexes[field].equal(value)
+                if best is None or len(positions) < len(best):
+                    best = positions
+
+        for field, start, end in self._ranges:
+            if isinstance(indexes.get(field), SortedIndex):
+                positions = indexes[field].range(start, end)
+                if best is None or len(positions) < len(best):
+                    best = positions
+
+        if self._order is not None and len(self._order[0]) == 1:
+            index = indexes.get(self._order[0][0])
+            # records missing the field are not indexed, those are sorted
+            if isinstance(index, SortedIndex) and len(index.ordered()) == len(
+                self._table._records
+            ):
+                ordered = index.ordered()
+                if best is None:
+                    return ordered, True
+                if len(best) * 4 > len(ordered):
+                    wanted = set(best)
+                    return [pos for pos in ordered if pos in wanted], True
+
+        return best, False
+
+    def _match(self, record: dict) -> bool:
+        for field, value in self._equals:
+            if _field(record, field) != value:
+                return False
+
+        for field, start, end in self._ranges:
+            value = _field(record, field)
+            if value is None:
+                return False
+            if start is not None and value < start:
+                return False
+            if end is not None and value >= end:
+                return False
+
+        for predicate in self._predicates:
+            if not predicate(record):
+                return False
+        return True
+
+    def _select(self, record: dict) -> dict:
+        if self._fields is None:
+            return record
+        return {field: _field(record, field) for field in self._fields}
+
+    def to_list(self) -> List[dict]:
+        """Return the matching records as plain dicts."""
+        records = self._table._records
+        positions, ordered = self._candidates()
+        if positions is None:
+            matches = [record for record in records if self._match(record)]
+        else:
+            matches = [records[pos] for pos in positions if self._match(records[pos])]
+
+        if self._order is not None:
+            fields, reverse = self._order
+            if ordered:
+                if reverse:
+                    matches.reverse()
+            else:
+                # missing values sort last in both directions
+                matches.sort(
+                    key=lambda record: tuple(
+                        (
+                            (_field(record, field) is None) != reverse,
+                            _field(record, field),
+                        )
+                        for field in fields
+                    ),
+                    reverse=reverse,
+                )
+
+        if self._limit is not None:
+            matches = matches[: self._limit]
+        return [self._select(record) for record in matches]
+
+    def __iter__(self):
+        """Iterator."""
+        for record in self.to_list():
+            yield DictObject(record, lazy=True)
+
+    @property
+    def data(self) -> ListObject:
+        """Return the matching records."""
+        return ListObject(self.to_list(), lazy=True)
+
+    def count(self) -> int:
+        """Return number of matching records."""
+        return len(self.to_list())
+
+    def first(self) -> Optional[DictObject]:
+        """Return the first matching record or None."""
+        for record in self.limit(1):
+            return record
+        return None
+
+    def group_by(self, field: str) -> Dict[Any, ListObject]:
+        """Return the matching records grouped by the value of field."""
+        groups = {}  # type: Dict[Any, List[dict]]
+        for record in self.to_list():
+            groups.setdefault(_field(record, field), []).append(record)
+        return {key: ListObject(value, lazy=True) for key, value in groups.items()}
@@ -0,0 +1,136 @@
+"""Cache sensor readings and averages until the sensor has a new reading."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pageobject import PageObject
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Records of one sensor endpoint and the pages handed out for them."""
+
+    __slots__ = ("marker", "records", "pages")
+
+    def __init__(self, marker: Optional[str], records: List[dict]) -> None:
+        self.marker = marker
+        self.records = records
+        self.pages = {}  # type: Dict[bool, PageObject]
+
+    def page(self, columnar: bool) -> PageObject:
+        page = self.pages.get(columnar)
+        if page is None:
+            page = self.pages[columnar] = PageObject.single(self.records, columnar)
+        return page
+
+
+class ReadingsCache:
+    """Full readings and averages history of sensors, fetched incrementally.
+
+    The history of an endpoint is fetched once, all pages, and returned as
+    a single page. Later calls return the same PageObject until the
+    sensor's last_reading_at advances, e.g. after MoistureSensor.refresh();
+    then only the pages holding records at or after the newest cached
+    one are fetched and merged. Endpoints are expected to return records
+    newest first with a created_at timestamp.
+    """
+
+    def __init__(
+        self,
+        time_field: str = "created_at",
+        read_ahead: int = 1,
+        max_records: Optional[int] = None,
+    ) -> None:
+        """Initialize, max_records bounds the history kept per endpoint."""
+        self._time_field = time_field
+        self._read_ahead = read_ahead
+        self._max_records = max_records
+        self._entries = {}  # type: Dict[Tuple[str, str], _Entry]
+
+    def invalidate(self, sensor_id: Optional[str] = None) -> None:
+        """Drop cached records of a sensor, or of all sensors."""
+        if sensor_id is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == sensor_id]:
+            del self._entries[key]
+
+    async def readings(self, sensor, columnar: bool = False) -> PageObject:
+        """Return all readings of a sensor."""
+        return await self._get(sensor, "readings", columnar)
+
+    async def averages_day(self, sensor, columnar: bool = False) -> PageObject:
+        """Return all daily averages of a sensor."""
+        return await self._get(sensor, "averages_day", columnar)
+
+    async def averages_hour(self, sensor, columnar: bool = False) -> PageObject:
+        """Return all hourly averages of a sensor."""
+        return await self._get(sensor, "averages_hour", columnar)
+
+    async def _get(self, sensor, endpoint: str, columnar: bool) -> PageObject:
+        key = (sensor.id, endpoint)
+        marker = sensor.last_reading_at
+        entry = self._entries.get(key)
+        if entry is not None and entry.marker == marker:
+            return entry.page(columnar)
+
+        first = await getattr(sensor, endpoint)()
+        if entry is None:
+            records = await self._fetch_all(first)
+        else:
+            records = await self._fetch_tail(first, entry.records)
+
+        if self._max_records is not None:
+            del records[self._max_records :]
+        entry = self._entries[key] = _Entry(marker, records)
+        return entry.page(columnar)
+
+    async def _fetch_all(self, first: PageObject) -> List[dict]:
+        records = []  # type: List[dict]
+        async for _, page in first.raw_pages(self._read_ahead):
+            records.extend(page)
+        return records
+
+    async def _fetch_tail(self, first: PageObject, cached: List[dict]) -> List[dict]:
+        """Return records newer than the cached ones merged with those.
+
+        Records at the newest cached time are replaced, as the averages of
+        the current hour or day change with every reading.
+        """
+        field = self._time_field
+        cutoff = cached[0].get(field) if cached else None
+        if cutoff is None:
+            return await self._fetch_all(first)
+
+        tail = []  # type: List[Any]
+        pages = first.raw_pages(read_ahead=0)
+        fetched = 0
+        try:
+            async for _, page in pages:
+                fetched += 1
+                tail.extend(
+                    record for record in page if record.get(field, "") >= cutoff
+                )
+                # records are newest first, nothing after this page is new
+                if any(record.get(field, "") <= cutoff for record in page):
+                    break
+        finally:
+            await pages.aclose()
+
+        _LOGGER.debug("Fetched %d new record(s) from %d page(s)", len(tail), fetched)
+        return tail + [record for record in cached if record.get(field, "") < cutoff]
@@ -0,0 +1,420 @@
+"""In-process store of sensor readings with hourly and daily rollups."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, overload
+
+from .timeseries import FIELDS, READING_INTERVAL, SensorSeries, parse_timestamp
+
+HOUR = 3600
+DAY = 86400
+
+# 30 days of readings at the 30 minute cadence of the sensor documents
+RAW_CAPACITY = 48 * 30
+HOURLY_CAPACITY = 24 * 90
+DAILY_CAPACITY = 365 * 2
+
+# readings closer than this are the same reading, e.g. the inferred time of
+# a sensor document series and the created_at of the readings endpoint
+TOLERANCE = READING_INTERVAL.total_seconds() / 2
+
+# reading fields of the readings endpoint and the series field they feed
+RECORD_FIELDS = {
+    "moisture_t": "moisture_1",
+    "moisture_m": "moisture_3",
+    "moisture_b": "moisture_5",
+    "moisture_1": "moisture_1",
+    "moisture_3": "moisture_3",
+    "moisture_5": "moisture_5",
+    "temp": "temp",
+}
+
+_NAN = float("nan")
+
+
+@overload
+def epoch_seconds(value: None) -> None:
+    ...
+
+
+@overload
+def epoch_seconds(value: Any) -> float:
+    ...
+
+
+def epoch_seconds(value):
+    """Return datetime, API timestamp or epoch seconds as epoch seconds."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = parse_timestamp(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RingBuffer:
+    """Fixed capacity columns of float values ordered by time.
+
+    Once full, appending overwrites the oldest row. Rows older than the
+    newest one are inserted in time order.
+    """
+
+    def __init__(
+        self, capacity: int, fields: Sequence[str], typecode: str = "f"
+    ) -> None:
+        """Initialize."""
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        # columns grow up to capacity, then the oldest row is overwritten
+        self._times = array("d")
+        self._columns = {
+            field: array(typecode) for field in fields
+        }  # type: Dict[str, array]
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        """Return number of rows."""
+        return self._size
+
+    def _slot(self, index: int) -> int:
+        return (self._start + index) % self.capacity
+
+    def time(self, index: int) -> float:
+        """Return time of a row, 0 is the oldest."""
+        return self._times[self._slot(index)]
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """Return time of the newest row."""
+        if not self._size:
+            return None
+        return self.time(self._size - 1)
+
+    def append(self, time: float, values: Dict[str, float]) -> None:
+        """Add a row newer than all others, fields without a value are nan."""
+        if self._size < self.capacity:
+            self._size += 1
+            self._times.append(time)
+            for field, column in self._columns.items():
+                column.append(values.get(field, _NAN))
+            return
+
+        slot = self._start
+        self._start = (self._start + 1) % self.capacity
+        self._times[slot] = time
+        for field, column in self._columns.items():
+            column[slot] = values.get(field, _NAN)
+
+    def insert(
+        self, time: float, values: Dict[str, float], tolerance: float = 0.0
+    ) -> bool:
+        """Add a row at its place in time, fields without a value are nan.
+
+        Returns False if a row within tolerance seconds of time exists, or
+        if the buffer is full and time is older than all rows.
+        """
+        last = self.last_time
+        if last is None or time - last > tolerance:
+            self.append(time, values)
+            return True
+
+        index = self.bisect(time)
+        if index < self._size and self.time(index) - time <= tolerance:
+            return False
+        if index and time - self.time(index - 1) <= tolerance:
+            return False
+        if self._size == self.capacity and not index:
+            return False
+
+        self._linearize()
+        self._times.insert(index, time)
+        for field, column in self._columns.items():
+            column.insert(index, values.get(field, _NAN))
+        if self._size == self.capacity:
+            # drop the oldest row
+            del self._times[0]
+            for column in self._columns.values():
+                del column[0]
+        else:
+            self._size += 1
+        return True
+
+    def _linearize(self) -> None:
+        """Move the oldest row to slot 0."""
+        start = self._start
+        if not start:
+            return
+        self._times = self._times[start:] + self._times[:start]
+        for field, column in self._columns.items():
+            self._columns[field] = column[start:] + column[:start]
+        self._start = 0
+
+    def update(self, index: int, values: Dict[str, float]) -> None:
+        """Replace values of a row, 0 is the oldest."""
+        slot = self._slot(index)
+        for field, value in values.items():
+            self._columns[field][slot] = value
+
+    def get(self, index: int, field: str) -> float:
+        """Return a value of a row, 0 is the oldest."""
+        return self._columns[field][self._slot(index)]
+
+    def bisect(self, time: float) -> int:
+        """Return index of the first row at or after time."""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self.time(middle) < time:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column: array, low: int, high: int) -> array:
+        first = self._slot(low)
+        last = first + high - low
+        if last <= self.capacity:
+            return column[first:last]
+        return column[first:] + column[: last - self.capacity]
+
+    def window(self, start=None, end=None) -> Dict[str, array]:
+        """Return columns of the rows with start <= time < end.
+
+        The times are returned as epoch seconds in the "timestamp" column.
+        """
+        start, end = epoch_seconds(start), epoch_seconds(end)
+        low = 0 if start is None else self.bisect(start)
+        high = self._size if end is None else self.bisect(end)
+        high = max(low, high)
+
+        columns = {"timestamp": self._slice(self._times, low, high)}
+        for field, column in self._columns.items():
+            columns[field] = self._slice(column, low, high)
+        return columns
+
+
+class Rollup:
+    """Count, sum, min and max of each field per fixed-size time bucket."""
+
+    def __init__(self, bucket: int, capacity: int, fields: Sequence[str]) -> None:
+        """Initialize."""
+        self.bucket = bucket
+        self.fields = tuple(fields)
+        columns = []  # type: List[str]
+        for field in fields:
+            columns.extend(
+                (field + "_count", field + "_sum", field + "_min", field + "_max")
+            )
+        self._buffer = RingBuffer(capacity, columns, "d")
+
+    def __len__(self):
+        """Return number of buckets."""
+        return len(self._buffer)
+
+    def add(self, time: float, values: Dict[str, float]) -> None:
+        """Add a reading to its bucket."""
+        start = time - time % self.bucket
+        buffer = self._buffer
+        if buffer.last_time == start:
+            index = len(buffer) - 1
+        else:
+            index = buffer.bisect(start)
+        if index < len(buffer) and buffer.time(index) == start:
+            update = {}
+            for field, value in values.items():
+                if value != value:
+                    continue
+                count = buffer.get(index, field + "_count")
+                if count:
+                    update[field + "_count"] = count + 1
+                    update[field + "_sum"] = buffer.get(index, field + "_sum") + value
+                    update[field + "_min"] = min(
+                        buffer.get(index, field + "_min"), value
+                    )
+                    update[field + "_max"] = max(
+                        buffer.get(index, field + "_max"), value
+                    )
+                else:
+                    update.update(self._first(field, value))
+            buffer.update(index, update)
+            return
+
+        row = {}  # type: Dict[str, float]
+        for field in self.fields:
+            value = values.get(field, _NAN)
+            if value == value:
+                row.update(self._first(field, value))
+            else:
+                row[field + "_count"] = 0.0
+        buffer.insert(start, row)
+
+    @staticmethod
+    def _first(field: str, value: float) -> Dict[str, float]:
+        return {
+            field + "_count": 1.0,
+            field + "_sum": value,
+            field + "_min": value,
+            field + "_max": value,
+        }
+
+    def window(self, start=None, end=None) -> Dict[str, array]:
+        """Return bucket start, average, min and max of buckets in a window.
+
+        Buckets starting at start <= time < end are returned, with the
+        average in the field column and min/max in "<field>_min/_max".
+        """
+        raw = self._buffer.window(start, end)
+        columns = {"timestamp": raw["timestamp"]}
+        for field in self.fields:
+            counts = raw[field + "_count"]
+            columns[field] = array(
+                "d",
+                (
+                    total / count if count else _NAN
+                    for total, count in zip(raw[field + "_sum"], counts)
+                ),
+            )
+            columns[field + "_min"] = raw[field + "_min"]
+            columns[field + "_max"] = raw[field + "_max"]
+            columns[field + "_count"] = counts
+        return columns
+
+
+class SensorStore:
+    """Raw readings and hourly/daily rollups of one sensor."""
+
+    def __init__(
+        self,
+        raw_capacity: int = RAW_CAPACITY,
+        hourly_capacity: int = HOURLY_CAPACITY,
+        daily_capacity: int = DAILY_CAPACITY,
+        fields: Sequence[str] = FIELDS,
+        tolerance: float = TOLERANCE,
+    ) -> None:
+        """Initialize."""
+        self.tolerance = tolerance
+        self.raw = RingBuffer(raw_capacity, fields)
+        self.hourly = Rollup(HOUR, hourly_capacity, fields)
+        self.daily = Rollup(DAY, daily_capacity, fields)
+
+    def add(self, time: float, values: Dict[str, float]) -> bool:
+        """Add a reading in any order, returns False if it is not stored.
+
+        A reading within tolerance seconds of a stored one, or older than
+        all readings of a full raw buffer, is ignored. The rollups count
+        only readings stored in the raw buffer, so feeding a reading twice
+        never counts it twice, even when its time was inferred once.
+        """
+        fields = self.raw.fields
+        values = {key: value for key, value in values.items() if key in fields}
+        if not self.raw.insert(time, values, self.tolerance):
+            return False
+        self.hourly.add(time, values)
+        self.daily.add(time, values)
+        return True
+
+
+class ReadingStore:
+    """Readings of many sensors, answering window queries locally.
+
+    Readings are kept per sensor in ring buffers of fixed capacity, with
+    hourly and daily rollups updated as readings are added. Readings may
+    be added in any order, e.g. the sensor document series first and
+    older pages of the readings endpoint later. A reading within
+    tolerance seconds of one already stored is ignored, so feeding
+    overlapping series is safe although the sensor document series only
+    has times inferred from last_reading_at.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        raw_capacity: int = RAW_CAPACITY,
+        hourly_capacity: int = HOURLY_CAPACITY,
+        daily_capacity: int = DAILY_CAPACITY,
+        tolerance: float = TOLERANCE,
+    ) -> None:
+        """Initialize."""
+        self._capacities = (raw_capacity, hourly_capacity, daily_capacity)
+        self._tolerance = tolerance
+        self._sensors = {}  # type: Dict[str, SensorStore]
+
+    def __contains__(self, sensor_id: str) -> bool:
+        """Return true if readings of the sensor are stored."""
+        return sensor_id in self._sensors
+
+    def sensor(self, sensor_id: str) -> SensorStore:
+        """Return the store of a sensor, creating it if needed."""
+        store = self._sensors.get(sensor_id)
+        if store is None:
+            store = self._sensors[sensor_id] = SensorStore(
+                *self._capacities, tolerance=self._tolerance
+            )
+        return store
+
+    def add(self, sensor_id: str, time, **values: float) -> bool:
+        """Add a reading at time (datetime, API timestamp or epoch seconds)."""
+        return self.sensor(sensor_id).add(epoch_seconds(time), values)
+
+    def add_series(self, sensor_id: str, series: SensorSeries) -> int:
+        """Add the readings of a sensor document series, return number added."""
+        store = self.sensor(sensor_id)
+        added = 0
+        for record in series.records():
+            added += store.add(record.pop("timestamp").timestamp(), record)
+        return added
+
+    def add_records(
+        self, sensor_id: str, records: Iterable[dict], time_field: str = "created_at"
+    ) -> int:
+        """Add records of the readings endpoint, return number added."""
+        rows = []
+        for record in records:
+            values = {
+                RECORD_FIELDS[key]: value
+                for key, value in record.items()
+                if key in RECORD_FIELDS and value is not None
+            }
+            rows.append((epoch_seconds(record[time_field]), values))
+        rows.sort(key=lambda row: row[0])
+
+        store = self.sensor(sensor_id)
+        return sum(store.add(time, values) for time, values in rows)
+
+    def window(self, sensor_id: str, start=None, end=None) -> Dict[str, array]:
+        """Return raw readings with start <= time < end as columns."""
+        return self.sensor(sensor_id).raw.window(start, end)
+
+    def hourly(self, sensor_id: str, start=None, end=None) -> Dict[str, array]:
+        """Return hourly average, min and max with start <= hour < end."""
+        return self.sensor(sensor_id).hourly.window(start, end)
+
+    def daily(self, sensor_id: str, start=None, end=None) -> Dict[str, array]:
+        """Return daily average, min and max with start <= day < end (UTC)."""
+        return self.sensor(sensor_id).daily.window(start, end)
+
+    def coverage(self, sensor_id: str) -> Optional[Tuple[datetime, datetime]]:
+        """Return (first, last) time of the raw readings of a sensor, or None."""
+        store = self._sensors.get(sensor_id)
+        if store is None or not len(store.raw):
+            return None
+        return (
+            datetime.fromtimestamp(store.raw.time(0), timezone.utc),
+            datetime.fromtimestamp(store.raw.time(len(store.raw) - 1), timezone.utc),
+        )
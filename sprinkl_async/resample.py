@@ -0,0 +1,255 @@
+"""Resample readings of many sensors onto a shared time grid."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .readingstore import ReadingStore, epoch_seconds
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+METHODS = ("linear", "previous", "nearest")
+
+_NAN = float("nan")
+
+
+class Grid(NamedTuple):
+    """Values of sensors (rows) at shared times (columns).
+
+    timestamps are epoch seconds. values is a 2D NumPy array when NumPy is
+    available, else one array('d') per sensor. Missing values are NaN.
+    """
+
+    sensor_ids: List[str]
+    timestamps: Any
+    values: Any
+
+    def row(self, sensor_id: str) -> Any:
+        """Return the values of a sensor."""
+        return self.values[self.sensor_ids.index(sensor_id)]
+
+    def to_dict(self) -> Dict[str, list]:
+        """Return columns: "timestamp" and one list of values per sensor."""
+        columns = {"timestamp": list(self.timestamps)}
+        for sensor_id, values in zip(self.sensor_ids, self.values):
+            columns[sensor_id] = list(values)
+        return columns
+
+
+def _points(times: Sequence[float], values: Sequence[float]) -> Tuple[list, list]:
+    """Return times and values without NaN values, ordered by time.
+
+    Of values at the same time the last one given is kept.
+    """
+    pairs = sorted(
+        (
+            (time, value)
+            for time, value in zip(times, values)
+            if value is not None and value == value
+        ),
+        key=lambda pair: pair[0],
+    )
+    result_times = []  # type: List[float]
+    result_values = []  # type: List[float]
+    for time, value in pairs:
+        if result_times and result_times[-1] == time:
+            result_values[-1] = value
+        else:
+            result_times.append(time)
+            result_values.append(value)
+    return result_times, result_values
+
+
+def _numpy_points(times: Sequence[float], values: Sequence[float]) -> Tuple[Any, Any]:
+    """Return times and values without NaN values as arrays ordered by time.
+
+    Of values at the same time the last one given is kept.
+    """
+    if isinstance(values, (list, tuple)):
+        values = [_NAN if value is None else value for value in values]
+    stamps = numpy.asarray(times, dtype="float64")
+    data = numpy.asarray(values, dtype="float64")
+    keep = ~numpy.isnan(data)
+    stamps, data = stamps[keep], data[keep]
+    if len(stamps) > 1:
+        steps = numpy.diff(stamps)
+        if (steps < 0).any():
+            order = numpy.argsort(stamps, kind="stable")
+            stamps, data = stamps[order], data[order]
+            steps = numpy.diff(stamps)
+        if not steps.all():
+            # last of each run of equal times
+            last = numpy.append(steps != 0, True)
+            stamps, data = stamps[last], data[last]
+    return stamps, data
+
+
+def _grid(bounds: List[Tuple[float, float]], step: float, start, end) -> List[float]:
+    """Return grid times, bounds are (first, last) time of non-empty series."""
+    if start is None:
+        if not bounds:
+            return []
+        start = math.ceil(min(first for first, _ in bounds) / step) * step
+    if end is None:
+        if not bounds:
+            return []
+        end = max(last for _, last in bounds)
+    count = int(math.floor((end - start) / step)) + 1
+    return [start + step * index for index in range(max(count, 0))]
+
+
+def _numpy_row(times, values, grid, method: str, max_gap) -> Any:
+    result = numpy.full(len(grid), numpy.nan)
+    if not len(times):
+        return result
+
+    inside = (grid >= times[0]) & (grid <= times[-1])
+    after = numpy.searchsorted(times, grid, side="right")
+    before = numpy.clip(after - 1, 0, len(times) - 1)
+    after = numpy.clip(after, 0, len(times) - 1)
+
+    if method == "linear":
+        result[inside] = numpy.interp(grid[inside], times, values)
+        gap = times[after] - times[before]
+        exact = times[before] == grid
+    elif method == "previous":
+        inside = grid >= times[0]
+        result[inside] = values[before[inside]]
+        gap = grid - times[before]
+        exact = gap == 0
+    else:
+        nearer = numpy.where(
+            numpy.abs(times[after] - grid) < numpy.abs(grid - times[before]),
+            after,
+            before,
+        )
+        result[inside] = values[nearer[inside]]
+        gap = numpy.abs(times[nearer] - grid)
+        exact = gap == 0
+
+    if max_gap is not None:
+        result[(gap > max_gap) & ~exact] = numpy.nan
+    return result
+
+
+def _python_row(times, values, grid, method: str, max_gap) -> array:
+    result = array("d", [_NAN]) * len(grid)
+    if not times:
+        return result
+
+    first, last = times[0], times[-1]
+    for column, time in enumerate(grid):
+        if time < first or (time > last and method != "previous"):
+            continue
+        after = bisect_right(times, time)
+        before = max(after - 1, 0)
+        after = min(after, len(times) - 1)
+
+        if method == "linear":
+            span = times[after] - times[before]
+            if times[before] == time or span == 0:
+                value, gap = values[before], 0.0
+            else:
+                ratio = (time - times[before]) / span
+                value = values[before] + (values[after] - values[before]) * ratio
+                gap = span
+        elif method == "previous":
+            value, gap = values[before], time - times[before]
+        else:
+            nearer = (
+                after
+                if abs(times[after] - time) < abs(time - times[before])
+                else before
+            )
+            value, gap = values[nearer], abs(times[nearer] - time)
+
+        if max_gap is None or gap <= max_gap:
+            result[column] = value
+    return result
+
+
+def resample(
+    series: Dict[str, Tuple[Sequence[float], Sequence[float]]],
+    step: float,
+    start=None,
+    end=None,
+    method: str = "linear",
+    max_gap: Optional[float] = None,
+) -> Grid:
+    """Return values of many series at start, start + step, ... <= end.
+
+    series maps sensor ids to (epoch seconds, values). Without start/end
+    the grid spans all series, aligned to a multiple of step. method is
+    "linear" interpolation, "previous" (last value carried forward) or
+    "nearest". A grid time gets NaN outside a series, or when the readings
+    it is taken from are more than max_gap seconds apart (linear) or away
+    (previous, nearest). Of readings at the same time the last one is used.
+    """
+    if method not in METHODS:
+        raise ValueError("Unknown method {0}, use one of {1}".format(method, METHODS))
+
+    sensor_ids = list(series)
+    start, end = epoch_seconds(start), epoch_seconds(end)
+
+    if numpy is not None:
+        points = [_numpy_points(*series[ident]) for ident in sensor_ids]
+        bounds = [(times[0], times[-1]) for times, _ in points if len(times)]
+        timestamps = numpy.array(_grid(bounds, step, start, end), dtype="float64")
+        values = numpy.empty((len(sensor_ids), len(timestamps)))
+        for row, (times, data) in enumerate(points):
+            values[row] = _numpy_row(times, data, timestamps, method, max_gap)
+        return Grid(sensor_ids, timestamps, values)
+
+    points = [_points(*series[ident]) for ident in sensor_ids]
+    bounds = [(times[0], times[-1]) for times, _ in points if times]
+    grid = _grid(bounds, step, start, end)
+    rows = [_python_row(times, data, grid, method, max_gap) for times, data in points]
+    return Grid(sensor_ids, array("d", grid), rows)
+
+
+def resample_sensors(
+    sensors: Iterable[Any],
+    field: str,
+    step: float,
+    start=None,
+    end=None,
+    method: str = "linear",
+    max_gap: Optional[float] = None,
+    store: Optional[ReadingStore] = None,
+) -> Grid:
+    """Resample a field, e.g. "moisture_1", of moisture sensors.
+
+    Readings come from store, e.g. MoistureSensors.store, or otherwise
+    from the recent series of each sensor document.
+    """
+    series = {}  # type: Dict[str, Tuple[Sequence[float], Sequence[float]]]
+    for sensor in sensors:
+        if store is not None:
+            window = store.window(sensor.id)
+            series[sensor.id] = (window["timestamp"], window[field])
+        elif sensor.series is not None:
+            times = [time.timestamp() for time in sensor.series.timestamps()]
+            values = getattr(sensor.series, field)
+            # shorter arrays end at the last reading too
+            series[sensor.id] = (times[len(times) - len(values) :], values)
+        else:
+            series[sensor.id] = ((), ())
+    return resample(series, step, start, end, method, max_gap)
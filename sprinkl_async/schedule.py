@@ -22,6 +22,8 @@ from .dataobject import DictObject
 class Schedule(DictObject):
     """Defines a schedule."""
 
+    __slots__ = ("_request", "_adjustments")
+
     def __init__(
         self, request: Callable[..., Awaitable[dict]], adjustments: dict, schedule: dict
     ):
@@ -0,0 +1,182 @@
+"""Evaluate zone moisture and temperature limits against their sensors."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+# (check name, sensor field, zone limit), moisture limits are reached at or
+# above the limit and the temperature limit at or below it
+CHECKS = (
+    ("moisture_t", "moisture_1", "limit_moisture_t"),
+    ("moisture_m", "moisture_3", "limit_moisture_m"),
+    ("moisture_b", "moisture_5", "limit_moisture_b"),
+    ("temp", "temp", "limit_temp"),
+)
+_MOISTURE_CHECKS = 3
+
+_NAN = float("nan")
+
+
+def _number(value) -> float:
+    return _NAN if value is None else float(value)
+
+
+class ThresholdChange(NamedTuple):
+    """Zone whose limit state flipped, with the state per check."""
+
+    zone: Any
+    sensor: Any
+    reached: Dict[str, bool]
+    previous: Optional[Dict[str, bool]]
+
+
+class ThresholdEngine:
+    """Join zones to their moisture sensors and evaluate limits in one pass.
+
+    The join and the limits are computed when zones are added, evaluate()
+    then only reads the current sensor values and compares all zones at
+    once, with NumPy when available. A limit or sensor value that is
+    missing never counts as reached.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._sensors = []  # type: List[Any]
+        self._sensor_index = {}  # type: Dict[int, int]
+        self._zones = []  # type: List[Tuple[Any, int]]
+        self._limits = []  # type: List[List[float]]
+        self._state = None  # type: Any
+        self._compiled = None  # type: Any
+
+    def __len__(self):
+        """Return number of zones joined to a sensor."""
+        return len(self._zones)
+
+    def add(self, zones: Iterable[Any], sensors: Iterable[Any]) -> int:
+        """Join zones to sensors of the same controller, return zones joined.
+
+        Zones without a moisture sensor, or whose sensor is not among
+        sensors, are left out. The next evaluation reports every zone.
+        """
+        by_id = {sensor.id: sensor for sensor in sensors}
+        joined = 0
+        for zone in zones:
+            limits = zone.get("moisture_sensor")
+            if not limits:
+                continue
+            sensor = by_id.get(limits.get("moisture_sensor_id"))
+            if sensor is None:
+                continue
+
+            index = self._sensor_index.get(id(sensor))
+            if index is None:
+                index = self._sensor_index[id(sensor)] = len(self._sensors)
+                self._sensors.append(sensor)
+            self._zones.append((zone, index))
+            self._limits.append([_number(limits.get(limit)) for _, _, limit in CHECKS])
+            joined += 1
+
+        self._state = None
+        self._compiled = None
+        return joined
+
+    async def add_controller(self, controller) -> int:
+        """Join the zones of a controller to its moisture sensors."""
+        return self.add(await controller.zones(), await controller.moisture_sensors())
+
+    def _values(self) -> List[List[float]]:
+        return [
+            [_number(getattr(sensor, field, None)) for _, field, _ in CHECKS]
+            for sensor in self._sensors
+        ]
+
+    def _evaluate_numpy(self) -> Any:
+        if self._compiled is None:
+            self._compiled = (
+                numpy.array([index for _, index in self._zones], dtype="intp"),
+                numpy.array(self._limits, dtype="float64").reshape(-1, len(CHECKS)),
+            )
+        indexes, limits = self._compiled
+        values = numpy.array(self._values(), dtype="float64").reshape(-1, len(CHECKS))
+        values = values[indexes]
+        return numpy.concatenate(
+            (
+                values[:, :_MOISTURE_CHECKS] >= limits[:, :_MOISTURE_CHECKS],
+                values[:, _MOISTURE_CHECKS:] <= limits[:, _MOISTURE_CHECKS:],
+            ),
+            axis=1,
+        )
+
+    def _evaluate_python(self) -> List[Tuple[bool, ...]]:
+        values = self._values()
+        states = []
+        for (_, index), limits in zip(self._zones, self._limits):
+            row = values[index]
+            states.append(
+                tuple(
+                    (
+                        row[check] >= limits[check]
+                        if check < _MOISTURE_CHECKS
+                        else row[check] <= limits[check]
+                    )
+                    for check in range(len(CHECKS))
+                )
+            )
+        return states
+
+    def _reached(self, row) -> Dict[str, bool]:
+        return {name: bool(value) for (name, _, _), value in zip(CHECKS, row)}
+
+    def evaluate(self) -> List[ThresholdChange]:
+        """Return the zones whose limit state changed since the last call.
+
+        The first evaluation reports every joined zone.
+        """
+        previous = self._state
+        if numpy is not None:
+            state = self._evaluate_numpy()
+            if previous is None:
+                flipped = range(len(self._zones))  # type: Iterable[int]
+            else:
+                flipped = numpy.flatnonzero((state != previous).any(axis=1)).tolist()
+        else:
+            state = self._evaluate_python()
+            if previous is None:
+                flipped = range(len(self._zones))
+            else:
+                flipped = [
+                    index
+                    for index, (row, old) in enumerate(zip(state, previous))
+                    if row != old
+                ]
+        self._state = state
+
+        changes = []
+        for index in flipped:
+            zone, sensor = self._zones[index]
+            changes.append(
+                ThresholdChange(
+                    zone,
+                    self._sensors[sensor],
+                    self._reached(state[index]),
+                    None if previous is None else self._reached(previous[index]),
+                )
+            )
+        return changes
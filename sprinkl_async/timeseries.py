@@ -0,0 +1,167 @@
+"""Compact time series of the recent readings in a sensor document."""
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+# cadence of the readings in the moistures_*/temps arrays
+READING_INTERVAL = timedelta(minutes=30)
+
+# array of the sensor document and the series field holding it
+_ARRAYS = (
+    ("moistures_t", "moisture_1"),
+    ("moistures_m", "moisture_3"),
+    ("moistures_b", "moisture_5"),
+    ("moistures_1", "moisture_1"),
+    ("moistures_3", "moisture_3"),
+    ("moistures_5", "moisture_5"),
+    ("temps", "temp"),
+)
+
+FIELDS = ("moisture_1", "moisture_3", "moisture_5", "temp")
+
+_NAN = float("nan")
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Return an API timestamp, e.g. 2019-06-14T03:07:51.837Z, as UTC datetime."""
+    if "." in value:
+        parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+    else:
+        parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Return datetime as an API timestamp, naive datetimes are UTC."""
+    value = _utc(value).astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + "{0:03d}Z".format(
+        value.microsecond // 1000
+    )
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _values(typecode: str, values: Iterable[Any]) -> array:
+    """Return values as array(typecode), or array('f') with NaN for gaps."""
+    values = list(values)
+    try:
+        return array(typecode, values)
+    except (TypeError, OverflowError):
+        # null gaps, fractions or out of range moistures
+        return array("f", (_NAN if value is None else value for value in values))
+
+
+class SensorSeries:
+    """Recent readings of a sensor, oldest first, at a fixed interval.
+
+    The sensor document has no timestamps for its reading arrays, the last
+    value is taken at last_reading_at and every earlier one an interval
+    before it. Moistures are kept as array('B') and temperatures as
+    array('f'). Moistures with null gaps or fractions fall back to
+    array('f'), gaps are NaN.
+    """
+
+    __slots__ = ("end", "interval", "moisture_1", "moisture_3", "moisture_5", "temp")
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        end: datetime,
+        interval: timedelta = READING_INTERVAL,
+        moisture_1: Iterable[int] = (),
+        moisture_3: Iterable[int] = (),
+        moisture_5: Iterable[int] = (),
+        temp: Iterable[float] = (),
+    ) -> None:
+        """Initialize."""
+        self.end = _utc(end)
+        self.interval = interval
+        self.moisture_1 = _values("B", moisture_1)
+        self.moisture_3 = _values("B", moisture_3)
+        self.moisture_5 = _values("B", moisture_5)
+        self.temp = _values("f", temp)
+
+    @classmethod
+    def from_sensor(
+        cls, sensor: dict, interval: timedelta = READING_INTERVAL
+    ) -> Optional["SensorSeries"]:
+        """Move the reading arrays out of a sensor document into a series.
+
+        Returns None if the sensor has not reported a reading yet.
+        """
+        values = {}  # type: Dict[str, Any]
+        for key, field in _ARRAYS:
+            if key in sensor:
+                values[field] = sensor.pop(key) or ()
+
+        if not sensor.get("last_reading_at"):
+            return None
+        return cls(parse_timestamp(sensor["last_reading_at"]), interval, **values)
+
+    def __len__(self):
+        """Return number of reading times."""
+        return max(len(getattr(self, field)) for field in FIELDS)
+
+    @property
+    def start(self) -> datetime:
+        """Return time of the oldest reading."""
+        return self.end - self.interval * max(len(self) - 1, 0)
+
+    def timestamps(self) -> List[datetime]:
+        """Return the time of each reading, oldest first."""
+        start = self.start
+        return [start + self.interval * index for index in range(len(self))]
+
+    def window(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> "SensorSeries":
+        """Return the readings with start <= time < end, either may be None."""
+        times = self.timestamps()
+        low = 0 if start is None else bisect_left(times, _utc(start))
+        high = len(times) if end is None else bisect_left(times, _utc(end))
+        high = max(high, low)
+
+        values = {}
+        for field in FIELDS:
+            # shorter arrays end at the last reading too
+            series = getattr(self, field)
+            offset = len(times) - len(series)
+            values[field] = series[max(low - offset, 0) : max(high - offset, 0)]
+
+        last = times[high - 1] if high > low else self.start
+        return SensorSeries(last, self.interval, **values)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return one dict per reading time with the timestamp and values."""
+        times = self.timestamps()
+        records = [{"timestamp": time} for time in times]  # type: List[Dict[str, Any]]
+        for field in FIELDS:
+            series = getattr(self, field)
+            offset = len(times) - len(series)
+            for index, value in enumerate(series):
+                records[offset + index][field] = value
+        return records
+
+    def __repr__(self):
+        """Return repr of object."""
+        return "SensorSeries(end={0!r}, readings={1})".format(self.end, len(self))
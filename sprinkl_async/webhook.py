@@ -22,6 +22,8 @@ from .dataobject import DictObject
 class Webhook(DictObject):
     """Handle webhooks for Sprinkl cloud service."""
 
+    __slots__ = ("_request",)
+
     def __init__(self, webhook, request: Callable[..., Awaitable[dict]]):
         """Initialize."""
         super().__init__(webhook)
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 from .dataobject import DictObject
+from .interning import intern_strings
 
 
 class WebhookBaseObject:
@@ -25,8 +26,8 @@ class WebhookBaseObject:
         self._device_id = obj["device_id"]
         self._webhook_id = obj["webhook_id"]
         self._external_id = obj["external_id"]
-        self._event = obj["event"]
-        self._event_data = DictObject(obj["event_data"])
+        self._event = intern_strings(obj["event"])
+        self._event_data = DictObject(intern_strings(obj["event_data"]), lazy=True)
 
     @property
     def device_id(self):
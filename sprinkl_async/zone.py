@@ -22,6 +22,8 @@ from .dataobject import DictObject
 class Zone(DictObject):
     """Represents a zone in the Sprinkl controller."""
 
+    __slots__ = ("_request",)
+
     def __init__(self, data: dict, request: Callable[..., Awaitable[dict]]):
         """Initialize."""
         super().__init__(data)
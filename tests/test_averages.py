@@ -0,0 +1,159 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sprinkl_async import averages
+from sprinkl_async.averages import LocalAverages, batch_averages
+from sprinkl_async.moisturesensors import MoistureSensors
+from sprinkl_async.readingstore import DAY, HOUR, ReadingStore
+
+START = datetime(2019, 6, 14, tzinfo=timezone.utc)
+
+
+def filled_store():
+    store = ReadingStore()
+    for minute in range(0, 48 * 60, 30):
+        store.add(
+            "1",
+            START + timedelta(minutes=minute),
+            moisture_1=minute // 60,
+            temp=70.0,
+        )
+    store.add("2", START, moisture_1=10, moisture_3=20)
+    store.add("2", START + timedelta(minutes=30), moisture_1=30)
+    return store
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batch_averages(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(averages, "numpy", None)
+    store = filled_store()
+    windows = [store.window("1"), store.window("2"), store.window("3")]
+
+    day, second, missing = batch_averages(windows, DAY)
+    assert day["timestamp"] == [
+        START.timestamp(),
+        (START + timedelta(days=1)).timestamp(),
+    ]
+    assert day["moisture_1"] == [11.5, 35.5]
+    assert day["temp"] == [70.0, 70.0]
+    assert all(math.isnan(value) for value in day["moisture_3"])
+
+    assert second["timestamp"] == [START.timestamp()]
+    assert second["moisture_1"] == [20.0]
+    assert second["moisture_3"] == [20.0]
+    assert missing["timestamp"] == []
+
+    hours = batch_averages(windows[:1], HOUR, offset=-1800)[0]
+    assert hours["timestamp"][0] == (START - timedelta(minutes=30)).timestamp()
+    assert hours["moisture_1"][:2] == [0.0, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_local_averages_fallback():
+    sensors_data = [
+        {
+            "id": "1",
+            "last_reading_at": None,
+            "moisture_t": 1,
+            "moisture_m": 2,
+            "moisture_b": 3,
+        },
+        {
+            "id": "2",
+            "last_reading_at": None,
+            "moisture_t": 1,
+            "moisture_m": 2,
+            "moisture_b": 3,
+        },
+    ]
+    requested = []
+    # newest first, two days per page
+    days = [
+        {"created_at": "2019-06-{0:02d}T00:00:00.000Z".format(day), "moisture_t": day}
+        for day in range(17, 9, -1)
+    ]
+
+    async def request(method, path, params=None):
+        page = 1 if params is None else params["page"]
+        requested.append((path, page))
+        return {
+            "data": days[(page - 1) * 2 : page * 2],
+            "meta": {"page": str(page), "count": "4"},
+        }
+
+    sensors = MoistureSensors(request, sensors_data, filled_store())
+    local = LocalAverages(sensors.store)
+    assert local.covers("1", START, START + timedelta(days=2))
+    assert not local.covers("2", START, START + timedelta(days=2))
+    assert not local.covers("3")
+    assert not local.covers("1")
+    assert not local.covers("1", START)
+
+    pages = await sensors.averages_day(START, START + timedelta(days=2))
+    # the server averages are cut to the window, pages after the first one
+    # older than the window are not read
+    assert requested == [
+        ("sensors/2/readings/averages/day", page) for page in (1, 2, 3)
+    ]
+    assert [record["moisture_t"] for record in pages["2"].to_list()] == [15, 14]
+    assert not pages["2"].has_more
+    # local averages are newest first too
+    assert pages["1"].to_list() == [
+        {
+            "created_at": "2019-06-15T00:00:00.000Z",
+            "moisture_t": 35.5,
+            "moisture_m": None,
+            "moisture_b": None,
+            "temp": 70.0,
+        },
+        {
+            "created_at": "2019-06-14T00:00:00.000Z",
+            "moisture_t": 11.5,
+            "moisture_m": None,
+            "moisture_b": None,
+            "temp": 70.0,
+        },
+    ]
+
+    pages = await sensors.averages_hour(START, START + timedelta(hours=2))
+    assert len(pages["1"].data) == 2
+    assert requested[-1] == ("sensors/2/readings/averages/hour", 3)
+
+    # buckets cut by the window are averaged in full, as on the server
+    assert local.align(DAY, START + timedelta(hours=5), START + timedelta(hours=6)) == (
+        START.timestamp(),
+        (START + timedelta(days=1)).timestamp(),
+    )
+    pages = await sensors.averages_day(
+        START + timedelta(hours=12), START + timedelta(days=1, hours=12)
+    )
+    assert [record["moisture_t"] for record in pages["1"].to_list()] == [35.5, 11.5]
+
+    # an open window is the full history, always from the server
+    requested.clear()
+    pages = await sensors.averages_day()
+    assert sorted(requested) == [
+        ("sensors/1/readings/averages/day", 1),
+        ("sensors/2/readings/averages/day", 1),
+    ]
+    assert pages["1"].has_more
@@ -0,0 +1,110 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from array import array
+
+import pytest
+
+from sprinkl_async import columnar
+from sprinkl_async.columnar import ColumnarListObject
+from sprinkl_async.pageobject import PageObject
+
+READINGS = [
+    {"id": "r_1", "moisture_t": 40, "temp": 70.5, "ok": True, "extra": {"a": [1]}},
+    {"id": "r_2", "moisture_t": 42, "temp": 71, "ok": False},
+    {"id": "r_3", "moisture_t": 2**70, "temp": 72.0, "ok": True, "note": None},
+]
+
+
+def test_rows():
+    table = ColumnarListObject(READINGS)
+
+    assert len(table) == 3
+    assert table.columns == ["id", "moisture_t", "temp", "ok", "extra", "note"]
+    assert [row.id for row in table] == ["r_1", "r_2", "r_3"]
+
+    row = table[0]
+    assert row.moisture_t == 40
+    assert row.temp == 70.5
+    assert row.ok is True
+    assert row.extra.a[0] == 1
+    assert row["id"] == "r_1"
+    assert row.get("note") is None
+    assert list(row) == ["id", "moisture_t", "temp", "ok", "extra"]
+    assert len(row) == 5
+    assert row.to_dict() == READINGS[0]
+    assert json.loads(str(row)) == READINGS[0]
+
+    with pytest.raises(AttributeError):
+        row.note
+    with pytest.raises(KeyError):
+        row["note"]
+    with pytest.raises(KeyError):
+        table[3]
+    with pytest.raises(IndexError):
+        table.get(3)
+
+    assert table.get(-1).id == "r_3"
+    assert table[1].temp == 71.0
+    assert table.to_list()[1] == {
+        "id": "r_2",
+        "moisture_t": 42,
+        "temp": 71.0,
+        "ok": False,
+    }
+    assert json.loads(table.json)[2]["moisture_t"] == 2**70
+    assert str(table) == table.json
+    assert len(table.data) == 3
+
+    with pytest.raises(TypeError):
+        ColumnarListObject([1, 2])
+
+
+def test_columns_numpy():
+    pytest.importorskip("numpy")
+    table = ColumnarListObject(READINGS)
+
+    temps = table.column("temp")
+    assert temps.dtype.name == "float64"
+    assert temps.mean() == pytest.approx(71.1666, rel=1e-3)
+    assert table.column("ok").sum() == 2
+    assert table.column("moisture_t") == [40, 42, 2**70]
+    assert table.column("note") == [None, None, None]
+
+
+def test_columns_without_numpy(monkeypatch):
+    monkeypatch.setattr(columnar, "numpy", None)
+    table = ColumnarListObject([{"value": 1}, {"value": 2}])
+
+    values = table.column("value")
+    assert isinstance(values, array)
+    assert sum(values) == 3
+
+
+def test_columnar_page():
+    def request(method, uri, params):
+        pass
+
+    page = PageObject(
+        {"data": READINGS, "meta": {"count": "1", "page": "1"}},
+        request,
+        "get",
+        "uri",
+        columnar=True,
+    )
+    assert isinstance(page.data, ColumnarListObject)
+    assert page.data[1].moisture_t == 42
+    assert json.loads(page.json)[0]["id"] == "r_1"
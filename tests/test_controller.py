@@ -125,6 +125,9 @@ async def test_controller_history(event_loop, controller_login_fixture):
             assert len(history.data) == 1
 
             assert history.data[0]["dummy"] == "history"
+            # next pages are requested relative to the controller
+            assert history._request == controller._request_controller
+            assert [item["dummy"] async for item in history] == ["history"]
 
 
 @pytest.mark.asyncio
@@ -15,6 +15,7 @@
 
 import asyncio
 import json
+import sys
 from datetime import datetime, timedelta
 
 import aiohttp
@@ -23,6 +24,8 @@ import pytest
 
 from sprinkl_async.dataobject import DictObject, ListObject
 
+from tests.fixtures import controller_json
+
 
 def test_create_lists():
     dl = ListObject([["subitem1", "subitem2"]])
@@ -84,3 +87,329 @@ def test_create_dict():
     assert len(json_obj) == 1
     for item in json_obj:
         assert item == "item"
+
+
+def test_lazy_dict():
+    raw = {"item": "subitem1", "sub": {"value": 1}, "items": [{"a": 1}, [1, 2], 3]}
+    do = DictObject(raw, lazy=True)
+
+    assert do.lazy
+    assert not DictObject(raw).lazy
+    assert len(do) == 3
+    assert list(do) == ["item", "sub", "items"]
+
+    assert do.item == "subitem1"
+    assert do["sub"].value == 1
+    assert do.sub is do.get("sub")
+    assert do.get("missing") is None
+
+    with pytest.raises(KeyError):
+        item = do["missing"]
+
+    with pytest.raises(AttributeError):
+        item = do.missing
+
+    items = do.items
+    assert items.lazy
+    assert items[0].a == 1
+    assert items.get(1)[1] == 2
+    assert items[2] == 3
+    assert list(items)[0] is items[0]
+    assert len(items.data) == 3
+
+    with pytest.raises(KeyError):
+        item = items[3]
+
+    assert do.data["sub"] is do.sub
+    assert json.loads(do.json) == raw
+    assert json.loads(str(do.items)) == raw["items"]
+
+
+def test_lazy_list():
+    raw = [{"a": 1}, {"a": 2}]
+    dl = ListObject(raw, lazy=True)
+
+    assert dl.lazy
+    assert [item.a for item in dl] == [1, 2]
+    assert json.loads(dl.json) == raw
+
+    # mixing wrapped objects in a lazy list
+    mixed = ListObject([DictObject({"b": 1})], lazy=True)
+    assert json.loads(mixed.json) == [{"b": 1}]
+    assert json.loads(ListObject([mixed]).json) == [[{"b": 1}]]
+
+
+def test_reserved_keys():
+    raw = {"get": "value", "json": 1, "id": "x"}
+    for do in (DictObject(raw), DictObject(raw, lazy=True)):
+        # class attributes win over data keys, item access still works
+        assert callable(do.get)
+        assert do.get("get") == "value"
+        assert do["json"] == 1
+        assert json.loads(do.json) == raw
+        assert do.id == "x"
+        assert list(do) == ["get", "json", "id"]
+        assert list(do.data) == ["get", "json", "id"]
+        assert do["get"] is do["get"]
+
+
+def test_slots():
+    do = DictObject({"item": 1, "sub": {"a": 1}})
+
+    assert not hasattr(do, "_wrapped")
+    assert vars(do) == {"item": 1, "sub": do.sub}
+    assert do.data == vars(do)
+
+    dl = ListObject([1])
+    with pytest.raises(AttributeError):
+        dl.extra = 1
+
+    lazy = DictObject({"item": 1}, lazy=True)
+    with pytest.raises(AttributeError):
+        item = lazy.missing
+    assert lazy.item == 1
+    assert vars(lazy) == {"item": 1}
+
+
+def test_attribute_assignment():
+    for lazy in (False, True):
+        do = DictObject({"a": 1, "sub": {"b": 1}}, lazy=lazy)
+        assert json.loads(do.json) == {"a": 1, "sub": {"b": 1}}
+
+        # attributes are data keys, set like item access
+        do.a = 2
+        do.c = 3
+        do.sub.b = 2
+        assert do.a == 2
+        assert do.to_dict() == {"a": 2, "sub": {"b": 2}, "c": 3}
+        assert json.loads(do.json) == do.to_dict()
+        assert len(do) == 3
+
+        del do.c
+        assert "c" not in list(do)
+        assert json.loads(do.json) == {"a": 2, "sub": {"b": 2}}
+        with pytest.raises(AttributeError):
+            del do.c
+        with pytest.raises(AttributeError):
+            do.json = "{}"
+
+        # private names are kept apart from the data
+        do._private = 1
+        assert do._private == 1
+        assert "_private" not in list(do)
+        del do._private
+        with pytest.raises(AttributeError):
+            do._private
+
+
+def test_subclass_attributes():
+    class Custom(DictObject):
+        __slots__ = ("_request",)
+
+        def __init__(self, request, data):
+            super().__init__(data)
+            self._request = request
+            self._cache = {}
+
+    custom = Custom("request", {"id": "x"})
+    assert custom._request == "request"
+    assert custom._cache == {}
+    assert custom.to_dict() == {"id": "x"}
+    assert json.loads(custom.json) == {"id": "x"}
+
+
+def test_reserved_keys_single_store():
+    do = DictObject({"a": 1, "get": 2})
+    do["a"] = 5
+    assert do.a == 5
+    assert do["a"] == 5
+    do.b = 6
+    assert do["b"] == 6
+    assert do.to_dict() == {"a": 5, "b": 6, "get": 2}
+
+    # a reserved key set later moves all data to the same store
+    do = DictObject({"a": 1})
+    do["update"] = {"x": 1}
+    do.a = 2
+    assert do.a == 2
+    assert do["update"].x == 1
+    assert callable(do.update)
+    assert do.to_dict() == {"a": 2, "update": {"x": 1}}
+    del do["a"]
+    with pytest.raises(AttributeError):
+        do.a
+
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, indent=4)
+
+
+def test_json_matches_dumps(controller_json):
+    docs = [
+        controller_json,
+        {},
+        [],
+        {"a": [], "b": {}, "c": [[], {}], "d": None, "e": 1.5, "f": False},
+        {"uni": "åäö \"quoted\"\n", "inf": float("inf")},
+        {1: "int key", 2.5: "float key"},
+        [1, "two", 3.0, True, None, [{"x": [1, {"y": {}}]}]],
+        {"t": (1, [2, (3,)]), "n": {"deep": (4, 5)}, "e": ()},
+        [(1, 2)],
+    ]
+    deep = {"t": (1, 2)}
+    for _ in range(20):
+        deep = {"child": deep}
+    docs.append(deep)
+    for doc in docs:
+        obj_type = DictObject if isinstance(doc, dict) else ListObject
+        for lazy in (False, True):
+            obj = obj_type(doc, lazy=lazy)
+            assert obj.json == _dumps(doc)
+            assert str(obj) == _dumps(doc)
+
+
+def test_data_read_only():
+    for lazy in (False, True):
+        obj = DictObject({"a": 1, "zones": [{"id": 1}]}, lazy=lazy)
+        assert obj.data["a"] == 1
+        with pytest.raises(TypeError):
+            obj.data["a"] = 2
+        zones = obj.zones.data
+        assert zones[0].id == 1
+        with pytest.raises(AttributeError):
+            zones.append({"id": 2})
+        assert json.loads(obj.json) == {"a": 1, "zones": [{"id": 1}]}
+
+
+def test_json_cache_and_invalidation(controller_json):
+    raw = controller_json["data"][0]
+    for lazy in (False, True):
+        doc = json.loads(json.dumps(raw))
+        obj = DictObject(doc, lazy=lazy)
+
+        first = obj.json
+        assert obj.json is first
+
+        zone = obj.zones[0]
+        zones_json = obj.zones.json
+        location_json = obj.location.json
+        zone["enabled"] = False
+        assert obj.location.json is location_json
+        assert obj.zones.json is not zones_json
+        assert json.loads(obj.json)["zones"][0]["enabled"] is False
+
+        # children wrapped after the parent was rendered still invalidate it
+        obj.weather.conditions["raining"] = True
+        assert json.loads(obj.json)["weather"]["conditions"]["raining"] is True
+
+        del obj.zones[0]["slope"]
+        assert "slope" not in json.loads(obj.json)["zones"][0]
+
+        obj.update({"name": "Renamed", "new": {"nested": [1]}})
+        assert obj.name == "Renamed"
+        assert obj.new.nested[0] == 1
+        expected = json.loads(json.dumps(raw))
+        expected["zones"][0]["enabled"] = False
+        expected["weather"]["conditions"]["raining"] = True
+        del expected["zones"][0]["slope"]
+        expected.update({"name": "Renamed", "new": {"nested": [1]}})
+        assert obj.json == _dumps(expected)
+
+        obj.schedules.append({"id": "s_2"})
+        obj.schedules[0] = {"id": "s_0"}
+        assert [item.id for item in obj.schedules] == ["s_0", "s_2"]
+        assert json.loads(obj.json)["schedules"] == [{"id": "s_0"}, {"id": "s_2"}]
+
+        with pytest.raises(KeyError):
+            del obj["missing"]
+        with pytest.raises(KeyError):
+            obj.schedules[5] = 1
+
+
+def test_json_shared_children():
+    child = DictObject({"a": 1})
+    first = ListObject([child])
+    second = ListObject([child])
+    assert first.json == second.json == _dumps([{"a": 1}])
+
+    child["a"] = 2
+    assert first.json == second.json == _dumps([{"a": 2}])
+
+    shadowed = DictObject({"a": 1})
+    shadowed["get"] = 1
+    assert callable(shadowed.get)
+    assert shadowed["get"] == 1
+    assert json.loads(shadowed.json) == {"a": 1, "get": 1}
+
+
+def test_to_dict_to_list(controller_json):
+    raw = controller_json["data"][0]
+
+    lazy = DictObject(raw, lazy=True)
+    assert lazy.to_dict() is raw
+    assert lazy.zones.to_list() is raw["zones"]
+
+    eager = DictObject(raw)
+    plain = eager.to_dict()
+    assert plain == raw
+    assert plain is not raw
+    assert type(plain["zones"][0]) is dict
+    assert ListObject(raw["zones"]).to_list() == raw["zones"]
+
+    # wrapped values are stored as plain data
+    lazy["extra"] = DictObject({"a": [1]})
+    lazy.zones.append(ListObject([{"b": 2}], lazy=True))
+    lazy.zones[0] = DictObject({"c": 3})
+    assert raw["extra"] == {"a": [1]}
+    assert raw["zones"][-1] == [{"b": 2}]
+    assert raw["zones"][0] == {"c": 3}
+
+    # eager containers holding lazy children reuse the raw child
+    mixed = ListObject([DictObject({"d": 4}, lazy=True), DictObject({"e": [5]})])
+    assert mixed.to_list() == [{"d": 4}, {"e": [5]}]
+    assert DictObject({}).to_dict() == {}
+
+
+def test_deep_payload():
+    depth = sys.getrecursionlimit() + 10
+    data = leaf = {}  # type: dict
+    for _ in range(depth):
+        leaf["child"] = {}
+        leaf = leaf["child"]
+    leaf["value"] = 1
+
+    for obj in (DictObject(data), DictObject(data, lazy=True)):
+        node = obj
+        for _ in range(depth):
+            node = node.child
+        assert node.value == 1
+
+        text = obj.json
+        assert text.count('"child"') == depth
+        assert '"value": 1' + "\n" + "    " * depth + "}" in text
+
+    assert DictObject(data).json == DictObject(data, lazy=True).json
+    plain = ListObject([data]).to_list()[0]
+    for _ in range(depth):
+        plain = plain["child"]
+    assert plain == {"value": 1}
+
+
+def test_deep_json_matches_dumps():
+    data = leaf = {}  # type: dict
+    for _ in range(100):
+        leaf["child"] = [{"a": 1.5, "b": [], "c": {}, "d": "x"}]
+        leaf = leaf["child"][0]
+
+    expected = json.dumps(data, sort_keys=True, indent=4)
+    assert DictObject(data).json == expected
+    assert DictObject(data, lazy=True).json == expected
+
+    # mutating below the cached depth still invalidates the root
+    obj = DictObject(data)
+    assert obj.json == expected
+    node = obj
+    for _ in range(100):
+        node = node.child[0]
+    node["d"] = "y"
+    assert obj.json.count('"d": "y"') == 1
@@ -0,0 +1,159 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import copy
+
+import aiohttp
+import pytest
+
+from sprinkl_async.client import Client
+from sprinkl_async.diff import (
+    CHANGE_ADDED,
+    CHANGE_CHANGED,
+    CHANGE_REMOVED,
+    ChangeEvent,
+    ChangeFeed,
+    diff,
+)
+
+from tests.fixtures import login_fixture, auth_token, controller_json
+
+
+def test_diff_identical():
+    doc = {"a": 1, "b": [1, 2, {"c": "d"}]}
+    assert diff(doc, copy.deepcopy(doc)) == []
+
+
+def test_diff_scalar_and_nested():
+    old = {"a": 1, "b": {"c": True, "d": [1, 2]}, "gone": 1}
+    new = {"a": 2, "b": {"c": True, "d": [1, 3]}, "new": "x"}
+
+    events = diff(old, new)
+    assert ChangeEvent(CHANGE_CHANGED, ("a",), 1, 2) in events
+    assert ChangeEvent(CHANGE_CHANGED, ("b", "d", 1), 2, 3) in events
+    assert ChangeEvent(CHANGE_REMOVED, ("gone",), 1, None) in events
+    assert ChangeEvent(CHANGE_ADDED, ("new",), None, "x") in events
+    assert len(events) == 4
+
+
+def test_diff_type_change():
+    assert diff({"a": 1}, {"a": True}) == [ChangeEvent(CHANGE_CHANGED, ("a",), 1, True)]
+    assert diff({"a": [1]}, {"a": {"b": 1}}) == [
+        ChangeEvent(CHANGE_CHANGED, ("a",), [1], {"b": 1})
+    ]
+
+
+def test_diff_hash_collision():
+    # hash(-1) == hash(-2) in CPython
+    assert diff({"id": 1, "x": -1}, {"id": 1, "x": -2}) == [
+        ChangeEvent(CHANGE_CHANGED, ("x",), -1, -2)
+    ]
+    assert diff([[-1]], [[-2]]) == [ChangeEvent(CHANGE_CHANGED, (0, 0), -1, -2)]
+    assert diff({"x": 1}, {"x": True}) == [ChangeEvent(CHANGE_CHANGED, ("x",), 1, True)]
+
+
+def test_diff_nan():
+    nan = float("nan")
+    assert (
+        diff({"temp": nan, "values": [1.0, nan]}, {"temp": nan, "values": [1.0, nan]})
+        == []
+    )
+    assert diff({"temp": nan}, {"temp": 1.0}) == [
+        ChangeEvent(CHANGE_CHANGED, ("temp",), nan, 1.0)
+    ]
+
+
+def test_diff_keyed_lists():
+    old = {"zones": [{"id": "z_1", "enabled": True}, {"id": "z_2", "enabled": True}]}
+    new = {"zones": [{"id": "z_2", "enabled": False}, {"id": "z_3", "enabled": True}]}
+
+    events = diff(old, new)
+    assert (
+        ChangeEvent(CHANGE_CHANGED, ("zones", "z_2", "enabled"), True, False) in events
+    )
+    assert (
+        ChangeEvent(CHANGE_REMOVED, ("zones", "z_1"), old["zones"][0], None) in events
+    )
+    assert ChangeEvent(CHANGE_ADDED, ("zones", "z_3"), None, new["zones"][1]) in events
+    assert len(events) == 3
+
+    # reordering keyed lists is not a change
+    assert diff(old, {"zones": list(reversed(old["zones"]))}) == []
+
+
+@pytest.mark.asyncio
+async def test_feed_subscribe(controller_json):
+    feed = ChangeFeed()
+    everything = feed.subscribe()
+    zones = feed.subscribe(prefix=("1", "zones"))
+
+    first = controller_json["data"][0]
+    events = feed.update([first])
+    assert events == [ChangeEvent(CHANGE_ADDED, ("1",), None, first)]
+    assert await everything.get() == events[0]
+
+    second = copy.deepcopy(first)
+    second["connected"] = False
+    second["zones"][0]["enabled"] = False
+    events = feed.update([second])
+    assert len(events) == 2
+
+    event = await zones.__anext__()
+    assert event.path == ("1", "zones", "z_1", "enabled")
+    assert event.old and not event.new
+    with pytest.raises(asyncio.QueueEmpty):
+        zones.get_nowait()
+
+    async for event in everything:
+        if event.path == ("1", "zones", "z_1", "enabled"):
+            break
+
+    assert feed.update([]) == [ChangeEvent(CHANGE_REMOVED, ("1",), second, None)]
+
+    with zones:
+        pass
+    feed.update([first])
+    with pytest.raises(asyncio.QueueEmpty):
+        zones.get_nowait()
+
+    everything.close()
+    everything.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_bounded_queue():
+    feed = ChangeFeed()
+    subscription = feed.subscribe(maxsize=1)
+
+    feed.update([{"id": "1", "value": 1}])
+    feed.update([{"id": "1", "value": 2}])
+
+    assert subscription.dropped == 1
+    event = subscription.get_nowait()
+    assert event == ChangeEvent(CHANGE_CHANGED, ("1", "value"), 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_feed_controllers(event_loop, login_fixture):
+    async with login_fixture:
+        async with aiohttp.ClientSession(loop=event_loop) as websession:
+            client = Client(websession)
+            await client.login(email="test@test.com", password="password")
+
+            controllers = await client.controllers()
+            feed = ChangeFeed()
+            feed.update(controllers)
+            assert feed.update(controllers) == []
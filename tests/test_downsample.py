@@ -0,0 +1,78 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from sprinkl_async.downsample import downsample, downsample_page
+from sprinkl_async.pageobject import PageObject
+
+VALUES = [5, 5, 9, 5, 5, 5, 1, 5, 5, 5, 5, 5, 6, 5]
+
+
+def test_lttb():
+    points = list(enumerate(VALUES))
+    result = list(downsample(points, 4))
+    # first point, the spike of each bucket and the last point
+    assert result == [(0, 5), (2, 9), (6, 1), (8, 5), (12, 6), (13, 5)]
+
+    assert list(downsample(points[::-1], 4)) == [
+        (13, 5),
+        (12, 6),
+        (11, 5),
+        (6, 1),
+        (2, 9),
+        (0, 5),
+    ]
+    assert list(downsample([(0, 1)], 4)) == [(0, 1)]
+    assert list(downsample([], 4)) == []
+
+
+def test_minmax():
+    points = list(enumerate(VALUES)) + [(14, None), (15, float("nan"))]
+    result = list(downsample(points, 4, "minmax"))
+    assert result == [(0, 5), (2, 9), (4, 5), (6, 1), (8, 5), (12, 6), (13, 5)]
+
+    with pytest.raises(ValueError):
+        list(downsample(points, 4, "average"))
+
+
+@pytest.mark.asyncio
+async def test_downsample_page():
+    records = [
+        {
+            "created_at": "2019-06-14T{0:02d}:00:00.000Z".format(hour),
+            "moisture_t": value,
+            "temp": 70.0 if hour != 5 else None,
+        }
+        for hour, value in enumerate(VALUES)
+    ][::-1]
+    requested = []
+
+    async def request(method, uri, params):
+        requested.append(params["page"])
+        page = params["page"]
+        return {
+            "data": records[(page - 1) * 5 : page * 5],
+            "meta": {"count": "3", "page": str(page)},
+        }
+
+    first = PageObject(
+        await request("get", "readings", {"page": 1}), request, "get", "readings"
+    )
+    result = await downsample_page(first, ["moisture_t", "temp"], 4 * 3600, "minmax")
+    assert sorted(requested) == [1, 2, 3]
+    assert [value for _, value in result["moisture_t"]] == [5, 6, 5, 5, 1, 5, 9]
+    assert [value for _, value in result["temp"]] == [70.0] * 4
+    assert result["temp"][0] == (1560517200.0, 70.0)
@@ -0,0 +1,145 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+
+import pytest
+
+from sprinkl_async.errors import RequestError
+from sprinkl_async.export import (
+    CsvExporter,
+    NdjsonExporter,
+    ParquetExporter,
+    export,
+    flatten,
+)
+from sprinkl_async.pageobject import PageObject
+
+
+def history(pages, fail=None):
+    def page(number):
+        return {
+            "data": [
+                {"id": number * 10 + i, "type": "ZONE", "data": {"zone": i}}
+                for i in range(2)
+            ],
+            "meta": {"count": str(pages), "page": str(number)},
+        }
+
+    async def request(method, uri, params):
+        request.requested.append(params["page"])
+        if params["page"] == fail:
+            raise RequestError("failed")
+        return page(params["page"])
+
+    request.requested = []
+    return PageObject(page(1), request, "get", "history"), request
+
+
+def test_flatten():
+    record = {"id": 1, "data": {"zone": 2, "tags": ["a"]}, "source": None}
+    assert flatten(record) == {
+        "id": 1,
+        "data.zone": 2,
+        "data.tags": '["a"]',
+        "source": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(tmp_path):
+    path = str(tmp_path / "history.ndjson")
+    page, _ = history(3)
+
+    assert await export(page, NdjsonExporter(path)) == 6
+    with open(path) as handle:
+        ids = [json.loads(line)["id"] for line in handle]
+    assert ids == [10, 11, 20, 21, 30, 31]
+
+
+@pytest.mark.asyncio
+async def test_export_csv_resume(tmp_path):
+    path = str(tmp_path / "history.csv")
+    page, request = history(4, fail=3)
+
+    with pytest.raises(RequestError):
+        await export(page, CsvExporter(path), read_ahead=0)
+
+    page, request = history(4)
+    assert await export(page, CsvExporter(path), resume=True) == 4
+    assert request.requested == [3, 4]
+
+    with open(path, newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["id"] for row in rows] == [
+        str(page * 10 + i) for page in range(1, 5) for i in range(2)
+    ]
+    assert list(rows[0]) == ["data.zone", "id", "type"]
+
+
+@pytest.mark.asyncio
+async def test_export_parquet(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "history")
+    page, _ = history(5, fail=4)
+
+    with pytest.raises(RequestError):
+        await export(page, ParquetExporter(path, pages_per_file=2), read_ahead=0)
+
+    page, request = history(5)
+    exporter = ParquetExporter(path, pages_per_file=2)
+    assert await export(page, exporter, resume=True) == 6
+    assert request.requested == [3, 4, 5]
+
+    table = parquet.read_table(path)
+    assert sorted(table.column("id").to_pylist()) == [
+        page * 10 + i for page in range(1, 6) for i in range(2)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_parquet_schema(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+    readings = [
+        [{"id": "r1", "temp": 70, "note": None}],
+        [{"id": "r2", "temp": 71.5, "note": "dry"}],
+    ]
+
+    def page(number):
+        return {
+            "data": readings[number - 1],
+            "meta": {"count": str(len(readings)), "page": str(number)},
+        }
+
+    async def request(method, uri, params):
+        return page(params["page"])
+
+    # inferred from the first page, widened for the second one
+    path = str(tmp_path / "inferred")
+    await export(PageObject(page(1), request, "get", "readings"), ParquetExporter(path))
+    table = parquet.read_table(path)
+    assert table.column("temp").to_pylist() == [70.0, 71.5]
+    assert table.column("note").to_pylist() == [None, "dry"]
+
+    path = str(tmp_path / "declared")
+    exporter = ParquetExporter(
+        path, schema={"id": pyarrow.string(), "temp": pyarrow.float32()}
+    )
+    await export(PageObject(page(1), request, "get", "readings"), exporter)
+    table = parquet.read_table(path)
+    assert table.schema.names == ["id", "temp"]
+    assert table.column("id").to_pylist() == ["r1", "r2"]
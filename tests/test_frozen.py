@@ -0,0 +1,118 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import gc
+import json
+
+import aiohttp
+import pytest
+
+from sprinkl_async.client import Client
+from sprinkl_async.dataobject import DictObject
+from sprinkl_async.frozen import (
+    FrozenDictObject,
+    FrozenListObject,
+    Interner,
+    freeze,
+)
+
+from tests.fixtures import login_fixture, auth_token, controller_json
+
+
+def test_frozen_access(controller_json):
+    data = controller_json["data"][0]
+    frozen = freeze(data)
+
+    assert isinstance(frozen, FrozenDictObject)
+    assert isinstance(frozen.zones, FrozenListObject)
+    assert frozen.zones[0].name == data["zones"][0]["name"]
+    assert frozen["weather"]["station"] == data["weather"]["station"]
+    assert frozen.get("missing") is None
+    assert "zones" in frozen
+    assert len(frozen) == len(data)
+    assert list(frozen) == list(data)
+    assert frozen.to_dict() == data
+    assert json.loads(frozen.json) == data
+    assert json.loads(str(frozen.zones)) == data["zones"]
+    assert frozen.zones.to_list() == data["zones"]
+
+    with pytest.raises(TypeError):
+        frozen["name"] = "other"
+    with pytest.raises(TypeError):
+        frozen.zones[0] = None
+    with pytest.raises(AttributeError):
+        frozen.missing
+
+
+def test_frozen_sharing(controller_json):
+    interner = Interner()
+    data = controller_json["data"][0]
+    changed = copy.deepcopy(data)
+    changed["zones"][0]["enabled"] = not changed["zones"][0]["enabled"]
+
+    first = interner.freeze(data)
+    second = interner.freeze(changed)
+    again = interner.freeze(DictObject(copy.deepcopy(data)))
+
+    assert again is first
+    assert first != second
+    assert second.weather is first.weather
+    assert second.location is first.location
+    assert second.zones[0] is not first.zones[0]
+    assert second.zones[0].moisture_sensor is first.zones[0].moisture_sensor
+
+    # frozen objects are not thawed and frozen again
+    assert interner.freeze(first) is first
+    assert freeze(first) is first
+    assert interner.freeze({"snapshot": second})["snapshot"] is second
+
+    # equal data from different interners is equal and hashes the same
+    other = freeze(data)
+    assert other is not first
+    assert other == first
+    assert {first: "cached"}[other] == "cached"
+
+
+def test_frozen_types():
+    interner = Interner()
+    assert interner.freeze({"a": 1}) is not interner.freeze({"a": True})
+    assert interner.freeze({"a": 1}) is not interner.freeze({"a": 1.0})
+    assert interner.freeze([1, [2]]) is interner.freeze([1, [2]])
+    assert FrozenDictObject({"a": [1]}) is freeze({"a": [1]})
+    assert FrozenListObject([{"a": 1}])[0] is freeze({"a": 1})
+
+
+def test_frozen_released():
+    interner = Interner()
+    frozen = interner.freeze({"a": {"b": [1, 2]}})
+    assert len(interner) == 3
+
+    del frozen
+    gc.collect()
+    assert len(interner) == 0
+
+
+@pytest.mark.asyncio
+async def test_controller_snapshot(event_loop, login_fixture):
+    async with login_fixture:
+        async with aiohttp.ClientSession(loop=event_loop) as websession:
+            client = Client(websession)
+            await client.login(email="test@test.com", password="password")
+
+            controller = (await client.controllers())[0]
+            snapshot = controller.snapshot()
+            assert snapshot.id == controller.id
+            assert controller.snapshot() is snapshot
@@ -0,0 +1,162 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import random
+
+import pytest
+
+from sprinkl_async.errors import SprinklError
+from sprinkl_async.gorilla import CompressedSeries, SeriesFile
+from sprinkl_async.pageobject import PageObject
+
+START = 1560470400.0
+
+
+def rows(count, seed=1, start=START):
+    rand = random.Random(seed)
+    time = start
+    result = []
+    for index in range(count):
+        # readings every 30 minutes, a few seconds late or early
+        time += 1800 + rand.randint(-5000, 5000) / 1000
+        values = {"moisture_1": float(40 + index % 3), "temp": rand.uniform(50, 90)}
+        if index % 7:
+            values["moisture_3"] = 97.0
+        result.append((time, values))
+    return result
+
+
+def check(window, expected):
+    assert len(window["timestamp"]) == len(expected)
+    for row, (time, values) in enumerate(expected):
+        assert window["timestamp"][row] == pytest.approx(time, abs=1e-3)
+        assert window["moisture_1"][row] == values["moisture_1"]
+        assert window["temp"][row] == values["temp"]
+        if "moisture_3" in values:
+            assert window["moisture_3"][row] == 97.0
+        else:
+            assert math.isnan(window["moisture_3"][row])
+        assert math.isnan(window["moisture_5"][row])
+
+
+def test_compressed_series():
+    series = CompressedSeries(block_size=16)
+    expected = rows(100)
+    for time, values in expected:
+        assert series.append(time, values)
+    assert not series.append(START, {"temp": 1.0})
+    assert len(series) == 100
+    assert series.nbytes < 100 * 8 * 5 / 2
+
+    check(series.window(), expected)
+    check(series.window(expected[20][0], expected[50][0]), expected[20:50])
+    check(series.window(expected[95][0]), expected[95:])
+    check(series.window(end=START), [])
+
+    restored = CompressedSeries.from_bytes(series.to_bytes(), block_size=16)
+    check(restored.window(), expected)
+    assert restored.append(expected[-1][0] + 1800, {"temp": 1.0})
+
+    with pytest.raises(SprinklError):
+        CompressedSeries.from_bytes(b"{}")
+
+
+def test_series_file(tmpdir):
+    path = str(tmpdir.join("sensor.bin"))
+    expected = rows(40)
+    series = SeriesFile(path, block_size=16)
+    for time, values in expected[:20]:
+        series.append(time, values)
+    series.close()
+
+    series = SeriesFile(path, block_size=16)
+    assert len(series) == 20
+    for time, values in expected[20:]:
+        series.append(time, values)
+    check(series.window(expected[10][0], expected[35][0]), expected[10:35])
+    series.flush()
+    assert CompressedSeries.from_bytes(tmpdir.join("sensor.bin").read_binary(), 16)
+    series.close()
+
+    series = SeriesFile(path, block_size=16)
+    check(series.window(), expected)
+    series.close()
+
+    with pytest.raises(SprinklError):
+        SeriesFile(path, fields=["temp"])
+
+
+def test_series_file_reopen(tmpdir):
+    path = tmpdir.join("sensor.bin")
+    expected = rows(20)
+    series = SeriesFile(str(path), block_size=16)
+    for time, values in expected:
+        series.append(time, values)
+    series.close()
+    size = path.size()
+
+    # opening keeps the flushed open block on disk
+    series = SeriesFile(str(path), block_size=16)
+    assert path.size() == size
+    assert len(series) == 20
+    series.append(expected[-1][0] + 1800, {"temp": 1.0})
+    series.flush()
+    assert len(CompressedSeries.from_bytes(path.read_binary(), 16)) == 21
+    series._handle.close()
+
+    # only a short tail of an interrupted write is cut
+    path.write_binary(path.read_binary() + b"\x05\x00\x01")
+    series = SeriesFile(str(path), block_size=16)
+    assert path.size() > size
+    check(series.window(end=expected[-1][0] + 1), expected)
+    series._handle.close()
+    assert len(CompressedSeries.from_bytes(path.read_binary(), 16)) == 21
+
+
+@pytest.mark.asyncio
+async def test_add_pages():
+    records = [
+        {
+            "created_at": "2019-06-14T{0:02d}:00:00.000Z".format(hour),
+            "moisture_t": hour,
+            "moisture_m": 97,
+            "temp": None,
+        }
+        for hour in range(10)
+    ][::-1]
+    requested = []
+
+    async def request(method, uri, params):
+        page = params["page"]
+        requested.append(page)
+        return {
+            "data": records[(page - 1) * 3 : page * 3],
+            "meta": {"count": "4", "page": str(page)},
+        }
+
+    def first():
+        page = {"data": records[:3], "meta": {"count": "4", "page": "1"}}
+        return PageObject(page, request, "get", "readings")
+
+    series = CompressedSeries()
+    assert await series.add_pages(first()) == 10
+    assert list(series.window()["moisture_1"]) == list(range(10))
+
+    records.insert(0, {"created_at": "2019-06-14T10:00:00.000Z", "moisture_t": 10})
+    requested.clear()
+    assert await series.add_pages(first()) == 1
+    assert requested == []
+    assert series.window()["moisture_1"][-1] == 10
@@ -0,0 +1,110 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from sprinkl_async.history import (
+    Checkpoint,
+    CheckpointStore,
+    FileCheckpointStore,
+    HistorySync,
+    MemoryCheckpointStore,
+)
+from sprinkl_async.pageobject import PageObject
+
+
+class FakeController:
+    """Controller serving events newest first, two per page."""
+
+    def __init__(self, count):
+        self.id = "controller-1"
+        self.events = []
+        self.requests = 0
+        for _ in range(count):
+            self.add()
+
+    def add(self):
+        number = len(self.events) + 1
+        self.events.insert(
+            0,
+            {
+                "id": "e{0}".format(number),
+                "created_at": "2019-05-{0:02d}".format(number),
+            },
+        )
+
+    def page(self, page):
+        self.requests += 1
+        pages = max(1, (len(self.events) + 1) // 2)
+        return {
+            "data": self.events[(page - 1) * 2 : page * 2],
+            "meta": {"count": str(pages), "page": str(page)},
+        }
+
+    async def request(self, method, uri, params):
+        return self.page(params["page"])
+
+    async def history(self):
+        return PageObject(self.page(1), self.request, "get", "history")
+
+
+@pytest.mark.asyncio
+async def test_history_sync():
+    controller = FakeController(5)
+    sync = HistorySync()
+
+    events = await sync.sync(controller)
+    assert [event["id"] for event in events] == ["e5", "e4", "e3", "e2", "e1"]
+    assert controller.requests == 3
+
+    controller.requests = 0
+    assert len(await sync.sync(controller)) == 0
+    assert controller.requests == 1
+
+    controller.add()
+    controller.add()
+    controller.add()
+    controller.requests = 0
+    events = await sync.sync(controller)
+    assert [event["id"] for event in events] == ["e8", "e7", "e6"]
+    assert controller.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_history_sync_checkpoint_gone():
+    controller = FakeController(4)
+    store = MemoryCheckpointStore()
+    await store.save(controller.id, Checkpoint("deleted", "2019-05-02.5"))
+
+    events = await HistorySync(store).sync(controller)
+    assert [event["id"] for event in events] == ["e4", "e3"]
+    assert await store.load(controller.id) == Checkpoint("e4", "2019-05-04")
+
+
+@pytest.mark.asyncio
+async def test_file_checkpoint_store(tmp_path):
+    path = str(tmp_path / "checkpoints.json")
+    store = FileCheckpointStore(path)
+    assert await store.load("controller-1") is None
+
+    controller = FakeController(3)
+    await HistorySync(store).sync(controller)
+
+    store = FileCheckpointStore(path)
+    assert await store.load("controller-1") == Checkpoint("e3", "2019-05-03")
+    assert await store.load("controller-2") is None
+
+    with pytest.raises(TypeError):
+        CheckpointStore()
@@ -0,0 +1,85 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import sys
+
+import aiohttp
+import pytest
+
+from sprinkl_async.client import Client
+from sprinkl_async.interning import intern_strings, loads
+from sprinkl_async.webhook_objects import WebhookBaseObject
+
+from tests.fixtures import login_fixture, auth_token, controller_json
+
+DOC = {
+    "zones": [
+        {"id": "z_1", "type": "flower" + "bed", "exposure": "full_" + "sun"},
+        {"id": "z_2", "type": "flower" + "bed", "name": "Front yard"},
+    ],
+    "days": ["S", "T" + "h", 1],
+    "nested": [[{"event": "ZONE_" + "STARTED"}]],
+    "created_at": "2019-06-14T03:07:51.837Z",
+}
+
+
+def check(data):
+    first, second = data["zones"]
+    assert data == DOC
+    assert first["type"] is second["type"]
+    assert first["type"] is sys.intern("flowerbed")
+    assert first["exposure"] is sys.intern("full_sun")
+    assert data["days"][1] is sys.intern("Th")
+    assert data["nested"][0][0]["event"] is sys.intern("ZONE_STARTED")
+    assert list(first)[1] is list(second)[1] is sys.intern("type")
+
+
+def test_loads():
+    check(loads(json.dumps(DOC)))
+
+
+def test_intern_strings():
+    check(intern_strings(json.loads(json.dumps(DOC))))
+    assert intern_strings(["a" + "b", 1]) == ["ab", 1]
+    assert intern_strings("ZONE_" + "COMPLETED") is sys.intern("ZONE_COMPLETED")
+    assert intern_strings(1) == 1
+
+
+def test_webhook_interned():
+    event = WebhookBaseObject(
+        {
+            "device_id": "d_id",
+            "webhook_id": "w_id",
+            "external_id": "e_id",
+            "event": "ZONE_" + "STARTED",
+            "event_data": {"zone": {"type": "flower" + "bed"}},
+        }
+    )
+    assert event.event is sys.intern("ZONE_STARTED")
+    assert event.data.zone.type is sys.intern("flowerbed")
+
+
+@pytest.mark.asyncio
+async def test_client_interned(event_loop, login_fixture):
+    async with login_fixture:
+        async with aiohttp.ClientSession(loop=event_loop) as websession:
+            client = Client(websession, intern_strings=True)
+            await client.login(email="test@test.com", password="password")
+
+            controller = (await client.controllers())[0]
+            assert controller.enabled
+            zone = controller.data["zones"][0]
+            assert zone["exposure"] is loads('{"exposure": "full_sun"}')["exposure"]
@@ -0,0 +1,85 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from sprinkl_async.models import ControllerModel, Model, WebhookModel, ZoneModel
+
+from tests.fixtures import controller_json, webhook_get_id1_json
+
+
+def test_controller_model(controller_json):
+    data = controller_json["data"][0]
+    model = ControllerModel.from_json(data)
+
+    assert model.id == "1"
+    assert model.connected
+    assert model.location.city == "Palo Alto"
+    assert model.conservation.seasonal_adjustments[0] == 20
+    assert model.weather.conditions.type == "clear_day"
+    assert model.weather.accumulations.total_today == 0.0
+    assert model.zones[0].number == 1
+    assert model.zones[0].moisture_sensor.limit_moisture_t == 65
+    assert model.schedules[0].zones[0].run_time == 4
+    assert model.moisture_sensors[0].moistures_t[0] == 53
+    assert model.extra == {}
+
+    assert model.to_dict() == data
+    assert model == ControllerModel.from_json(data)
+    assert model != model.zones[0]
+    assert repr(model.zones[0].moisture_sensor).startswith(
+        "ZoneMoistureSensorModel(limit_moisture_b=95"
+    )
+
+    with pytest.raises(AttributeError):
+        model.apa
+
+
+def test_model_missing_and_extra_fields():
+    zone = ZoneModel.from_json(
+        {"id": "z_1", "future_field": [1], "moisture_sensor": None}
+    )
+
+    assert zone.id == "z_1"
+    assert zone.number is None
+    assert zone.moisture_sensor is None
+    assert zone.future_field == [1]
+    assert zone.extra == {"future_field": [1]}
+    assert zone.to_dict() == {"id": "z_1", "future_field": [1], "moisture_sensor": None}
+
+    # a missing field that is set is part of the payload again
+    zone.name = "Lawn"
+    zone.number = None
+    assert zone.to_dict() == {
+        "id": "z_1",
+        "name": "Lawn",
+        "number": None,
+        "future_field": [1],
+        "moisture_sensor": None,
+    }
+
+    with pytest.raises(AttributeError):
+        zone.other = 1
+
+    model = Model.from_json({"a": 1})
+    assert model.a == 1
+    assert model.to_dict() == {"a": 1}
+
+
+def test_webhook_model(webhook_get_id1_json):
+    data = webhook_get_id1_json["data"]
+    model = WebhookModel.from_json(data)
+    assert model.events == ["OFFLINE", "ONLINE"]
+    assert model.to_dict() == data
@@ -131,5 +131,25 @@ async def test_get_refresh(event_loop, moister_sensor_get_day_average):
 
             sensor = sensors["1"]
 
-            await sensor.refresh()
+            assert len(sensor.series) == 48
+            assert sensor.series.moisture_1[-1] == 46
+
+            assert not await sensor.refresh()
             assert sensor.battery == 90
+            assert "moistures_1" not in sensor._data
+            assert len(sensor.series) == 48
+
+
+@pytest.mark.asyncio
+async def test_client_refresh_sensors(event_loop, moister_sensor_get_day_average):
+    async with moister_sensor_get_day_average:
+        async with aiohttp.ClientSession(loop=event_loop) as websession:
+            client = Client(websession)
+            await client.login(email="test@test.com", password="password")
+
+            # last_reading_at did not advance, so nothing is reported
+            assert await client.refresh_sensors(force=True) == {}
+
+            controller = await client.get("1")
+            sensors = await controller.moisture_sensors()
+            assert sensors["1"].battery == 90
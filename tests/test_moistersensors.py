@@ -24,7 +24,8 @@ import aresponses
 
 from sprinkl_async.client import Client
 from sprinkl_async.authtoken import AuthToken
-from sprinkl_async.errors import AuthenticateError
+from sprinkl_async.errors import AuthenticateError, SprinklError
+from sprinkl_async.moisturesensors import MoistureSensors
 
 from tests.const import TEST_HOST, TEST_PORT
 
@@ -84,3 +85,55 @@ async def test_get_moistersensors(event_loop, login_fixture):
 
             for iter_sensor in sensors:
                 assert iter_sensor == sensor
+
+
+@pytest.mark.asyncio
+async def test_refresh_all():
+    def sensor(ident):
+        return {
+            "id": ident,
+            "last_reading_at": "2019-06-14T03:00:00.000Z",
+            "moisture_t": 1,
+            "moisture_m": 2,
+            "moisture_b": 3,
+        }
+
+    active = []
+    requested = []
+
+    async def request(method, path):
+        requested.append(path)
+        active.append(path)
+        request.peak = max(request.peak, len(active))
+        await asyncio.sleep(0.01)
+        active.remove(path)
+        data = sensor(path.split("/")[1])
+        if data["id"] == request.failing:
+            raise SprinklError("Request failed")
+        if data["id"] in ("2", "4"):
+            data["last_reading_at"] = "2019-06-14T03:30:00.000Z"
+            data["moisture_t"] = 9
+        return {"data": data}
+
+    request.peak = 0
+    request.failing = None
+    sensors = MoistureSensors(request, [sensor(str(ident)) for ident in range(5)])
+
+    now = datetime(2019, 6, 14, 3, 10)
+    assert await sensors.refresh_all(now=now) == []
+    assert requested == []
+
+    changed = await sensors.refresh_all(limit=2, force=True)
+    assert sorted(changed) == ["2", "4"]
+    assert len(requested) == 5
+    assert request.peak == 2
+    assert sensors["2"].last_reading_at == "2019-06-14T03:30:00.000Z"
+    assert sensors["2"].moisture_1 == 9
+    assert "moisture_t" not in sensors["2"]._data
+
+    assert await sensors.refresh_all(force=True) == []
+
+    request.failing = "3"
+    for ident in ("1", "3"):
+        sensors[ident]._data["last_reading_at"] = "2019-06-14T02:00:00.000Z"
+    assert await sensors.refresh_all(force=True) == ["1"]
@@ -21,6 +21,7 @@ import aiohttp
 import asynctest
 import pytest
 
+from sprinkl_async.errors import RequestError
 from sprinkl_async.pageobject import PageObject
 
 
@@ -90,3 +91,141 @@ async def test_page_single():
     page_obj = PageObject(page1, request, "get", "uri")
     assert not page_obj.has_more
     assert not await page_obj.next()
+
+
+def pages_request(count, requested):
+    async def request(method, uri, params):
+        requested.append(params["page"])
+        await asyncio.sleep(0)
+        return {
+            "data": [{"page": params["page"], "item": i} for i in range(2)],
+            "meta": {"count": str(count), "page": str(params["page"])},
+        }
+
+    return request
+
+
+@pytest.mark.asyncio
+async def test_page_iterate_all():
+    requested = []
+    page1 = {
+        "data": [{"page": 1, "item": 0}, {"page": 1, "item": 1}],
+        "meta": {"count": "3", "page": "1"},
+    }
+    page_obj = PageObject(page1, pages_request(3, requested), "get", "uri")
+
+    items = [(item.page, item.item) async for item in page_obj]
+    assert items == [(page, i) for page in (1, 2, 3) for i in range(2)]
+    assert requested == [2, 3]
+
+    numbers = [page.meta.page async for page in page_obj.pages(read_ahead=5)]
+    assert numbers == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_page_read_ahead():
+    requested = []
+    page1 = {"data": [{"page": 1}], "meta": {"count": "4", "page": "1"}}
+    page_obj = PageObject(page1, pages_request(4, requested), "get", "uri")
+
+    pages = page_obj.pages(read_ahead=2)
+    assert (await pages.__anext__()) is page_obj
+    await asyncio.sleep(0.01)
+    # page 2 and 3 are fetched while page 1 is processed, page 4 waits
+    assert requested == [2, 3]
+
+    assert (await pages.__anext__()).meta.page == "2"
+    await asyncio.sleep(0.01)
+    assert requested == [2, 3, 4]
+    await pages.aclose()
+
+    requested.clear()
+    pages = page_obj.pages(read_ahead=0)
+    await pages.__anext__()
+    await asyncio.sleep(0.01)
+    assert requested == []
+    assert (await pages.__anext__()).meta.page == "2"
+    await pages.aclose()
+
+
+def fan_out_request(count, delays, failures, active):
+    async def request(method, uri, params):
+        page = params["page"]
+        active.append(page)
+        request.peak = max(request.peak, len(active))
+        try:
+            await asyncio.sleep(delays.get(page, 0))
+            if failures.get(page):
+                failures[page] -= 1
+                raise RequestError("failed")
+        finally:
+            active.remove(page)
+        return {"data": [{"page": page}], "meta": {"count": str(count)}}
+
+    request.peak = 0
+    return request
+
+
+@pytest.mark.asyncio
+async def test_page_fetch_all():
+    page1 = {"data": [{"page": 1}], "meta": {"count": "6", "page": "1"}}
+    delays = {2: 0.05, 4: 0.02}
+
+    request = fan_out_request(6, delays, {}, [])
+    page_obj = PageObject(page1, request, "get", "uri")
+    pages = [page.data[0].page async for page in page_obj.fetch_all(workers=2)]
+    assert pages == [1, 2, 3, 4, 5, 6]
+    assert request.peak == 2
+
+    request = fan_out_request(6, delays, {}, [])
+    page_obj = PageObject(page1, request, "get", "uri")
+    pages = [
+        page.data[0].page
+        async for page in page_obj.fetch_all(workers=3, ordered=False)
+    ]
+    assert sorted(pages) == [1, 2, 3, 4, 5, 6]
+    assert pages[:2] == [1, 3]
+    assert request.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_page_fetch_all_retry():
+    page1 = {"data": [{"page": 1}], "meta": {"count": "3", "page": "1"}}
+
+    request = fan_out_request(3, {}, {3: 2}, [])
+    page_obj = PageObject(page1, request, "get", "uri")
+    pages = [
+        page.data[0].page
+        async for page in page_obj.fetch_all(retries=2, retry_delay=0)
+    ]
+    assert pages == [1, 2, 3]
+
+    request = fan_out_request(3, {}, {3: 2}, [])
+    page_obj = PageObject(page1, request, "get", "uri")
+    with pytest.raises(RequestError):
+        async for _ in page_obj.fetch_all(retries=1, retry_delay=0):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_page_stream():
+    requested = []
+    page1 = {
+        "data": [{"page": 1, "item": 0}, {"page": 1, "item": 1}],
+        "meta": {"count": "3", "page": "1"},
+    }
+    page_obj = PageObject(page1, pages_request(3, requested), "get", "uri")
+    assert page_obj.data is page_obj.data
+
+    records = [record async for record in page_obj.stream()]
+    assert records == [{"page": page, "item": i} for page in (1, 2, 3) for i in range(2)]
+    assert all(type(record) is dict for record in records)
+    assert requested == [2, 3]
+
+    requested.clear()
+    stream = page_obj.stream(read_ahead=1)
+    assert (await stream.__anext__()) is page1["data"][0]
+    await asyncio.sleep(0.01)
+    # page 2 is fetched while page 1 is consumed
+    assert requested == [2]
+    await stream.aclose()
@@ -0,0 +1,140 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sprinkl_async.columnar import ColumnarListObject
+from sprinkl_async.dataobject import ListObject
+from sprinkl_async.pageobject import PageObject
+from sprinkl_async.query import Table
+
+HISTORY = [
+    {
+        "id": "h_1",
+        "type": "ZONE_STARTED",
+        "zone": 2,
+        "created_at": "2019-06-01T10:00:00.000Z",
+        "data": {"source": "schedule"},
+    },
+    {
+        "id": "h_2",
+        "type": "ZONE_COMPLETED",
+        "zone": 2,
+        "created_at": "2019-06-01T10:05:00.000Z",
+        "data": {"source": "schedule"},
+    },
+    {
+        "id": "h_3",
+        "type": "ZONE_STARTED",
+        "zone": 1,
+        "created_at": "2019-06-02T08:00:00.000Z",
+        "data": {"source": "app"},
+    },
+    {"id": "h_4", "type": "ONLINE", "created_at": "2019-06-03T00:00:00.000Z"},
+]
+
+
+def ids(query):
+    return [record["id"] for record in query.to_list()]
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_query(indexed):
+    table = Table(ListObject(HISTORY, lazy=True))
+    if indexed:
+        table.create_index("type")
+        table.create_index("zone", ordered=True)
+        table.create_index("created_at", ordered=True)
+        table.create_index("data.source")
+
+    assert len(table) == 4
+    assert ids(table.where(type="ZONE_STARTED")) == ["h_1", "h_3"]
+    assert ids(table.where(type="ZONE_STARTED", zone=1)) == ["h_3"]
+    assert ids(table.where(zone=3)) == []
+    assert ids(table.where(**{"data.source": "app"})) == ["h_3"]
+    assert ids(table.where(lambda record: "zone" not in record)) == ["h_4"]
+
+    assert ids(table.between("zone", 2)) == ["h_1", "h_2"]
+    assert ids(table.between("created_at", "2019-06-01T10:05:00.000Z")) == [
+        "h_2",
+        "h_3",
+        "h_4",
+    ]
+    start = datetime(2019, 6, 1, 12, 1, tzinfo=timezone(timedelta(hours=2)))
+    assert ids(table.between("created_at", start, datetime(2019, 6, 2, 8))) == ["h_2"]
+
+    assert ids(table.query().order_by("zone")) == ["h_3", "h_1", "h_2", "h_4"]
+    assert ids(table.query().order_by("zone", reverse=True)) == [
+        "h_1",
+        "h_2",
+        "h_3",
+        "h_4",
+    ]
+    assert ids(table.query().order_by("created_at", reverse=True).limit(2)) == [
+        "h_4",
+        "h_3",
+    ]
+    assert ids(table.where(type="ZONE_STARTED").order_by("created_at")) == [
+        "h_1",
+        "h_3",
+    ]
+    assert ids(table.query().order_by("type", "zone")) == [
+        "h_4",
+        "h_2",
+        "h_3",
+        "h_1",
+    ]
+
+    selected = table.where(zone=1).select("id", "data.source").to_list()
+    assert selected == [{"id": "h_3", "data.source": "app"}]
+
+    groups = table.query().group_by("type")
+    assert sorted(groups) == ["ONLINE", "ZONE_COMPLETED", "ZONE_STARTED"]
+    assert [item.id for item in groups["ZONE_STARTED"]] == ["h_1", "h_3"]
+
+    assert table.where(type="ZONE_STARTED").count() == 2
+    assert table.where(type="ZONE_STARTED").first()["data"]["source"] == "schedule"
+    assert table.where(type="OFFLINE").first() is None
+    assert table.where(zone=2).data[1].id == "h_2"
+    assert [record.id for record in table] == ["h_1", "h_2", "h_3", "h_4"]
+
+
+def test_extend_updates_indexes():
+    table = Table(ColumnarListObject(HISTORY[:2]))
+    table.create_index("type")
+    table.create_index("created_at", ordered=True)
+
+    table.extend(HISTORY[2:])
+    table.extend([{"id": "h_0", "type": "ONLINE", "created_at": "2019-05-01"}])
+
+    assert ids(table.where(type="ONLINE")) == ["h_4", "h_0"]
+    assert ids(table.query().order_by("created_at").limit(2)) == ["h_0", "h_1"]
+
+
+@pytest.mark.asyncio
+async def test_from_pages():
+    async def request(method, uri, params):
+        return {"data": HISTORY[2:], "meta": {"count": "2", "page": "2"}}
+
+    page = PageObject(
+        {"data": HISTORY[:2], "meta": {"count": "2", "page": "1"}},
+        request,
+        "get",
+        "uri",
+    )
+    table = await Table.from_pages(page)
+    assert ids(table.where(type="ZONE_STARTED")) == ["h_1", "h_3"]
@@ -0,0 +1,105 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from sprinkl_async.pageobject import PageObject
+from sprinkl_async.readingscache import ReadingsCache
+
+
+class FakeSensor:
+    """Sensor serving readings newest first, three per page."""
+
+    def __init__(self, count):
+        self.id = "1"
+        self.readings_data = []
+        self.requested = []
+        for _ in range(count):
+            self.add()
+
+    @property
+    def last_reading_at(self):
+        return self.readings_data[0]["created_at"]
+
+    def add(self, value=None):
+        number = len(self.readings_data)
+        self.readings_data.insert(
+            0,
+            {
+                "created_at": "2019-06-14T{0:02d}:00:00.000Z".format(number),
+                "moisture_t": number if value is None else value,
+            },
+        )
+
+    def page(self, page):
+        self.requested.append(page)
+        pages = max(1, (len(self.readings_data) + 2) // 3)
+        return {
+            "data": self.readings_data[(page - 1) * 3 : page * 3],
+            "meta": {"count": str(pages), "page": str(page)},
+        }
+
+    async def request(self, method, uri, params):
+        return self.page(params["page"])
+
+    async def readings(self, columnar=False):
+        return PageObject(self.page(1), self.request, "get", "readings")
+
+
+@pytest.mark.asyncio
+async def test_readings_cache():
+    sensor = FakeSensor(7)
+    cache = ReadingsCache()
+
+    page = await cache.readings(sensor)
+    assert [record["moisture_t"] for record in page.to_list()] == list(range(6, -1, -1))
+    assert sorted(sensor.requested) == [1, 2, 3]
+    assert not page.has_more
+
+    sensor.requested.clear()
+    assert await cache.readings(sensor) is page
+    assert sensor.requested == []
+
+    sensor.add()
+    sensor.add()
+    page = await cache.readings(sensor)
+    assert [record["moisture_t"] for record in page.to_list()] == list(range(8, -1, -1))
+    assert sensor.requested == [1]
+
+    columnar = await cache.readings(sensor, columnar=True)
+    assert columnar is await cache.readings(sensor, columnar=True)
+    assert sensor.requested == [1]
+
+
+@pytest.mark.asyncio
+async def test_readings_cache_tail_pages():
+    sensor = FakeSensor(2)
+    cache = ReadingsCache(max_records=6)
+    await cache.readings(sensor)
+
+    # newest cached record changed in place, as an hourly average would
+    sensor.readings_data[0]["moisture_t"] = 100
+    for _ in range(4):
+        sensor.add()
+    sensor.requested.clear()
+
+    page = await cache.readings(sensor)
+    assert [record["moisture_t"] for record in page.to_list()] == [5, 4, 3, 2, 100, 0]
+    assert sensor.requested == [1, 2]
+
+    cache.invalidate("1")
+    sensor.requested.clear()
+    await cache.readings(sensor)
+    assert sorted(sensor.requested) == [1, 2]
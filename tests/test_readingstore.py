@@ -0,0 +1,164 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from sprinkl_async.moisturesensors import MoistureSensors
+from sprinkl_async.readingstore import ReadingStore, RingBuffer
+from sprinkl_async.timeseries import SensorSeries, format_timestamp
+
+START = datetime(2019, 6, 14, tzinfo=timezone.utc)
+
+
+def test_ring_buffer():
+    buffer = RingBuffer(4, ["value"])
+    for time in range(6):
+        buffer.append(float(time), {"value": time * 10})
+
+    assert len(buffer) == 4
+    window = buffer.window()
+    assert list(window["timestamp"]) == [2.0, 3.0, 4.0, 5.0]
+    assert list(window["value"]) == [20.0, 30.0, 40.0, 50.0]
+
+    window = buffer.window(3, 5)
+    assert list(window["timestamp"]) == [3.0, 4.0]
+    assert list(buffer.window(6)["value"]) == []
+
+    buffer.append(6.0, {})
+    assert math.isnan(buffer.window(6)["value"][0])
+
+
+def test_ring_buffer_insert():
+    buffer = RingBuffer(4, ["value"])
+    for time in (5.0, 1.0, 3.0):
+        assert buffer.insert(time, {"value": time * 10})
+    assert not buffer.insert(3.0, {"value": 0})
+    assert list(buffer.window()["timestamp"]) == [1.0, 3.0, 5.0]
+
+    # full and wrapped around, inserting drops the oldest row
+    buffer.append(6.0, {"value": 60})
+    buffer.append(7.0, {"value": 70})
+    assert list(buffer.window()["timestamp"]) == [3.0, 5.0, 6.0, 7.0]
+    assert buffer.insert(4.0, {"value": 40})
+    assert not buffer.insert(2.0, {"value": 20})
+    window = buffer.window()
+    assert list(window["timestamp"]) == [4.0, 5.0, 6.0, 7.0]
+    assert list(window["value"]) == [40.0, 50.0, 60.0, 70.0]
+    buffer.append(8.0, {"value": 80})
+    assert list(buffer.window()["timestamp"]) == [5.0, 6.0, 7.0, 8.0]
+
+
+def test_reading_store_rollups():
+    store = ReadingStore()
+    for minute in range(0, 180, 30):
+        time = START + timedelta(minutes=minute)
+        assert store.add("1", time, moisture_1=minute, temp=70.0)
+    assert not store.add("1", START, moisture_1=0)
+
+    window = store.window("1", START + timedelta(hours=1), START + timedelta(hours=2))
+    assert list(window["moisture_1"]) == [60.0, 90.0]
+
+    hourly = store.hourly("1")
+    assert list(hourly["timestamp"]) == [
+        (START + timedelta(hours=hour)).timestamp() for hour in range(3)
+    ]
+    assert list(hourly["moisture_1"]) == [15.0, 75.0, 135.0]
+    assert list(hourly["moisture_1_min"]) == [0.0, 60.0, 120.0]
+    assert list(hourly["moisture_1_max"]) == [30.0, 90.0, 150.0]
+    assert list(hourly["temp"]) == [70.0, 70.0, 70.0]
+    assert math.isnan(hourly["moisture_3"][0])
+
+    daily = store.daily("1", START)
+    assert list(daily["moisture_1"]) == [75.0]
+    assert list(daily["moisture_1_count"]) == [6.0]
+    assert store.coverage("1") == (START, START + timedelta(minutes=150))
+
+
+def test_reading_store_records():
+    store = ReadingStore()
+    records = [
+        {"created_at": "2019-06-14T01:00:00.000Z", "moisture_t": 40, "temp": 60.0},
+        {"created_at": "2019-06-14T00:00:00.000Z", "moisture_t": 50, "temp": 61.0},
+    ]
+    assert store.add_records("1", records) == 2
+    assert store.add_records("1", records) == 0
+    assert list(store.window("1")["moisture_1"]) == [50.0, 40.0]
+
+
+def test_reading_store_tolerance():
+    # the sensor document series infers its times from last_reading_at
+    store = ReadingStore()
+    series = SensorSeries(START + timedelta(hours=1), moisture_1=[50, 48, 46])
+    assert store.add_series("1", series) == 3
+
+    records = [
+        {"created_at": "2019-06-14T00:59:51.837Z", "moisture_t": 46},
+        {"created_at": "2019-06-14T00:30:07.102Z", "moisture_t": 48},
+        {"created_at": "2019-06-13T23:29:58.420Z", "moisture_t": 52},
+    ]
+    assert store.add_records("1", records) == 1
+    assert list(store.window("1")["moisture_1"]) == [52.0, 50.0, 48.0, 46.0]
+    assert list(store.daily("1", START)["moisture_1_count"]) == [3.0]
+
+    exact = ReadingStore(tolerance=0)
+    assert exact.add_series("1", series) == 3
+    assert exact.add_records("1", records) == 3
+
+
+def test_moisture_sensors_feed_store():
+    sensor = {
+        "id": "1",
+        "last_reading_at": "2019-06-14T01:00:00.000Z",
+        "moisture_t": 46,
+        "moisture_m": 97,
+        "moisture_b": 96,
+        "moistures_t": [50, 48, 46],
+        "moistures_m": [97, 97, 97],
+        "moistures_b": [96, 97, 96],
+        "temps": [84.0, 82.0, 81.0],
+    }
+    sensors = MoistureSensors(None, [sensor])
+
+    window = sensors.store.window("1")
+    assert list(window["moisture_1"]) == [50.0, 48.0, 46.0]
+    assert window["timestamp"][-1] == (START + timedelta(hours=1)).timestamp()
+
+    later = SensorSeries(START + timedelta(hours=2), moisture_1=[46, 45, 44])
+    assert sensors.store.add_series("1", later) == 2
+    assert len(sensors.store.window("1")["timestamp"]) == 5
+
+    # older pages of the readings endpoint, newest first, backfill the store
+    pages = [
+        [
+            {
+                "created_at": format_timestamp(START - timedelta(minutes=30 * index)),
+                "moisture_t": 60 - index,
+            }
+            for index in range(first, first + 3)
+        ]
+        for first in (1, 4)
+    ]
+    assert sensors.store.add_records("1", pages[0]) == 3
+    assert sensors.store.add_records("1", pages[1]) == 3
+    assert sensors.store.add_records("1", pages[1]) == 0
+
+    window = sensors.store.window("1")
+    assert len(window["timestamp"]) == 11
+    assert list(window["moisture_1"][:7]) == [54.0, 55.0, 56.0, 57.0, 58.0, 59.0, 50.0]
+    assert list(window["timestamp"]) == sorted(window["timestamp"])
+    hourly = sensors.store.hourly("1", end=START)
+    assert list(hourly["moisture_1"]) == [54.5, 56.5, 58.5]
+    assert list(hourly["moisture_1_count"]) == [2.0, 2.0, 2.0]
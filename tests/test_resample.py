@@ -0,0 +1,127 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from sprinkl_async import resample
+from sprinkl_async.moisturesensors import MoistureSensors
+from sprinkl_async.resample import resample as resample_series
+from sprinkl_async.resample import resample_sensors
+
+NAN = float("nan")
+
+
+def values(row):
+    return [None if math.isnan(value) else value for value in row]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_resample_methods(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(resample, "numpy", None)
+
+    series = {
+        "a": ([0, 10, 20, 60], [0.0, 10.0, NAN, 60.0]),
+        "b": ([35, 25], [3.0, 2.0]),
+        "c": ([], []),
+    }
+    grid = resample_series(series, 10)
+    assert list(grid.timestamps) == [0, 10, 20, 30, 40, 50, 60]
+    assert grid.sensor_ids == ["a", "b", "c"]
+    assert values(grid.row("a")) == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    assert values(grid.row("b")) == [None, None, None, 2.5, None, None, None]
+    assert values(grid.row("c")) == [None] * 7
+
+    grid = resample_series(series, 10, 5, 45, method="previous")
+    assert list(grid.timestamps) == [5, 15, 25, 35, 45]
+    assert values(grid.row("a")) == [0.0, 10.0, 10.0, 10.0, 10.0]
+    assert values(grid.row("b")) == [None, None, 2.0, 3.0, 3.0]
+
+    grid = resample_series(series, 10, 5, 45, method="nearest")
+    assert values(grid.row("a")) == [0.0, 10.0, 10.0, 10.0, 60.0]
+    assert values(grid.row("b")) == [None, None, 2.0, 3.0, None]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_resample_max_gap(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(resample, "numpy", None)
+
+    series = {"a": ([0, 10, 60], [0.0, 10.0, 60.0])}
+    grid = resample_series(series, 10, max_gap=20)
+    assert values(grid.row("a")) == [0.0, 10.0, None, None, None, None, 60.0]
+
+    grid = resample_series(series, 10, method="previous", max_gap=20)
+    assert values(grid.row("a")) == [0.0, 10.0, 10.0, 10.0, None, None, 60.0]
+
+    grid = resample_series(series, 10, method="nearest", max_gap=20)
+    assert values(grid.row("a")) == [0.0, 10.0, 10.0, 10.0, 60.0, 60.0, 60.0]
+
+    columns = grid.to_dict()
+    assert columns["timestamp"] == [0, 10, 20, 30, 40, 50, 60]
+    assert columns["a"][-1] == 60.0
+
+    with pytest.raises(ValueError):
+        resample_series(series, 10, method="cubic")
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_resample_duplicate_times(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(resample, "numpy", None)
+
+    # the last value given at a time wins, in either order of times
+    series = {
+        "a": ([0, 10, 10, 20], [0.0, 15.0, 5.0, 20.0]),
+        "b": ([20, 10, 0, 10], [20.0, 15.0, 0.0, 5.0]),
+        "c": ([0, 10, 10, 20], [0.0, 15.0, NAN, 20.0]),
+    }
+    for method in ("linear", "previous", "nearest"):
+        grid = resample_series(series, 10, method=method)
+        assert values(grid.row("a")) == [0.0, 5.0, 20.0]
+        assert values(grid.row("b")) == [0.0, 5.0, 20.0]
+        assert values(grid.row("c")) == [0.0, 15.0, 20.0]
+
+
+def test_resample_sensors():
+    sensor = {
+        "id": "1",
+        "last_reading_at": "2019-06-14T01:00:00.000Z",
+        "moisture_t": 46,
+        "moisture_m": 97,
+        "moisture_b": None,
+        "temp": 81.0,
+        "moistures_t": [50, 48, 46],
+        "moistures_m": [97, 97],
+        "temps": [84.0, 82.0, 81.0],
+    }
+    sensors = MoistureSensors(None, [sensor])
+    start = datetime(2019, 6, 14, tzinfo=timezone.utc)
+
+    grid = resample_sensors(sensors, "moisture_1", 900, start)
+    assert len(grid.timestamps) == 5
+    assert values(grid.row("1")) == [50.0, 49.0, 48.0, 47.0, 46.0]
+
+    grid = resample_sensors(sensors, "moisture_3", 1800, start, store=sensors.store)
+    assert values(grid.row("1")) == [None, 97.0, 97.0]
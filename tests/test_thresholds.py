@@ -0,0 +1,114 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from sprinkl_async import thresholds
+from sprinkl_async.moisturesensors import MoistureSensors
+from sprinkl_async.thresholds import ThresholdEngine
+from sprinkl_async.zones import Zones
+
+
+def sensor(ident, top, temp):
+    return {
+        "id": ident,
+        "last_reading_at": None,
+        "moisture_t": top,
+        "moisture_m": 50,
+        "moisture_b": 50,
+        "temp": temp,
+    }
+
+
+def zone(ident, sensor_id, limit_t=60, limit_temp=35):
+    return {
+        "id": ident,
+        "number": int(ident[2:]),
+        "moisture_sensor": {
+            "limit_moisture_b": 95,
+            "limit_moisture_m": None,
+            "limit_moisture_t": limit_t,
+            "limit_temp": limit_temp,
+            "moisture_sensor_id": sensor_id,
+        },
+    }
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_threshold_engine(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(thresholds, "numpy", None)
+
+    sensors = MoistureSensors(None, [sensor("1", 40, 70.0), sensor("2", 70, 30.0)])
+    zones = Zones(
+        None,
+        [
+            zone("z_1", "1"),
+            zone("z_2", "2"),
+            zone("z_3", "1", limit_t=30),
+            zone("z_4", "missing"),
+            {"id": "z_5", "number": 5},
+        ],
+    )
+
+    engine = ThresholdEngine()
+    assert engine.add(zones, sensors) == 3
+    assert len(engine) == 3
+
+    changes = engine.evaluate()
+    assert [change.zone.id for change in changes] == ["z_1", "z_2", "z_3"]
+    assert changes[0].previous is None
+    assert changes[0].sensor is sensors["1"]
+    assert changes[1].reached == {
+        "moisture_t": True,
+        "moisture_m": False,
+        "moisture_b": False,
+        "temp": True,
+    }
+
+    assert engine.evaluate() == []
+
+    sensors["1"]._data["moisture_1"] = 65
+    changes = engine.evaluate()
+    assert [change.zone.id for change in changes] == ["z_1"]
+    assert changes[0].previous["moisture_t"] is False
+    assert changes[0].reached["moisture_t"] is True
+
+    sensors["2"]._data["temp"] = None
+    changes = engine.evaluate()
+    assert [change.zone.id for change in changes] == ["z_2"]
+    assert changes[0].reached["temp"] is False
+
+
+@pytest.mark.asyncio
+async def test_threshold_engine_refresh():
+    async def request(method, path):
+        data = sensor("1", 40, 20.0)
+        data["moisture_t"] = 80
+        data["last_reading_at"] = "2019-06-14T03:30:00.000Z"
+        return {"data": data}
+
+    sensors = MoistureSensors(request, [sensor("1", 40, 20.0)])
+    zones = Zones(None, [zone("z_1", "1")])
+    engine = ThresholdEngine()
+    engine.add(zones, sensors)
+    assert engine.evaluate()[0].reached["moisture_t"] is False
+
+    assert await sensors["1"].refresh()
+    changes = engine.evaluate()
+    assert [change.zone.id for change in changes] == ["z_1"]
+    assert changes[0].reached["moisture_t"] is True
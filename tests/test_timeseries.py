@@ -0,0 +1,106 @@
+#
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from sprinkl_async.moisturesensor import MoistureSensor
+from sprinkl_async.timeseries import SensorSeries, parse_timestamp
+
+LAST = datetime(2019, 6, 14, 3, 7, 51, 837000, tzinfo=timezone.utc)
+
+
+def sensor_data():
+    return {
+        "id": "1",
+        "last_reading_at": "2019-06-14T03:07:51.837Z",
+        "moisture_t": 46,
+        "moisture_m": 97,
+        "moisture_b": 96,
+        "moistures_t": [50, 48, 46],
+        "moistures_m": [97, 97, 97],
+        "moistures_b": [96, 97, 96],
+        "temps": [84.0, 82.0, 81.0],
+    }
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2019-06-14T03:07:51.837Z") == LAST
+    assert parse_timestamp("2019-06-14T03:07:51Z") == LAST.replace(microsecond=0)
+
+
+def test_sensor_series():
+    sensor = MoistureSensor(None, sensor_data())
+    assert "moistures_t" not in sensor._data
+    assert "temps" not in sensor._data
+
+    series = sensor.series
+    assert len(series) == 3
+    assert series.end == LAST
+    assert series.start == LAST - timedelta(hours=1)
+    assert series.moisture_1.typecode == "B"
+    assert series.temp.typecode == "f"
+    assert list(series.moisture_1) == [50, 48, 46]
+    assert list(series.temp) == [84.0, 82.0, 81.0]
+
+    records = series.records()
+    assert records[-1] == {
+        "timestamp": LAST,
+        "moisture_1": 46,
+        "moisture_3": 97,
+        "moisture_5": 96,
+        "temp": 81.0,
+    }
+
+
+def test_sensor_series_window():
+    series = SensorSeries(LAST, moisture_1=[1, 2, 3, 4], temp=[20.0, 21.0])
+    assert len(series) == 4
+
+    window = series.window(LAST - timedelta(minutes=30))
+    assert list(window.moisture_1) == [3, 4]
+    assert list(window.temp) == [20.0, 21.0]
+    assert window.end == LAST
+
+    window = series.window(end=LAST - timedelta(minutes=30))
+    assert list(window.moisture_1) == [1, 2]
+    assert list(window.temp) == []
+    assert window.end == LAST - timedelta(hours=1)
+
+    assert len(series.window(LAST + timedelta(minutes=1))) == 0
+
+
+def test_sensor_series_gaps():
+    data = sensor_data()
+    data["moistures_t"] = [50, None, 46.5]
+    data["moistures_m"] = [97, 300, 97]
+    data["temps"] = [84.0, None, 81.0]
+    series = MoistureSensor(None, data).series
+
+    assert series.moisture_1.typecode == "f"
+    assert series.moisture_1[0] == 50
+    assert math.isnan(series.moisture_1[1])
+    assert series.moisture_1[2] == 46.5
+    assert list(series.moisture_3) == [97, 300, 97]
+    assert math.isnan(series.temp[1])
+    assert series.moisture_5.typecode == "B"
+    assert math.isnan(series.records()[1]["moisture_1"])
+    assert len(series.window(LAST - timedelta(minutes=30))) == 2
+
+
+def test_sensor_series_no_reading():
+    data = sensor_data()
+    data["last_reading_at"] = None
+    assert MoistureSensor(None, data).series is None
@@ -55,6 +55,7 @@ async def test_zone_properties(event_loop, login_fixture):
             assert zone.enabled
             assert zone.name == "Test Zone"
             assert zone.number == 1
+            assert "_request" not in zone.data
 
             with pytest.raises(AttributeError):
                 assert zone.apa == "apa"